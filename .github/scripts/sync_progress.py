@@ -0,0 +1,190 @@
+"""Синхронизация каталога progress/ с репозиторием GitHub.
+
+Для каждого файла локально считается git blob SHA (потоково, без загрузки
+файла в память) и сравнивается с деревом ветки на GitHub. Неизменившиеся
+файлы пропускаются; измененные загружаются параллельно как blob-объекты
+через общий пул соединений и фиксируются одним коммитом (дерево на основе
+текущего дерева ветки), поэтому параллельные загрузки не конфликтуют.
+
+Хэши файлов кэшируются в манифесте по (mtime, размер), чтобы не
+перечитывать неизменившиеся файлы при каждом запуске.
+
+    python .github/scripts/sync_progress.py [--dry-run] [--api-url URL]
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Кратно 3 байтам, чтобы base64 кусков склеивался без паддинга
+CHUNK_SIZE = 3 << 18
+
+
+def git_blob_sha(path: str) -> str:
+    """SHA-1 файла как git blob (совпадает с sha в API GitHub)"""
+    digest = hashlib.sha1(f"blob {os.path.getsize(path)}\0".encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def blob_body(path: str) -> Iterator[bytes]:
+    """Тело запроса создания blob: JSON с base64, формируемый по кускам"""
+    yield b'{"encoding":"base64","content":"'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            yield base64.b64encode(chunk)
+    yield b'"}'
+
+
+class Manifest:
+    """Кэш хэшей: имя файла -> [mtime_ns, размер, blob sha]"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, List] = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    def blob_sha(self, name: str, path: str) -> str:
+        stat = os.stat(path)
+        entry = self.entries.get(name)
+        if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return entry[2]
+        sha = git_blob_sha(path)
+        self.entries[name] = [stat.st_mtime_ns, stat.st_size, sha]
+        return sha
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
+class GitHubRepo:
+    """Минимальный клиент Git Data API с общим пулом соединений"""
+
+    def __init__(self, api_url: str, repo: str, token: str, branch: str, workers: int):
+        self.base = f"{api_url.rstrip('/')}/repos/{repo}"
+        self.branch = branch
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json'
+        })
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict:
+        response = self.session.request(method, f"{self.base}{path}", **kwargs)
+        if response.status_code not in (200, 201):
+            raise RuntimeError(f"{method} {path}: {response.status_code} {response.text}")
+        return response.json()
+
+    def head_commit(self) -> str:
+        return self._request('GET', f'/git/ref/heads/{self.branch}')['object']['sha']
+
+    def remote_blobs(self, commit_sha: str, prefix: str) -> Dict[str, str]:
+        """Хэши файлов каталога prefix в дереве коммита: имя -> blob sha"""
+        tree_sha = self._request('GET', f'/git/commits/{commit_sha}')['tree']['sha']
+        tree = self._request('GET', f'/git/trees/{tree_sha}', params={'recursive': '1'})
+        if tree.get('truncated'):
+            raise RuntimeError('Remote tree listing is truncated')
+        return {
+            item['path'][len(prefix) + 1:]: item['sha']
+            for item in tree['tree']
+            if item['type'] == 'blob' and item['path'].startswith(f"{prefix}/")
+        }
+
+    def create_blob(self, path: str) -> str:
+        return self._request('POST', '/git/blobs', data=blob_body(path),
+                             headers={'Content-Type': 'application/json'})['sha']
+
+    def commit_files(self, parent_sha: str, files: Dict[str, str], message: str) -> str:
+        """Один коммит с новыми blob-объектами поверх дерева parent_sha"""
+        base_tree = self._request('GET', f'/git/commits/{parent_sha}')['tree']['sha']
+        tree = self._request('POST', '/git/trees', json={
+            'base_tree': base_tree,
+            'tree': [{'path': path, 'mode': '100644', 'type': 'blob', 'sha': sha}
+                     for path, sha in sorted(files.items())]
+        })
+        commit = self._request('POST', '/git/commits', json={
+            'message': message, 'tree': tree['sha'], 'parents': [parent_sha]
+        })
+        self._request('PATCH', f'/git/refs/heads/{self.branch}', json={'sha': commit['sha']})
+        return commit['sha']
+
+
+def sync_progress(progress_dir: str, repo: GitHubRepo, manifest: Manifest,
+                  prefix: str = 'progress', workers: int = 8,
+                  dry_run: bool = False) -> List[str]:
+    """Загрузка изменившихся файлов; возвращает их имена"""
+    local = {}
+    for entry in os.scandir(progress_dir):
+        if entry.is_file() and entry.name.endswith('.json'):
+            local[entry.name] = manifest.blob_sha(entry.name, entry.path)
+    manifest.save()
+
+    head = repo.head_commit()
+    remote = repo.remote_blobs(head, prefix)
+    changed = sorted(name for name, sha in local.items() if remote.get(name) != sha)
+    print(f"{len(local)} files, {len(changed)} changed")
+    if dry_run or not changed:
+        return changed
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        shas = pool.map(lambda name: repo.create_blob(os.path.join(progress_dir, name)), changed)
+        blobs = {f"{prefix}/{name}": sha for name, sha in zip(changed, shas)}
+
+    # Созданный blob должен совпасть с локальным хэшем
+    for name in changed:
+        if blobs[f"{prefix}/{name}"] != local[name]:
+            raise RuntimeError(f"Blob hash mismatch for {name}")
+
+    commit = repo.commit_files(head, blobs, f'Update progress {datetime.now().isoformat()}')
+    print(f"Committed {len(changed)} files as {commit}")
+    return changed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Sync progress/ with GitHub')
+    parser.add_argument('--progress-dir', default=os.path.join(ROOT_DIR, 'progress'))
+    parser.add_argument('--manifest', default=None,
+                        help='кэш хэшей (по умолчанию .sync_manifest.json рядом с progress/)')
+    parser.add_argument('--api-url', default=os.environ.get('GITHUB_API_URL', 'https://api.github.com'))
+    parser.add_argument('--repo', default=os.environ.get('GITHUB_REPOSITORY'))
+    parser.add_argument('--branch', default='main')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--dry-run', action='store_true', help='только показать изменения')
+    args = parser.parse_args(argv)
+
+    token = os.environ.get('AI_PROGRESS_TOKEN')
+    if not token or not args.repo:
+        print("Missing required environment variables")
+        return
+
+    if not os.path.exists(args.progress_dir):
+        print("Progress directory not found")
+        return
+
+    manifest_path = args.manifest or os.path.join(os.path.dirname(args.progress_dir),
+                                                  '.sync_manifest.json')
+    repo = GitHubRepo(args.api_url, args.repo, token, args.branch, args.workers)
+    sync_progress(args.progress_dir, repo, Manifest(manifest_path),
+                  workers=args.workers, dry_run=args.dry_run)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+import logging
+from flask import Flask
+from config import Config
+
+
+def create_app(config_class=Config) -> Flask:
+    """Создание приложения Flask
+
+    Шаблоны и статика лежат в корне проекта рядом с пакетом app. Модули
+    игры и ИИ загружаются при первом игровом запросе (см. routes.get_registry).
+    """
+    app = Flask(__name__, static_folder='../static', template_folder='../templates')
+    app.config.from_object(config_class)
+    logging.basicConfig(level=logging.DEBUG if app.config.get('DEBUG') else logging.INFO)
+
+    from .routes import bp
+    app.register_blueprint(bp)
+    return app
@@ -0,0 +1,150 @@
+"""Сравнение правил обновления MCCFR по качеству от числа итераций.
+
+Подыгра: последняя улица — доска с заполненными слотами, кроме двух, и
+малая колода, из которой раздается рука улицы (две карты на доску, одна в
+сброс). Для каждой возможной руки
+точно считаются лучшее размещение и ожидаемый результат усредненной
+стратегии; их разрыв — точная мера недобора (аналог эксплуатируемости для
+игры одного игрока). Рядом на каждом замере печатается эксплуатируемость
+векторного оценщика (app.ai.exploitability) на тех же подыграх.
+
+    python -m app.ai.benchmark
+    python -m app.ai.benchmark --variants vanilla dcfr --prune -1 --iterations 50 100 200
+"""
+import argparse
+import random
+import time
+from itertools import combinations
+from typing import Dict, List, Optional
+from ..game.cards import intern_card
+from ..game.evaluator import ROWS, ROW_SLOTS
+from .mccfr import MCCFR, GameState, VARIANTS, PRUNE_EXPLORE_EVERY, street_cards
+
+ROW_LIMITS = {row: slot.stop - slot.start for row, slot in ROW_SLOTS.items()}
+
+
+def make_subgame(rng: random.Random, empty_slots: int = 2, deck_size: int = 6,
+                 street: int = 5) -> GameState:
+    """Случайная доска улицы street с empty_slots пустыми слотами и колодой из deck_size карт"""
+    cards = [intern_card(code) for code in range(52)]
+    rng.shuffle(cards)
+    slots = [(row, pos) for row in ROWS for pos in range(ROW_LIMITS[row])]
+    empty = set(rng.sample(slots, empty_slots))
+    placed = {row: [None] * ROW_LIMITS[row] for row in ROWS}
+    for row, pos in slots:
+        if (row, pos) not in empty:
+            placed[row][pos] = cards.pop()
+    return GameState([], placed, cards[:deck_size], current_street=street)
+
+
+def _deal(subgame: GameState, hand) -> GameState:
+    return GameState(list(hand), subgame.placed_cards, [], subgame.current_street)
+
+
+def hands(subgame: GameState):
+    """Все руки улицы подыгры из ее колоды"""
+    count = min(street_cards(subgame.current_street), len(subgame.remaining_deck))
+    return combinations(subgame.remaining_deck, count)
+
+
+def best_value(mccfr: MCCFR, state: GameState) -> float:
+    """Лучший результат размещения руки (полный перебор)"""
+    if mccfr._is_terminal(state):
+        return mccfr._get_utility(state)
+    actions = mccfr._get_actions(state)
+    if not actions:
+        return mccfr._get_utility(state)
+    return max(best_value(mccfr, mccfr._apply_action(state, action)) for action in actions)
+
+
+def policy_value(mccfr: MCCFR, state: GameState) -> float:
+    """Ожидаемый результат игры по усредненной стратегии (в непосещенных узлах — равномерной)"""
+    if mccfr._is_terminal(state):
+        return mccfr._get_utility(state)
+    actions = mccfr._get_actions(state)
+    if not actions:
+        return mccfr._get_utility(state)
+    node = mccfr.nodes.get(state.to_string())
+    strategy = node.get_average_strategy() if node is not None else {}
+    if not strategy:
+        strategy = {action: 1.0 / len(actions) for action in actions}
+    return sum(prob * policy_value(mccfr, mccfr._apply_action(state, action))
+               for action, prob in strategy.items() if prob > 0)
+
+
+def strategy_gap(mccfr: MCCFR, subgame: GameState, best: Dict) -> float:
+    """Средний недобор стратегии до лучшего размещения по всем рукам"""
+    gaps = [best[hand] - policy_value(mccfr, _deal(subgame, hand)) for hand in hands(subgame)]
+    return sum(gaps) / len(gaps)
+
+
+def run(variants: List[str], checkpoints: List[int], subgames: int = 4,
+        prune_threshold: Optional[float] = None, seed: int = 0,
+        foul_pruning: bool = True, prune_warmup: int = PRUNE_EXPLORE_EVERY) -> List[Dict]:
+    """Обучение каждого варианта на одних и тех же подыграх с замерами"""
+    # exploitability сам импортирует подыгры отсюда
+    from .exploitability import exploitability
+
+    rng = random.Random(seed)
+    games = [make_subgame(rng) for _ in range(subgames)]
+    reference = MCCFR()
+    best = []
+    for game in games:
+        best.append({hand: best_value(reference, _deal(game, hand)) for hand in hands(game)})
+
+    rows = []
+    for variant in variants:
+        models = [MCCFR(seed=seed + i, foul_pruning=foul_pruning) for i in range(subgames)]
+        elapsed, done = 0.0, 0
+        for target in checkpoints:
+            started = time.perf_counter()
+            for model, game in zip(models, games):
+                model.train(game, target - done, variant=variant,
+                            prune_threshold=prune_threshold,
+                            prune_warmup=prune_warmup)
+            elapsed += time.perf_counter() - started
+            done = target
+            stats = [model.stats for model in models]
+            rows.append({
+                'variant': variant,
+                'iterations': target,
+                'gap': sum(strategy_gap(model, game, b)
+                           for model, game, b in zip(models, games, best)) / subgames,
+                'exploitability': sum(exploitability(model, [game])['exploitability']
+                                      for model, game in zip(models, games)) / subgames,
+                'seconds': elapsed,
+                'nodes_visited': sum(s['nodes_visited'] for s in stats),
+                'actions_pruned': sum(s['actions_pruned'] for s in stats),
+                'actions_generated': sum(s['actions_generated'] for s in stats),
+                'actions_fouling': sum(s['actions_fouling'] for s in stats),
+                'dead_states': sum(s['dead_states'] for s in stats)
+            })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MCCFR variants: strategy gap versus iterations')
+    parser.add_argument('--variants', nargs='+', default=list(VARIANTS), choices=VARIANTS)
+    parser.add_argument('--iterations', nargs='+', type=int, default=[25, 50, 100, 200])
+    parser.add_argument('--subgames', type=int, default=4)
+    parser.add_argument('--prune', type=float, default=None, help='порог сожаления для отсечения')
+    parser.add_argument('--prune-warmup', type=int, default=PRUNE_EXPLORE_EVERY,
+                        help='итераций без отсечения')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-foul-pruning', action='store_true',
+                        help='не отбрасывать ходы, ведущие к мертвой руке')
+    args = parser.parse_args()
+
+    print(f"{'variant':<8} {'iters':>6} {'gap':>8} {'exploit':>8} {'time':>8} {'nodes':>9} "
+          f"{'pruned':>9} {'fouling':>8} {'dead':>7}")
+    for row in run(args.variants, sorted(args.iterations), args.subgames, args.prune, args.seed,
+                   not args.no_foul_pruning, args.prune_warmup):
+        # Доля сгенерированных ходов, отброшенных как ведущие к мертвой руке
+        fouling = row['actions_fouling'] / row['actions_generated'] if row['actions_generated'] else 0.0
+        print(f"{row['variant']:<8} {row['iterations']:>6} {row['gap']:>8.3f} "
+              f"{row['exploitability']:>8.3f} {row['seconds']:>7.2f}s {row['nodes_visited']:>9} {row['actions_pruned']:>9} "
+              f"{fouling:>7.1%} {row['dead_states']:>7}")
+
+
+if __name__ == '__main__':
+    main()
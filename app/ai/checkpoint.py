@@ -0,0 +1,159 @@
+import os
+import re
+import json
+import threading
+import logging
+from typing import Dict, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PATTERN = re.compile(r'^delta_(\d{6})\.json$')
+BASE_FILE = 'base.json'
+
+
+class CheckpointStore:
+    """Контрольные точки обучения MCCFR: базовый снимок и дельта-сегменты
+
+    Каждая контрольная точка пишет отдельный сегмент только с узлами,
+    измененными после предыдущей, вместе со счетчиком итераций и состоянием
+    генератора случайных чисел. Фоновое уплотнение сливает сегменты в базовый
+    снимок; в базе хранится номер последнего слитого сегмента, поэтому сбой
+    посреди уплотнения не теряет и не применяет дважды изменения.
+    """
+
+    def __init__(self, checkpoint_dir: str = Config.CHECKPOINT_DIR,
+                 compact_after: int = Config.CHECKPOINT_COMPACT_SEGMENTS):
+        self.checkpoint_dir = checkpoint_dir
+        self.compact_after = compact_after
+        self._compactor: Optional[threading.Thread] = None
+        self._compact_lock = threading.Lock()
+        self._seq: Optional[int] = None
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def segments(self) -> List[Tuple[int, str]]:
+        """Сегменты (номер, путь) по возрастанию номера"""
+        found = []
+        for filename in os.listdir(self.checkpoint_dir):
+            match = SEGMENT_PATTERN.match(filename)
+            if match:
+                found.append((int(match.group(1)), os.path.join(self.checkpoint_dir, filename)))
+        return sorted(found)
+
+    def exists(self) -> bool:
+        return bool(self.segments()) or os.path.exists(self._path(BASE_FILE))
+
+    def write(self, mccfr, nodes: Dict[str, Dict]) -> str:
+        """Запись сегмента с измененными узлами и состоянием обучения"""
+        if self._seq is None:
+            base_segment = self._read(self._path(BASE_FILE)).get('segment', 0)
+            self._seq = max([seq for seq, _ in self.segments()] + [base_segment])
+        self._seq += 1
+        path = self._path(f"delta_{self._seq:06d}.json")
+        self._write(path, {
+            'iteration': mccfr.iteration,
+            'rng_state': _encode_rng(mccfr.rng.getstate()),
+            'exploration_constant': mccfr.exploration_constant,
+            'nodes': nodes
+        })
+        if len(self.segments()) >= self.compact_after:
+            self.compact_async()
+        return path
+
+    def load(self) -> Optional[Dict]:
+        """Сборка состояния из базы и более новых сегментов"""
+        with self._compact_lock:
+            base = self._read(self._path(BASE_FILE))
+            segments = self.segments()
+            if not base and not segments:
+                return None
+
+            state = {
+                'nodes': base.get('nodes', {}),
+                'iteration': base.get('iteration', 0),
+                'rng_state': base.get('rng_state'),
+                'exploration_constant': base.get('exploration_constant', 1.5)
+            }
+            for seq, path in segments:
+                if seq <= base.get('segment', 0):
+                    continue
+                segment = self._read(path)
+                state['nodes'].update(segment['nodes'])
+                for key in ('iteration', 'rng_state', 'exploration_constant'):
+                    state[key] = segment[key]
+        if state['rng_state'] is not None:
+            state['rng_state'] = _decode_rng(state['rng_state'])
+        return state
+
+    def compact(self) -> int:
+        """Слияние сегментов в базовый снимок; возвращает число слитых сегментов"""
+        with self._compact_lock:
+            base = self._read(self._path(BASE_FILE))
+            segments = [(seq, path) for seq, path in self.segments()
+                        if seq > base.get('segment', 0)]
+            if not segments:
+                return 0
+            nodes = base.get('nodes', {})
+            for seq, path in segments:
+                segment = self._read(path)
+                nodes.update(segment['nodes'])
+                base.update({key: segment[key]
+                             for key in ('iteration', 'rng_state', 'exploration_constant')})
+            base['nodes'] = nodes
+            base['segment'] = segments[-1][0]
+            self._write(self._path(BASE_FILE), base)
+            for _, path in segments:
+                os.remove(path)
+        logger.info(f"Compacted {len(segments)} checkpoint segments")
+        return len(segments)
+
+    def compact_async(self):
+        """Уплотнение в фоновом потоке (не более одного одновременно)"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_safely,
+                                           name='checkpoint-compact', daemon=True)
+        self._compactor.start()
+
+    def wait(self):
+        """Ожидание фонового уплотнения"""
+        if self._compactor is not None:
+            self._compactor.join()
+
+    def _compact_safely(self):
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Error compacting checkpoints: {str(e)}")
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.checkpoint_dir, filename)
+
+    @staticmethod
+    def _read(path: str) -> Dict:
+        if not os.path.exists(path):
+            return {}
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write(path: str, data: Dict):
+        """Атомарная запись: временный файл, fsync, замена"""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+
+def _encode_rng(state: Tuple) -> List:
+    """Состояние random.Random в JSON-совместимом виде"""
+    version, internal, gauss_next = state
+    return [version, list(internal), gauss_next]
+
+
+def _decode_rng(data: List) -> Tuple:
+    version, internal, gauss_next = data
+    return version, tuple(internal), gauss_next
+
@@ -0,0 +1,243 @@
+"""Оценка обученной стратегии лучшим ответом на подыграх.
+
+В подыгре (см. benchmark.make_subgame) случай раздает руку улицы, дальше
+ходит один игрок. Для каждой раздачи дерево раскрывается
+один раз в плоские массивы (родитель, глубина, вероятность хода по
+усредненной стратегии); терминальные доски оцениваются одной векторной
+пачкой, после чего снизу вверх по уровням считаются значение лучшего
+ответа (максимум) и значение стратегии (ожидание). Их разрыв, усредненный
+по раздачам, — эксплуатируемость стратегии (для игры одного игрока —
+недобор до лучшей игры). Раздачи распределяются по процессам.
+
+Кроме обучения на подыграх с оценкой по ходу, на тех же подыграх можно
+оценить развернутую стратегию: последнюю контрольную точку обучения
+(Config.CHECKPOINT_DIR) или опубликованную версию хранилища сервинга
+(Config.POLICY_STORE_DIR).
+
+    python -m app.ai.exploitability --variant cfr+ --iterations 1000 --every 50 --target 0.05
+    python -m app.ai.exploitability --deployed policy
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from config import Config
+from ..game.bounds import doomed
+from ..game.scoring import FOUL_PENALTY
+from .benchmark import make_subgame, hands, _deal
+from .checkpoint import CheckpointStore
+from .mccfr import MCCFR, GameState, VARIANTS
+from .policy_store import PolicyStore, policy_version
+
+# Усредненная стратегия состояния по его ключу (пустая — состояние не встречалось)
+Policy = Callable[[str], Dict[str, float]]
+
+# Правила, стратегия и раздачи, унаследованные процессами пула при fork:
+# узлы не сериализуются, а карты раздач остаются общими объектами (сравнение по is)
+_policy: Optional[MCCFR] = None
+_average: Optional[Policy] = None
+_deals: List[GameState] = []
+
+
+def average_policy(mccfr: MCCFR) -> Policy:
+    """Усредненная стратегия узлов MCCFR"""
+    def strategy(state_str: str) -> Dict[str, float]:
+        node = mccfr.nodes.get(state_str)
+        return node.get_average_strategy() if node is not None else {}
+    return strategy
+
+
+def _strategy(policy: Policy, state: GameState, actions: List[str]) -> List[float]:
+    """Вероятности действий по усредненной стратегии (в непосещенных узлах — равномерно)"""
+    average = policy(state.to_string())
+    probs = [average.get(action, 0.0) for action in actions]
+    total = sum(probs)
+    if total <= 0:
+        return [1.0 / len(actions)] * len(actions)
+    return [prob / total for prob in probs]
+
+
+def evaluate_state(mccfr: MCCFR, root: GameState, policy: Optional[Policy] = None) -> Tuple[float, float]:
+    """Значение лучшего ответа и значение стратегии для раздачи
+
+    Правила (ходы, отсечение мертвой руки, оценка досок) берутся из mccfr,
+    стратегия — из policy, по умолчанию из узлов того же mccfr.
+    """
+    if policy is None:
+        policy = average_policy(mccfr)
+    states = [root]
+    parents, depths, probs = [-1], [0], [1.0]
+    values: Dict[int, float] = {}
+    terminals, leaves = [], []
+
+    index = 0
+    while index < len(states):
+        state = states[index]
+        if mccfr._is_terminal(state):
+            terminals.append(index)
+            leaves.append(state)
+        elif mccfr.foul_pruning and doomed(mccfr._bounds(state)):
+            values[index] = -FOUL_PENALTY
+        else:
+            actions = mccfr._get_actions(state)
+            if not actions:
+                terminals.append(index)
+                leaves.append(state)
+            else:
+                for action, prob in zip(actions, _strategy(policy, state, actions)):
+                    states.append(mccfr._apply_action(state, action))
+                    parents.append(index)
+                    depths.append(depths[index] + 1)
+                    probs.append(prob)
+        index += 1
+
+    count = len(states)
+    parents = np.array(parents)
+    depths = np.array(depths)
+    probs = np.array(probs)
+    best = np.full(count, -np.inf)
+    expected = np.zeros(count)
+    if terminals:
+        best[terminals] = expected[terminals] = mccfr._get_utilities(leaves)
+    if values:
+        fixed = np.fromiter(values.keys(), dtype=np.int64)
+        best[fixed] = expected[fixed] = np.fromiter(values.values(), dtype=np.float64)
+
+    # Снизу вверх по уровням: к моменту обработки уровня его узлы уже посчитаны
+    for depth in range(int(depths.max()), 0, -1):
+        level = np.flatnonzero(depths == depth)
+        np.maximum.at(best, parents[level], best[level])
+        np.add.at(expected, parents[level], probs[level] * expected[level])
+    return float(best[0]), float(expected[0])
+
+
+def _evaluate_deal(index: int) -> Tuple[float, float]:
+    return evaluate_state(_policy, _deals[index], _average)
+
+
+def chance_outcomes(subgame: GameState) -> Iterator[GameState]:
+    """Все раздачи руки улицы подыгры"""
+    for hand in hands(subgame):
+        yield _deal(subgame, hand)
+
+
+def exploitability(mccfr: MCCFR, subgames: List[GameState], workers: int = 0,
+                   policy: Optional[Policy] = None) -> Dict:
+    """Средние по раздачам значения лучшего ответа и стратегии и их разрыв"""
+    global _policy, _average, _deals
+    deals = [deal for subgame in subgames for deal in chance_outcomes(subgame)]
+    started = time.perf_counter()
+    _policy, _average, _deals = mccfr, policy or average_policy(mccfr), deals
+    try:
+        if workers > 1:
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                results = list(pool.map(_evaluate_deal, range(len(deals)),
+                                        chunksize=max(1, len(deals) // (workers * 4))))
+        else:
+            results = [_evaluate_deal(index) for index in range(len(deals))]
+    finally:
+        _policy, _average, _deals = None, None, []
+    best = np.array([result[0] for result in results])
+    expected = np.array([result[1] for result in results])
+    return {
+        'deals': len(deals),
+        'best_response': float(best.mean()),
+        'policy_value': float(expected.mean()),
+        'exploitability': float((best - expected).mean()),
+        'seconds': time.perf_counter() - started
+    }
+
+
+def load_deployed(source: str) -> Optional[Tuple[MCCFR, Policy, str]]:
+    """Развернутая стратегия: правила, стратегия и ее версия
+
+    source — 'checkpoint' (последняя контрольная точка обучения) или
+    'policy' (опубликованная версия хранилища сервинга). None, если
+    сохраненной стратегии нет.
+    """
+    if source == 'checkpoint':
+        mccfr = MCCFR.resume(CheckpointStore(Config.CHECKPOINT_DIR))
+        if mccfr is None:
+            return None
+        return mccfr, average_policy(mccfr), f"iteration {mccfr.iteration}"
+    if not PolicyStore.exists(Config.POLICY_STORE_DIR):
+        return None
+    store = PolicyStore.load(Config.POLICY_STORE_DIR)
+    return MCCFR(), store.get_strategy, policy_version(Config.POLICY_STORE_DIR) or Config.POLICY_STORE_DIR
+
+
+def train_until_converged(mccfr: MCCFR, subgames: List[GameState], iterations: int, every: int,
+                          target: Optional[float] = None, min_improvement: Optional[float] = None,
+                          variant: str = 'vanilla', workers: int = 0,
+                          checkpoint: Optional[CheckpointStore] = None) -> Iterator[Dict]:
+    """Обучение на подыграх с оценкой после каждых every итераций
+
+    Останавливается по достижении target или когда эксплуатируемость за
+    интервал снизилась меньше чем на min_improvement.
+    """
+    previous = None
+    while mccfr.iteration < iterations:
+        for _ in range(min(every, iterations - mccfr.iteration)):
+            # Подыгры по очереди, по одной итерации
+            mccfr.train(subgames[mccfr.iteration % len(subgames)], 1, variant=variant)
+        if checkpoint is not None:
+            mccfr.checkpoint(checkpoint)
+        report = dict(exploitability(mccfr, subgames, workers), iteration=mccfr.iteration)
+        yield report
+        value = report['exploitability']
+        if target is not None and value <= target:
+            return
+        if min_improvement is not None and previous is not None and previous - value < min_improvement:
+            return
+        previous = value
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Best-response evaluation of MCCFR on subgames')
+    parser.add_argument('--variant', default='vanilla', choices=VARIANTS)
+    parser.add_argument('--iterations', type=int, default=Config.TRAIN_ITERATIONS)
+    parser.add_argument('--every', type=int, default=Config.CHECKPOINT_INTERVAL,
+                        help='итераций между оценками')
+    parser.add_argument('--target', type=float, default=None, help='остановка при эксплуатируемости ниже')
+    parser.add_argument('--min-improvement', type=float, default=None,
+                        help='остановка при улучшении за интервал меньше')
+    parser.add_argument('--subgames', type=int, default=4)
+    parser.add_argument('--empty-slots', type=int, default=2)
+    parser.add_argument('--deck-size', type=int, default=6)
+    parser.add_argument('--workers', type=int, default=0)
+    parser.add_argument('--checkpoint-dir', default=None, help='запись контрольных точек при оценке')
+    parser.add_argument('--deployed', choices=('checkpoint', 'policy'), default=None,
+                        help='оценить последнюю контрольную точку или опубликованную стратегию без обучения')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    subgames = [make_subgame(rng, args.empty_slots, args.deck_size) for _ in range(args.subgames)]
+    if args.deployed:
+        deployed = load_deployed(args.deployed)
+        if deployed is None:
+            parser.error(f'no saved strategy for --deployed {args.deployed}')
+        rules, policy, version = deployed
+        report = exploitability(rules, subgames, args.workers, policy)
+        print(f"{args.deployed} {version}: best {report['best_response']:.3f} "
+              f"policy {report['policy_value']:.3f} exploit {report['exploitability']:.3f} "
+              f"deals {report['deals']} eval {report['seconds']:.2f}s")
+        return
+    checkpoint = CheckpointStore(args.checkpoint_dir) if args.checkpoint_dir else None
+    mccfr = (MCCFR.resume(checkpoint) if checkpoint is not None else None) or MCCFR(seed=args.seed)
+
+    print(f"{'iters':>7} {'best':>8} {'policy':>8} {'exploit':>8} {'deals':>6} {'eval':>7}")
+    for report in train_until_converged(mccfr, subgames, args.iterations, args.every, args.target,
+                                        args.min_improvement, args.variant, args.workers, checkpoint):
+        print(f"{report['iteration']:>7} {report['best_response']:>8.3f} {report['policy_value']:>8.3f} "
+              f"{report['exploitability']:>8.3f} {report['deals']:>6} {report['seconds']:>6.2f}s")
+    if checkpoint is not None:
+        checkpoint.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Процесс онлайн-обучения по итогам сыгранных игр.
+
+Забирает файлы спула (app.ai.learning) пачками, применяет пакетное
+обновление MCCFR, сохраняет изменения дельта-сегментом контрольной точки
+и публикует новую версию хранилища стратегии, которую воркеры подхватывают
+без перезапуска (AIStrategy.refresh_policy). Запускается одним процессом:
+
+    python -m app.ai.learner           # работа в переднем плане
+    python -m app.ai.learner --once    # обработать накопленное и выйти
+"""
+import os
+import time
+import logging
+import argparse
+from typing import Dict
+from config import Config
+from .checkpoint import CheckpointStore
+from .learning import spool_files, read_outcomes, decision_samples
+from .mccfr import MCCFR
+from .policy_store import PolicyStore
+
+logger = logging.getLogger(__name__)
+
+
+class Learner:
+    def __init__(self, spool_dir: str = Config.LEARNING_SPOOL_DIR,
+                 checkpoint_dir: str = Config.LEARNER_CHECKPOINT_DIR,
+                 publish_interval: int = Config.LEARNER_PUBLISH_INTERVAL):
+        self.spool_dir = spool_dir
+        self.checkpoint = CheckpointStore(checkpoint_dir)
+        self.publish_interval = publish_interval
+        self.mccfr = self._load()
+        self._published_at = 0.0
+        self._pending = 0
+
+    def _load(self) -> MCCFR:
+        """Таблица из контрольных точек обучения или из ai_strategy.json"""
+        mccfr = MCCFR.resume(self.checkpoint)
+        if mccfr is not None:
+            return mccfr
+        if os.path.exists(Config.AI_STRATEGY_FILE):
+            return MCCFR.load_progress(Config.AI_STRATEGY_FILE)
+        return MCCFR()
+
+    def run_once(self, force_publish: bool = False) -> Dict:
+        """Обработка одной пачки спула; возвращает статистику"""
+        files = spool_files(self.spool_dir)[:Config.LEARNER_BATCH_FILES]
+        samples = decision_samples(read_outcomes(files))
+        updated = self.mccfr.update_batch(samples)
+        if updated:
+            # Итоги удаляются только после надежной записи изменений
+            self.mccfr.checkpoint(self.checkpoint)
+            self._pending += updated
+        for path in files:
+            os.remove(path)
+
+        version = None
+        due = time.monotonic() - self._published_at >= self.publish_interval
+        if self._pending and (due or force_publish):
+            version = PolicyStore.from_mccfr(self.mccfr).quantize().publish(Config.POLICY_STORE_DIR)
+            self._published_at = time.monotonic()
+            self._pending = 0
+            logger.info(f"Published strategy {version}")
+        return {'files': len(files), 'samples': len(samples), 'nodes': updated, 'published': version}
+
+    def run_forever(self, poll_interval: float = 5.0):
+        while True:
+            stats = self.run_once()
+            if not stats['files']:
+                time.sleep(poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Online learner for finished games')
+    parser.add_argument('--once', action='store_true', help='обработать спул и опубликовать')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    learner = Learner()
+    if args.once:
+        while True:
+            stats = learner.run_once(force_publish=True)
+            print(stats)
+            if not stats['files']:
+                break
+        learner.checkpoint.wait()
+        return
+    learner.run_forever()
+
+
+if __name__ == '__main__':
+    main()
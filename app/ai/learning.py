@@ -0,0 +1,111 @@
+"""Очередь итогов сыгранных игр для онлайн-обучения.
+
+Стол кладет итог игры в очередь процесса без ожидания; фоновый поток
+пишет накопленные итоги пачками в файлы спула (временный файл и
+переименование), откуда их забирает процесс обучения (app.ai.learner).
+"""
+import os
+import json
+import queue
+import logging
+import threading
+import uuid
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SPOOL_SUFFIX = '.jsonl'
+
+
+class OutcomeQueue:
+    """Неблокирующая запись итогов игр в спул"""
+
+    def __init__(self, spool_dir: str = Config.LEARNING_SPOOL_DIR,
+                 maxsize: int = Config.LEARNING_QUEUE_SIZE):
+        self.spool_dir = spool_dir
+        self._queue: queue.Queue = queue.Queue(maxsize=maxsize)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._seq = 0
+        # pid повторяется после перезапуска воркера: без метки экземпляра новый
+        # процесс перезаписал бы еще не прочитанные файлы спула
+        self._token = uuid.uuid4().hex[:12]
+        self.dropped = 0
+
+    def put(self, outcome: Dict):
+        """Постановка итога в очередь; при переполнении итог отбрасывается"""
+        self._start()
+        try:
+            self._queue.put_nowait(outcome)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Learning queue is full, outcome dropped")
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='outcome-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        """Запись пачками: все, что накопилось к моменту пробуждения"""
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.error(f"Error writing outcomes: {str(e)}")
+
+    def _write(self, batch: List[Dict]):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._seq += 1
+        name = f"outcomes_{os.getpid()}_{self._token}_{self._seq:08d}"
+        tmp_path = os.path.join(self.spool_dir, f".{name}.tmp")
+        with open(tmp_path, 'w') as f:
+            for outcome in batch:
+                f.write(json.dumps(outcome, separators=(',', ':')) + '\n')
+        os.replace(tmp_path, os.path.join(self.spool_dir, name + SPOOL_SUFFIX))
+
+
+def spool_files(spool_dir: str = Config.LEARNING_SPOOL_DIR) -> List[str]:
+    """Готовые файлы спула в порядке записи"""
+    if not os.path.exists(spool_dir):
+        return []
+    files = [os.path.join(spool_dir, name) for name in os.listdir(spool_dir)
+             if name.endswith(SPOOL_SUFFIX) and not name.startswith('.')]
+    return sorted(files, key=os.path.getmtime)
+
+
+def read_outcomes(paths: List[str]) -> Iterator[Dict]:
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def decision_samples(outcomes) -> List[Tuple[str, str, float]]:
+    """Решения ИИ с наградой места: (состояние, действие, награда)"""
+    samples = []
+    for outcome in outcomes:
+        for seat, decisions in outcome['decisions'].items():
+            reward = outcome['rewards'][seat]
+            samples.extend((state_str, action, reward) for state_str, action in decisions)
+    return samples
+
+
+_outcomes: Optional[OutcomeQueue] = None
+
+
+def record_outcome(outcome: Dict):
+    """Итог игры в очередь обучения процесса"""
+    global _outcomes
+    if _outcomes is None:
+        _outcomes = OutcomeQueue()
+    _outcomes.put(outcome)
@@ -1,17 +1,26 @@
 import numpy as np
-from typing import Dict, List, Tuple, Set
+from typing import Dict, List, Optional, Tuple, Set
 from ..game.deck import Card
+from ..game.evaluator import EMPTY, board_array, card_codes
+from ..game.cards import card_index, intern_card
+from ..game.scoring import board_value, board_values, FOUL_PENALTY
+from ..game.bounds import board_bounds, row_bounds, doomed
+from config import Config
 import random
 from collections import defaultdict
 import math
 
 class GameState:
+    __slots__ = ('player_cards', 'placed_cards', 'remaining_deck', 'current_street', 'bounds')
+
     def __init__(self, player_cards: List[Card], placed_cards: Dict[str, List[Card]], 
                  remaining_deck: List[Card], current_street: int):
         self.player_cards = player_cards
         self.placed_cards = placed_cards
         self.remaining_deck = remaining_deck
         self.current_street = current_street
+        # Границы силы рядов (считаются лениво, у потомков — только для измененного ряда)
+        self.bounds: Optional[Dict[str, Tuple[int, int]]] = None
         
     def to_string(self) -> str:
         """Преобразование состояния в строку"""
@@ -31,7 +40,7 @@ class GameState:
         player_cards = []
         for i in range(0, len(cards), 2):
             if cards[i:i+2] != "00":
-                player_cards.append(Card(cards[i], cards[i+1]))
+                player_cards.append(intern_card(cards[i:i+2]))
                 
         # Восстановление размещенных карт
         placed_cards = {
@@ -45,21 +54,50 @@ class GameState:
             for _ in range(limit):
                 card_str = placed[placed_idx:placed_idx+2]
                 if card_str != "00":
-                    placed_cards[row].append(Card(card_str[0], card_str[1]))
+                    placed_cards[row].append(intern_card(card_str))
                 else:
                     placed_cards[row].append(None)
                 placed_idx += 2
                 
         return cls(player_cards, placed_cards, [], int(street))
 
+def street_cards(street: int) -> int:
+    """Карт в раздаче улицы"""
+    return Config.CARDS_FIRST_STREET if street == 1 else Config.CARDS_OTHER_STREETS
+
+
+def street_discards(street: int) -> int:
+    """Карт улицы, уходящих в сброс (первая улица раскладывается целиком)"""
+    return 0 if street == 1 else 1
+
+
+# Правила обновления сожалений (параметр variant в MCCFR.train)
+VARIANTS = ('vanilla', 'cfr+', 'linear', 'dcfr')
+
+# Параметры Discounted CFR: положительные сожаления, отрицательные, усреднение
+DCFR_ALPHA = 1.5
+DCFR_BETA = 0.0
+DCFR_GAMMA = 2.0
+
+# Каждая такая итерация обходит все действия (чтобы отсеченные могли вернуться)
+PRUNE_EXPLORE_EVERY = 20
+
+
 class MCCFRNode:
     def __init__(self):
         self.regret_sum = defaultdict(float)
         self.strategy_sum = defaultdict(float)
         self.strategy = defaultdict(float)
+        # Итерация, по которую применено дисконтирование DCFR
+        self.discounted_at = 0
         
-    def get_strategy(self, reaching_prob: float) -> Dict[str, float]:
+    def get_strategy(self, reaching_prob: float, actions: Optional[List[str]] = None,
+                     weight: float = 1.0) -> Dict[str, float]:
         """Получение текущей стратегии"""
+        # Новый узел начинает с нулевых сожалений по всем действиям
+        for action in actions or ():
+            self.regret_sum.setdefault(action, 0.0)
+            
         normalizing_sum = 0
         for action in self.regret_sum:
             self.strategy[action] = max(self.regret_sum[action], 0)
@@ -70,10 +108,29 @@ class MCCFRNode:
                 self.strategy[action] /= normalizing_sum
             else:
                 self.strategy[action] = 1.0 / len(self.regret_sum)
-            self.strategy_sum[action] += reaching_prob * self.strategy[action]
+            self.strategy_sum[action] += weight * reaching_prob * self.strategy[action]
             
         return dict(self.strategy)
         
+    def to_dict(self) -> Dict:
+        """Сериализация узла"""
+        return {
+            'regret_sum': dict(self.regret_sum),
+            'strategy_sum': dict(self.strategy_sum),
+            'strategy': dict(self.strategy),
+            'discounted_at': self.discounted_at
+        }
+        
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'MCCFRNode':
+        """Восстановление узла"""
+        node = cls()
+        node.regret_sum = defaultdict(float, data['regret_sum'])
+        node.strategy_sum = defaultdict(float, data['strategy_sum'])
+        node.strategy = defaultdict(float, data['strategy'])
+        node.discounted_at = data.get('discounted_at', 0)
+        return node
+        
     def get_average_strategy(self) -> Dict[str, float]:
         """Получение усредненной стратегии"""
         avg_strategy = {}
@@ -88,14 +145,120 @@ class MCCFRNode:
         return avg_strategy
 
 class MCCFR:
-    def __init__(self, exploration_constant: float = 1.5):
-        self.nodes = {}
+    def __init__(self, exploration_constant: float = 1.5, seed: Optional[int] = None,
+                 nodes=None, foul_pruning: bool = Config.FOUL_PRUNING):
+        # dict или NodeStore с ограничением памяти
+        self.nodes = nodes if nodes is not None else {}
         self.exploration_constant = exploration_constant
+        self.iteration = 0
+        self.rng = random.Random(seed)
+        self.variant = 'vanilla'
+        self.prune_threshold: Optional[float] = None
+        self.prune_warmup = 0
+        # Отбрасывание ходов, после которых доска мертва при любом продолжении
+        self.foul_pruning = foul_pruning
+        # Накопленные логарифмы множителей DCFR по итерациям
+        self._dcfr_logs: List[Tuple[float, float, float]] = [(0.0, 0.0, 0.0)]
+        # Счетчики ветвления: узлы, рассмотренные и отсеченные действия,
+        # сгенерированные и отброшенные как ведущие к мертвой руке ходы, мертвые состояния
+        self.stats = {'nodes_visited': 0, 'actions_explored': 0, 'actions_pruned': 0,
+                      'actions_generated': 0, 'actions_fouling': 0, 'dead_states': 0}
+        # Узлы, измененные после последней контрольной точки
+        self._touched: Set[str] = set()
+        
+    def train(self, initial_state: GameState, iterations: int, checkpoint=None,
+              checkpoint_interval: int = Config.CHECKPOINT_INTERVAL,
+              variant: str = 'vanilla', prune_threshold: Optional[float] = None,
+              prune_warmup: int = 0):
+        """Обучение агента
+
+        variant — правило обновления: 'vanilla', 'cfr+' (сожаления не ниже
+        нуля, линейное усреднение), 'linear' (вес итерации t для сожалений и
+        усреднения), 'dcfr' (дисконтирование с DCFR_ALPHA/BETA/GAMMA).
+        prune_threshold включает отсечение действий с сожалением ниже порога
+        после prune_warmup итераций. С checkpoint (CheckpointStore) каждые
+        checkpoint_interval итераций записывается дельта-сегмент, так что
+        прерванное обучение теряет не больше одного интервала.
+        """
+        if variant not in VARIANTS:
+            raise ValueError(f"Unknown CFR variant: {variant}")
+        self.variant = variant
+        self.prune_threshold = prune_threshold
+        self.prune_warmup = prune_warmup
         
-    def train(self, initial_state: GameState, iterations: int):
-        """Обучение агента"""
         for _ in range(iterations):
-            self._cfr(initial_state, 1.0)
+            self._cfr(self._sample_state(initial_state), 1.0)
+            self.iteration += 1
+            if checkpoint is not None and self.iteration % checkpoint_interval == 0:
+                self.checkpoint(checkpoint)
+                
+        if checkpoint is not None:
+            if self._touched:
+                self.checkpoint(checkpoint)
+            checkpoint.wait()
+            
+    def _sample_state(self, state: GameState) -> GameState:
+        """Начальное состояние итерации, сданное генератором обучения
+
+        Корень обучения стратегии (пустая доска) доигрывается как за столом
+        до случайной улицы 2..5: первая улица раскладывает все карты,
+        следующие — все, кроме одной, уходящей в сброс (Table._ai_seat_move).
+        Ходы до корня выбирает текущая стратегия (в новых узлах — случайный
+        ход без мертвой руки), поэтому корни совпадают по виду с состояниями,
+        которые ИИ видит в игре. Полный обход раскладки первой улицы
+        неподъемен, ее играет книга дебютов. Доске с картами сдается рука
+        ее улицы.
+        """
+        if state.player_cards or not state.remaining_deck:
+            return state
+        deck = [intern_card(card) for card in state.remaining_deck]
+        self.rng.shuffle(deck)
+        if any(card for cards in state.placed_cards.values() for card in cards):
+            count = min(street_cards(state.current_street), len(deck))
+            return GameState(deck[:count], state.placed_cards, deck[count:], state.current_street)
+
+        target = self.rng.randint(2, 5)
+        street_state = GameState([], state.placed_cards, deck, 1)
+        for street in range(1, target):
+            count = street_cards(street)
+            street_state = GameState(deck[:count], street_state.placed_cards, deck[count:], street)
+            deck = deck[count:]
+            while not self._is_terminal(street_state):
+                actions = self._get_actions(street_state)
+                if not actions:
+                    break
+                street_state = self._apply_action(street_state, self._policy_action(street_state, actions))
+        count = street_cards(target)
+        return GameState(deck[:count], street_state.placed_cards, deck[count:], target)
+        
+    def _policy_action(self, state: GameState, actions: List[str]) -> str:
+        """Ход текущей усредненной стратегии (в новом узле — случайный) для доигрывания"""
+        node = self.nodes.get(state.to_string())
+        strategy = node.get_average_strategy() if node is not None else {}
+        strategy = {action: strategy[action] for action in actions if strategy.get(action, 0) > 0}
+        if not strategy:
+            return self.rng.choice(actions)
+        return max(strategy.items(), key=lambda x: x[1])[0]
+        
+    def checkpoint(self, store) -> str:
+        """Запись узлов, измененных после предыдущей контрольной точки"""
+        nodes = {state_str: self.nodes[state_str].to_dict()
+                 for state_str in self._touched}
+        path = store.write(self, nodes)
+        self._touched.clear()
+        return path
+        
+    @classmethod
+    def resume(cls, store, nodes=None) -> Optional['MCCFR']:
+        """Восстановление обучения из контрольных точек"""
+        state = store.load()
+        if state is None:
+            return None
+        mccfr = cls.deserialize(state, nodes)
+        mccfr.iteration = state['iteration']
+        if state['rng_state'] is not None:
+            mccfr.rng.setstate(state['rng_state'])
+        return mccfr
             
     def _cfr(self, state: GameState, reaching_prob: float) -> float:
         """Рекурсивный CFR"""
@@ -104,46 +267,115 @@ class MCCFR:
         if self._is_terminal(state):
             return self._get_utility(state)
             
-        if state_str not in self.nodes:
-            self.nodes[state_str] = MCCFRNode()
+        if self.foul_pruning and doomed(self._bounds(state)):
+            # Любое продолжение ведет к мертвой руке — поддерево не обходится
+            self.stats['dead_states'] += 1
+            return -FOUL_PENALTY
             
-        node = self.nodes[state_str]
-        strategy = node.get_strategy(reaching_prob)
-        
         # Получение возможных действий
         actions = self._get_actions(state)
         if not actions:
             return 0
             
-        # Вычисление значения для каждого действия
+        if state_str not in self.nodes:
+            self.nodes[state_str] = MCCFRNode()
+            
+        node = self.nodes[state_str]
+        t = self.iteration + 1
+        if self.variant == 'dcfr':
+            self._discount(node, t)
+        weight = t if self.variant in ('cfr+', 'linear') else 1.0
+        strategy = node.get_strategy(reaching_prob, actions, weight)
+        self._touched.add(state_str)
+        
+        explored = self._prune(node, actions, strategy)
+        self.stats['nodes_visited'] += 1
+        self.stats['actions_explored'] += len(explored)
+        self.stats['actions_pruned'] += len(actions) - len(explored)
+        
+        # Вычисление значения для каждого действия (все ходы делает один игрок,
+        # поэтому значение потомка не меняет знак)
         action_values = {}
         node_value = 0
         
-        for action in actions:
-            new_state = self._apply_action(state, action)
-            action_values[action] = -self._cfr(new_state, 
-                                             reaching_prob * strategy[action])
-            node_value += strategy[action] * action_values[action]
+        new_states = [self._apply_action(state, action) for action in explored]
+        if all(self._is_terminal(new_state) for new_state in new_states):
+            # Все ходы ведут в терминал: оценка одной векторной пачкой
+            utilities = self._get_utilities(new_states)
+            for action, utility in zip(explored, utilities):
+                action_values[action] = utility
+                node_value += strategy[action] * action_values[action]
+        else:
+            for action, new_state in zip(explored, new_states):
+                action_values[action] = self._cfr(new_state, 
+                                                reaching_prob * strategy[action])
+                node_value += strategy[action] * action_values[action]
             
-        # Обновление сожалений
-        for action in actions:
+        # Обновление сожалений (отсеченные действия на этой итерации не меняются)
+        regret_weight = t if self.variant == 'linear' else 1.0
+        for action in explored:
             regret = action_values[action] - node_value
-            node.regret_sum[action] += reaching_prob * regret
+            value = node.regret_sum[action] + regret_weight * reaching_prob * regret
+            node.regret_sum[action] = max(value, 0.0) if self.variant == 'cfr+' else value
             
+        # Хранилище с ограничением памяти могло вытеснить узел во время рекурсии
+        self.nodes[state_str] = node
         return node_value
         
-    def get_action(self, state: GameState) -> str:
-        """Получение действия на основе обученной стратегии"""
+    def _prune(self, node: MCCFRNode, actions: List[str], strategy: Dict[str, float]) -> List[str]:
+        """Действия для обхода без сильно отрицательных по сожалению
+
+        Отсекаются действия с накопленным сожалением не выше порога (при
+        отрицательном пороге их текущая вероятность и так нулевая, поэтому
+        значение узла не меняется); каждая PRUNE_EXPLORE_EVERY-я итерация
+        обходит все действия.
+        """
+        if (self.prune_threshold is None or self.iteration < self.prune_warmup or
+                self.iteration % PRUNE_EXPLORE_EVERY == 0):
+            return actions
+        explored = [action for action in actions if node.regret_sum[action] > self.prune_threshold]
+        return explored or actions
+        
+    def _discount(self, node: MCCFRNode, t: int):
+        """Дисконтирование DCFR за итерации, прошедшие с прошлого посещения узла
+
+        Множители перемножаются через накопленные суммы логарифмов, поэтому
+        редко посещаемые узлы не требуют обхода на каждой итерации.
+        """
+        last = node.discounted_at
+        if last >= t - 1:
+            return
+        logs = self._dcfr_logs
+        while len(logs) < t:
+            k = len(logs)
+            positive, negative, average = logs[-1]
+            logs.append((
+                positive + math.log(k ** DCFR_ALPHA / (k ** DCFR_ALPHA + 1)),
+                negative + math.log(k ** DCFR_BETA / (k ** DCFR_BETA + 1)),
+                average + DCFR_GAMMA * math.log(k / (k + 1))
+            ))
+        positive = math.exp(logs[t - 1][0] - logs[last][0])
+        negative = math.exp(logs[t - 1][1] - logs[last][1])
+        average = math.exp(logs[t - 1][2] - logs[last][2])
+        for action, regret in node.regret_sum.items():
+            node.regret_sum[action] = regret * (positive if regret > 0 else negative)
+        for action in node.strategy_sum:
+            node.strategy_sum[action] *= average
+        node.discounted_at = t - 1
+        
+    def get_action(self, state: GameState) -> Optional[str]:
+        """Получение действия на основе обученной стратегии (None — ходов нет)"""
         state_str = state.to_string()
         if state_str not in self.nodes:
-            return random.choice(self._get_actions(state))
+            actions = self._get_actions(state)
+            return random.choice(actions) if actions else None
             
         strategy = self.nodes[state_str].get_average_strategy()
         return max(strategy.items(), key=lambda x: x[1])[0]
         
     def _is_terminal(self, state: GameState) -> bool:
-        """Проверка терминального состояния"""
-        if state.current_street >= 5:
+        """Конец улицы (в руке осталась только карта сброса) или заполненная доска"""
+        if len(state.player_cards) <= street_discards(state.current_street):
             return True
             
         # Проверка заполненности всех линий
@@ -156,49 +388,92 @@ class MCCFR:
         
     def _get_utility(self, state: GameState) -> float:
         """Получение полезности терминального состояния"""
-        from ..game.player import Player
+        if all(card for cards in state.placed_cards.values() for card in cards):
+            rows = {row: card_codes(cards) for row, cards in state.placed_cards.items()}
+            return board_value(rows)
+        return self._get_utilities([state])[0]
         
-        player = Player()
-        player.top_row = [c for c in state.placed_cards['top'] if c]
-        player.middle_row = [c for c in state.placed_cards['middle'] if c]
-        player.bottom_row = [c for c in state.placed_cards['bottom'] if c]
-        
-        # Оценка комбинаций
-        top_value = player.evaluate_hand(player.top_row)[1]
-        middle_value = player.evaluate_hand(player.middle_row)[1]
-        bottom_value = player.evaluate_hand(player.bottom_row)[1]
-        
-        # Штраф за неправильное расположение
-        if top_value > middle_value or middle_value > bottom_value:
-            return -1000
-            
-        return top_value + middle_value + bottom_value
+    def _get_utilities(self, states: List[GameState]) -> List[float]:
+        """Пакетная оценка терминальных состояний общим движком подсчета
+
+        Незаполненная доска (конец улицы) оценивается средним по
+        STREET_ROLLOUTS достройкам свободных слотов картами колоды состояния.
+        """
+        boards, sizes = [], []
+        rng = None
+        deck_codes = {}
+        for state in states:
+            board = np.array(board_array(state.placed_cards))
+            free = np.flatnonzero(board == EMPTY)
+            deck = deck_codes.get(id(state.remaining_deck))
+            if deck is None:
+                deck = deck_codes[id(state.remaining_deck)] = np.array(card_codes(state.remaining_deck))
+            if not len(free) or len(deck) < len(free):
+                boards.append(board[None, :])
+                sizes.append(1)
+                continue
+            if rng is None:
+                # Генератор от состояния обучения: продолжение после контрольной точки повторяется
+                rng = np.random.default_rng(self.rng.getrandbits(64))
+            rollouts = Config.STREET_ROLLOUTS
+            order = np.argsort(rng.random((rollouts, len(deck))), axis=1)[:, :len(free)]
+            filled = np.repeat(board[None, :], rollouts, axis=0)
+            filled[:, free] = deck[order]
+            boards.append(filled)
+            sizes.append(rollouts)
+        values = board_values(np.concatenate(boards))
+        starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        return (np.add.reduceat(values, starts) / np.array(sizes)).tolist()
         
     def _get_actions(self, state: GameState) -> List[str]:
-        """Получение возможных действий"""
+        """Получение возможных действий
+
+        С foul_pruning ходы, после которых доска мертва при любом
+        продолжении, отбрасываются (границы проверяются один раз на пару
+        карта-ряд). Если мертвы все ходы, возвращаются все.
+        """
         actions = []
+        fouling = []
+        bounds = self._bounds(state) if self.foul_pruning else None
         
         for card in state.player_cards:
             for row in ['top', 'middle', 'bottom']:
                 limit = 3 if row == 'top' else 5
                 placed = state.placed_cards[row]
+                free = [pos for pos in range(limit) if not placed[pos]]
+                if not free:
+                    continue
+                    
+                target = actions
+                if bounds is not None:
+                    codes = card_codes(placed) + [card_index(card)]
+                    if doomed({**bounds, row: row_bounds(row, codes)}):
+                        target = fouling
+                target.extend(f"{card.rank}{card.suit}_{row}_{pos}" for pos in free)
                 
-                for pos in range(limit):
-                    if not placed[pos]:
-                        actions.append(f"{card.rank}{card.suit}_{row}_{pos}")
-                        
+        self.stats['actions_generated'] += len(actions) + len(fouling)
+        if not actions:
+            return fouling
+        self.stats['actions_fouling'] += len(fouling)
         return actions
         
+    def _bounds(self, state: GameState) -> Dict[str, Tuple[int, int]]:
+        """Границы силы рядов состояния"""
+        if state.bounds is None:
+            state.bounds = board_bounds({row: card_codes(cards)
+                                         for row, cards in state.placed_cards.items()})
+        return state.bounds
+        
     def _apply_action(self, state: GameState, action: str) -> GameState:
         """Применение действия к состоянию"""
         card_str, row, pos = action.split('_')
         pos = int(pos)
         
-        # Создание новой карты
-        card = Card(card_str[0], card_str[1])
+        # Общий объект карты: сравнение по идентичности
+        card = intern_card(card_str)
         
         # Копирование состояния
-        new_player_cards = [c for c in state.player_cards if c != card]
+        new_player_cards = [c for c in state.player_cards if c is not card]
         new_placed_cards = {
             'top': state.placed_cards['top'].copy(),
             'middle': state.placed_cards['middle'].copy(),
@@ -208,39 +483,38 @@ class MCCFR:
         # Размещение карты
         new_placed_cards[row][pos] = card
         
-        return GameState(
+        new_state = GameState(
             new_player_cards,
             new_placed_cards,
             state.remaining_deck,
             state.current_street
         )
+        if state.bounds is not None:
+            # Изменился один ряд — границы остальных переносятся
+            new_state.bounds = dict(state.bounds)
+            new_state.bounds[row] = row_bounds(row, card_codes(new_placed_cards[row]))
+        return new_state
         
     def serialize(self) -> Dict:
         """Сериализация состояния MCCFR"""
         serialized_nodes = {}
         for state_str, node in self.nodes.items():
-            serialized_nodes[state_str] = {
-                'regret_sum': dict(node.regret_sum),
-                'strategy_sum': dict(node.strategy_sum),
-                'strategy': dict(node.strategy)
-            }
+            serialized_nodes[state_str] = node.to_dict()
             
         return {
             'nodes': serialized_nodes,
-            'exploration_constant': self.exploration_constant
+            'exploration_constant': self.exploration_constant,
+            'iteration': self.iteration
         }
         
     @classmethod
-    def deserialize(cls, data: Dict) -> 'MCCFR':
-        """Десериализация состояния MCCFR"""
-        mccfr = cls(exploration_constant=data['exploration_constant'])
+    def deserialize(cls, data: Dict, nodes=None) -> 'MCCFR':
+        """Десериализация состояния MCCFR (узлы пишутся в nodes, если передано хранилище)"""
+        mccfr = cls(exploration_constant=data['exploration_constant'], nodes=nodes)
+        mccfr.iteration = data.get('iteration', 0)
         
         for state_str, node_data in data['nodes'].items():
-            node = MCCFRNode()
-            node.regret_sum = defaultdict(float, node_data['regret_sum'])
-            node.strategy_sum = defaultdict(float, node_data['strategy_sum'])
-            node.strategy = defaultdict(float, node_data['strategy'])
-            mccfr.nodes[state_str] = node
+            mccfr.nodes[state_str] = MCCFRNode.from_dict(node_data)
             
         return mccfr
         
@@ -251,12 +525,12 @@ class MCCFR:
             json.dump(self.serialize(), f)
             
     @classmethod
-    def load_progress(cls, filepath: str) -> 'MCCFR':
+    def load_progress(cls, filepath: str, nodes=None) -> 'MCCFR':
         """Загрузка прогресса обучения"""
         import json
         with open(filepath, 'r') as f:
             data = json.load(f)
-        return cls.deserialize(data)
+        return cls.deserialize(data, nodes)
         
     def update_strategy(self, state: GameState, action: str, reward: float):
         """Обновление стратегии на основе полученного вознаграждения"""
@@ -265,6 +539,7 @@ class MCCFR:
             self.nodes[state_str] = MCCFRNode()
             
         node = self.nodes[state_str]
+        self._touched.add(state_str)
         
         # Обновление сожалений и стратегии
         actions = self._get_actions(state)
@@ -283,3 +558,45 @@ class MCCFR:
         
         # Пересчет стратегии
         node.get_strategy(1.0)
+        self.nodes[state_str] = node
+        
+    def update_batch(self, samples: List[Tuple[str, str, float]]) -> int:
+        """Пакетное обновление по решениям сыгранных игр (состояние, действие, награда)
+
+        Награды и число посещений суммируются векторно по парам
+        (состояние, действие); каждый узел обновляется один раз за пакет с
+        членом UCB1 на начало пакета и одним пересчетом стратегии.
+        Возвращает число обновленных узлов.
+        """
+        if not samples:
+            return 0
+        pairs = np.array([f"{state_str}#{action}" for state_str, action, _ in samples])
+        rewards = np.array([reward for _, _, reward in samples], dtype=np.float64)
+        keys, inverse = np.unique(pairs, return_inverse=True)
+        counts = np.bincount(inverse)
+        reward_sums = np.bincount(inverse, weights=rewards)
+        
+        by_state: Dict[str, List[Tuple[str, int, float]]] = defaultdict(list)
+        for key, count, reward_sum in zip(keys.tolist(), counts.tolist(), reward_sums.tolist()):
+            state_str, action = key.rsplit('#', 1)
+            by_state[state_str].append((action, count, reward_sum))
+            
+        for state_str, updates in by_state.items():
+            actions = self._get_actions(GameState.from_string(state_str))
+            if not actions:
+                continue
+            node = self.nodes.get(state_str) or MCCFRNode()
+            total_visits = sum(node.strategy_sum.values())
+            visits = 0
+            for action, count, reward_sum in updates:
+                exploration_term = math.sqrt(
+                    (2 * math.log(total_visits + 1)) /
+                    (node.strategy_sum.get(action, 0) + 1)
+                )
+                node.regret_sum[action] += reward_sum + count * self.exploration_constant * exploration_term
+                node.strategy_sum[action] += count
+                visits += count
+            node.get_strategy(1.0, actions, weight=visits)
+            self.nodes[state_str] = node
+            self._touched.add(state_str)
+        return len(by_state)
@@ -0,0 +1,193 @@
+import os
+import sys
+import json
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional, Tuple
+from config import Config
+from .mccfr import MCCFRNode
+
+# Доля потолка памяти, до которой кэш освобождается при вытеснении
+EVICT_TO = 0.9
+
+
+def node_bytes(state_str: str, node: MCCFRNode) -> int:
+    """Оценка памяти узла: ключ, три словаря и значения float"""
+    entries = len(node.regret_sum) + len(node.strategy_sum) + len(node.strategy)
+    return (sys.getsizeof(state_str) + sys.getsizeof(node) +
+            sys.getsizeof(node.regret_sum) + sys.getsizeof(node.strategy_sum) +
+            sys.getsizeof(node.strategy) + entries * (24 + 60))
+
+
+class NodeStore:
+    """Узлы MCCFR с ограничением памяти: LRU-кэш в памяти и SQLite на диске
+
+    Интерфейс словаря (in, [], get, items, len) позволяет передать хранилище
+    в MCCFR вместо dict. При превышении потолка памяти давно не
+    использовавшиеся узлы записываются на диск пачкой и удаляются из кэша;
+    при обращении загружаются обратно. Узлы изменяются на месте, поэтому
+    вытесняемый узел всегда записывается, а изменивший узел код должен
+    вернуть его присваиванием store[key] = node. В режиме read_only
+    (сервинг) вытесненные узлы просто отбрасываются.
+    """
+
+    def __init__(self, path: str = Config.NODE_STORE_FILE,
+                 max_bytes: int = Config.NODE_STORE_MAX_MB * 1024 * 1024,
+                 read_only: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        self._hot: 'OrderedDict[str, Tuple[MCCFRNode, int]]' = OrderedDict()
+        self._hot_bytes = 0
+        # Вытесненные узлы, на которые еще есть ссылки (например, в стеке рекурсии
+        # CFR): обращение возвращает тот же объект, а не устаревшую копию с диска
+        self._evicted: 'weakref.WeakValueDictionary[str, MCCFRNode]' = weakref.WeakValueDictionary()
+        self._lock = threading.RLock()
+        self._stats = {'hits': 0, 'misses': 0, 'evicted': 0, 'written': 0}
+
+        if read_only:
+            self._db = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute('CREATE TABLE IF NOT EXISTS nodes (key TEXT PRIMARY KEY, data TEXT NOT NULL)')
+            self._db.commit()
+
+    def __contains__(self, state_str: str) -> bool:
+        with self._lock:
+            if state_str in self._hot or state_str in self._evicted:
+                return True
+            return self._db.execute('SELECT 1 FROM nodes WHERE key = ?', (state_str,)).fetchone() is not None
+
+    def __getitem__(self, state_str: str) -> MCCFRNode:
+        node = self.get(state_str)
+        if node is None:
+            raise KeyError(state_str)
+        return node
+
+    def __setitem__(self, state_str: str, node: MCCFRNode):
+        with self._lock:
+            self._put(state_str, node)
+            self._evict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.flush()
+            return self._db.execute('SELECT COUNT(*) FROM nodes').fetchone()[0]
+
+    def get(self, state_str: str, default=None) -> Optional[MCCFRNode]:
+        """Узел из кэша или с диска (с переносом в кэш)"""
+        with self._lock:
+            entry = self._hot.get(state_str)
+            if entry is not None:
+                # Узел мог вырасти после прошлого обращения — размер пересчитывается
+                self._put(state_str, entry[0])
+                self._stats['hits'] += 1
+                self._evict()
+                return entry[0]
+
+            self._stats['misses'] += 1
+            node = self._evicted.pop(state_str, None)
+            if node is None:
+                row = self._db.execute('SELECT data FROM nodes WHERE key = ?', (state_str,)).fetchone()
+                if row is None:
+                    return default
+                node = MCCFRNode.from_dict(json.loads(row[0]))
+            self._put(state_str, node)
+            self._evict()
+            return node
+
+    def items(self) -> Iterator[Tuple[str, MCCFRNode]]:
+        """Все узлы; с диска читаются потоком, без загрузки в кэш"""
+        with self._lock:
+            self.flush()
+            hot = dict((key, node) for key, (node, _) in self._hot.items())
+        for key, node in hot.items():
+            yield key, node
+        cursor = self._db.cursor()
+        for key, data in cursor.execute('SELECT key, data FROM nodes'):
+            if key not in hot:
+                yield key, MCCFRNode.from_dict(json.loads(data))
+
+    def keys(self) -> Iterator[str]:
+        for key, _ in self.items():
+            yield key
+
+    def flush(self):
+        """Запись всех узлов кэша на диск (кэш сохраняется)"""
+        if self.read_only:
+            return
+        with self._lock:
+            self._write(list(self._hot.items()))
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+    def stats(self) -> Dict:
+        """Статистика памяти и обращений"""
+        with self._lock:
+            disk_nodes = self._db.execute('SELECT COUNT(*) FROM nodes').fetchone()[0]
+            lookups = self._stats['hits'] + self._stats['misses']
+            return {
+                'hot_nodes': len(self._hot),
+                'hot_bytes': self._hot_bytes,
+                'max_bytes': self.max_bytes,
+                'disk_nodes': disk_nodes,
+                'disk_bytes': os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+                'hit_rate': self._stats['hits'] / lookups if lookups else 0.0,
+                **self._stats
+            }
+
+    def _put(self, state_str: str, node: MCCFRNode):
+        size = node_bytes(state_str, node)
+        previous = self._hot.pop(state_str, None)
+        if previous is not None:
+            self._hot_bytes -= previous[1]
+        self._hot[state_str] = (node, size)
+        self._hot_bytes += size
+
+    def _evict(self):
+        """Вытеснение давно использованных узлов при превышении потолка"""
+        if not self.max_bytes or self._hot_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * EVICT_TO
+        evicted = []
+        while len(self._hot) > 1 and self._hot_bytes > target:
+            state_str, (node, size) = self._hot.popitem(last=False)
+            self._hot_bytes -= size
+            evicted.append((state_str, (node, size)))
+            self._evicted[state_str] = node
+        if not self.read_only:
+            self._write(evicted)
+        self._stats['evicted'] += len(evicted)
+
+    def _write(self, entries):
+        if not entries:
+            return
+        with self._db:
+            self._db.executemany(
+                'INSERT OR REPLACE INTO nodes (key, data) VALUES (?, ?)',
+                ((state_str, json.dumps(node.to_dict(), separators=(',', ':')))
+                 for state_str, (node, _) in entries)
+            )
+        self._stats['written'] += len(entries)
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Node store statistics')
+    parser.add_argument('path', nargs='?', default=Config.NODE_STORE_FILE)
+    args = parser.parse_args()
+    store = NodeStore(args.path, read_only=True)
+    for name, value in store.stats().items():
+        print(f"{name}: {value}")
+
+
+if __name__ == '__main__':
+    main()
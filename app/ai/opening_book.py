@@ -0,0 +1,202 @@
+"""Книга дебютов: лучшая раскладка первой улицы для каждой 5-карточной руки.
+
+Руки, отличающиеся только перестановкой мастей, равноценны, поэтому
+2 598 960 рук сводятся к 134 459 каноническим. Для каждой канонической руки
+оцениваются все допустимые распределения карт по рядам: доска
+достраивается случайными картами из остатка колоды (старшие карты — в
+нижние ряды) и оценивается общим векторным движком подсчета. Результат
+хранится отсортированными массивами .npy (ключ руки, раскладка, оценка) и
+ищется бинарным поиском по отображенным через mmap файлам.
+
+    python -m app.ai.opening_book --rollouts 64 --workers 8
+"""
+import os
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations, product
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from config import Config
+from ..game.array_deck import ArrayDeck
+from ..game.evaluator import ROWS, ROW_SLOTS, BOARD_SIZE
+from ..game.scoring import board_values
+
+logger = logging.getLogger(__name__)
+
+BOOK_ARRAYS = ('keys', 'placements', 'values')
+HAND_SIZE = 5
+ROW_LIMITS = [ROW_SLOTS[row].stop - ROW_SLOTS[row].start for row in ROWS]
+
+
+def canonical_hand(codes: Sequence[int]) -> Tuple[int, List[int]]:
+    """Канонический ключ руки и порядок ее карт в канонической записи
+
+    Масти переименовываются по убыванию (число карт, ранги), после чего
+    карты сортируются. Возвращает ключ uint32 (5 кодов по 6 бит) и индексы
+    исходных карт в порядке канонических кодов.
+    """
+    by_suit = {suit: sorted((code >> 2 for code in codes if code & 3 == suit), reverse=True)
+               for suit in range(4)}
+    order = sorted(range(4), key=lambda suit: (len(by_suit[suit]), by_suit[suit]), reverse=True)
+    relabel = {suit: new for new, suit in enumerate(order)}
+    canonical = sorted(((code >> 2) * 4 + relabel[code & 3], index)
+                       for index, code in enumerate(codes))
+    key = 0
+    for position, (code, _) in enumerate(canonical):
+        key |= code << (6 * position)
+    return key, [index for _, index in canonical]
+
+
+def decode_key(key: int) -> List[int]:
+    return [(key >> (6 * position)) & 63 for position in range(HAND_SIZE)]
+
+
+def canonical_hands() -> np.ndarray:
+    """Все канонические руки (отсортированные ключи)"""
+    return np.array(sorted({canonical_hand(hand)[0] for hand in combinations(range(52), HAND_SIZE)}),
+                    dtype=np.uint32)
+
+
+def _assignments() -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Допустимые распределения 5 карт по рядам и слоты карт и пустые слоты
+
+    Карты ряда занимают его первые слоты; пустые слоты упорядочены от
+    нижнего ряда к верхнему для достройки старшими картами снизу.
+    """
+    rows, card_slots, empty_slots = [], [], []
+    for assignment in product(range(len(ROWS)), repeat=HAND_SIZE):
+        counts = [assignment.count(row) for row in range(len(ROWS))]
+        if any(count > limit for count, limit in zip(counts, ROW_LIMITS)):
+            continue
+        used = [0] * len(ROWS)
+        slots = []
+        for row in assignment:
+            slots.append(ROW_SLOTS[ROWS[row]].start + used[row])
+            used[row] += 1
+        empty = [slot for row in reversed(range(len(ROWS)))
+                 for slot in range(ROW_SLOTS[ROWS[row]].start + used[row], ROW_SLOTS[ROWS[row]].stop)]
+        rows.append(assignment)
+        card_slots.append(slots)
+        empty_slots.append(empty)
+    return np.array(rows, dtype=np.int8), np.array(card_slots), np.array(empty_slots)
+
+
+ASSIGNMENTS, CARD_SLOTS, EMPTY_SLOTS = _assignments()
+
+
+def pack_placement(rows: Sequence[int]) -> int:
+    """Ряды 5 карт (0 — верх, 1 — середина, 2 — низ) по 2 бита"""
+    return sum(int(row) << (2 * position) for position, row in enumerate(rows))
+
+
+def unpack_placement(packed: int) -> List[int]:
+    return [(int(packed) >> (2 * position)) & 3 for position in range(HAND_SIZE)]
+
+
+def evaluate_hand(key: int, rollouts: int, seed: int) -> Tuple[int, float]:
+    """Лучшее распределение канонической руки по средней оценке достроек"""
+    hand = np.array(decode_key(key))
+    deck = ArrayDeck(seed)
+    deck.kill(hand.tolist())
+
+    # Общие для всех распределений достройки (метод общих случайных чисел)
+    fills = np.sort(deck.completions(rollouts, EMPTY_SLOTS.shape[1]), axis=1)[:, ::-1]
+
+    count = len(ASSIGNMENTS)
+    boards = np.empty((count, rollouts, BOARD_SIZE), dtype=np.int64)
+    boards[np.arange(count)[:, None, None], np.arange(rollouts)[None, :, None],
+           CARD_SLOTS[:, None, :]] = hand[None, None, :]
+    boards[np.arange(count)[:, None, None], np.arange(rollouts)[None, :, None],
+           EMPTY_SLOTS[:, None, :]] = fills[None, :, :]
+    values = board_values(boards.reshape(-1, BOARD_SIZE)).reshape(count, rollouts).mean(axis=1)
+    best = int(np.argmax(values))
+    return pack_placement(ASSIGNMENTS[best]), float(values[best])
+
+
+def _evaluate_chunk(args) -> List[Tuple[int, float]]:
+    keys, rollouts, seed = args
+    return [evaluate_hand(int(key), rollouts, seed + int(key)) for key in keys]
+
+
+class OpeningBook:
+    def __init__(self, keys: np.ndarray, placements: np.ndarray, values: np.ndarray):
+        self.keys = keys
+        self.placements = placements
+        self.values = values
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def build(cls, rollouts: int = Config.OPENING_BOOK_ROLLOUTS, workers: Optional[int] = None,
+              limit: Optional[int] = None, seed: int = 0, chunk_size: int = 256) -> 'OpeningBook':
+        """Расчет книги в пуле процессов"""
+        keys = canonical_hands()
+        if limit:
+            keys = keys[:limit]
+        chunks = [(keys[start:start + chunk_size], rollouts, seed)
+                  for start in range(0, len(keys), chunk_size)]
+        placements = np.zeros(len(keys), dtype=np.uint16)
+        values = np.zeros(len(keys), dtype=np.float32)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            position = 0
+            for results in pool.map(_evaluate_chunk, chunks):
+                for placement, value in results:
+                    placements[position] = placement
+                    values[position] = value
+                    position += 1
+                logger.info(f"Opening book: {position}/{len(keys)} hands, "
+                            f"{time.perf_counter() - started:.1f}s")
+        return cls(keys, placements, values)
+
+    def save(self, book_dir: str = Config.OPENING_BOOK_DIR):
+        os.makedirs(book_dir, exist_ok=True)
+        for name in BOOK_ARRAYS:
+            path = os.path.join(book_dir, f"{name}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, getattr(self, name))
+            os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, book_dir: str = Config.OPENING_BOOK_DIR) -> 'OpeningBook':
+        return cls(*[np.load(os.path.join(book_dir, f"{name}.npy"), mmap_mode='r')
+                     for name in BOOK_ARRAYS])
+
+    @staticmethod
+    def exists(book_dir: str = Config.OPENING_BOOK_DIR) -> bool:
+        return all(os.path.exists(os.path.join(book_dir, f"{name}.npy")) for name in BOOK_ARRAYS)
+
+    def lookup(self, codes: Sequence[int]) -> Optional[List[str]]:
+        """Ряд для каждой карты руки (в исходном порядке) или None"""
+        key, order = canonical_hand(codes)
+        index = int(np.searchsorted(self.keys, key))
+        if index >= len(self.keys) or int(self.keys[index]) != key:
+            return None
+        rows = [None] * HAND_SIZE
+        for position, row in enumerate(unpack_placement(self.placements[index])):
+            rows[order[position]] = ROWS[row]
+        return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the first-street opening book')
+    parser.add_argument('--rollouts', type=int, default=Config.OPENING_BOOK_ROLLOUTS,
+                        help='достроек на распределение')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--limit', type=int, default=None, help='только первые N рук (проверка)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    book = OpeningBook.build(args.rollouts, args.workers, args.limit, args.seed)
+    book.save(Config.OPENING_BOOK_DIR)
+    print(f"{len(book)} hands in {time.perf_counter() - started:.1f}s -> {Config.OPENING_BOOK_DIR}")
+
+
+if __name__ == '__main__':
+    main()
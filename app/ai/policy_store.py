@@ -0,0 +1,317 @@
+import os
+import json
+import shutil
+import argparse
+from typing import Dict, Optional, Tuple
+import numpy as np
+from ..game.evaluator import RANKS, SUITS, ROW_SLOTS, card_index
+from config import Config
+
+# Файлы хранилища: каждый массив в отдельном .npy для загрузки через mmap;
+# best (лучшее действие состояния) может отсутствовать в хранилищах прежнего формата
+STORE_ARRAYS = ('keys', 'offsets', 'actions', 'probs')
+OPTIONAL_ARRAYS = ('best',)
+SLOT_ROWS = [(row, slot.start) for row, slot in ROW_SLOTS.items()]
+# Число различных кодов действий (карта × слот доски)
+ACTION_CODES = 52 * 13
+# Байты компактного ключа состояния (коды карт — 1..52)
+KEY_SEPARATOR = 0xFF
+EMPTY_SLOT = 0x80
+# Форматы вероятностей: float32 или квантованные целые (доля от максимума типа)
+PROB_DTYPES = ('float32', 'uint16', 'uint8')
+
+
+def encode_action(action: str) -> int:
+    """Кодирование действия 'Ah_top_0' в число: card * 13 + слот доски"""
+    card_str, row, pos = action.split('_')
+    return card_index(card_str) * 13 + ROW_SLOTS[row].start + int(pos)
+
+
+def encode_key(state_str: str) -> bytes:
+    """Компактный ключ состояния: улица, коды карт руки + 1, разделитель,
+    слоты доски (код + 1 или EMPTY_SLOT); нулевых байтов нет, поэтому ключ
+    не обрезается в массиве bytes
+    """
+    street, hand, placed = state_str.split('|')
+    cards = [card_index(hand[i:i + 2]) + 1 for i in range(0, len(hand), 2)]
+    slots = [EMPTY_SLOT if placed[i:i + 2] == '00' else card_index(placed[i:i + 2]) + 1
+             for i in range(0, len(placed), 2)]
+    return bytes([int(street)] + cards + [KEY_SEPARATOR] + slots)
+
+
+def decode_action(code: int) -> str:
+    """Обратное преобразование кода действия в строку"""
+    card, slot = divmod(int(code), 13)
+    row, start = next((row, start) for row, start in reversed(SLOT_ROWS) if slot >= start)
+    return f"{RANKS[card >> 2]}{SUITS[card & 3]}_{row}_{slot - start}"
+
+
+class PolicyStore:
+    """Усредненная стратегия в плоских массивах только для чтения
+
+    Ключи состояний отсортированы и ищутся бинарным поиском, действия и
+    вероятности лежат подряд по смещениям, лучшее действие каждого
+    состояния посчитано заранее. Вероятности хранятся как float32 или
+    квантованными (quantize). Массивы загружаются через mmap, поэтому
+    воркеры gunicorn делят одни и те же страницы памяти.
+    """
+
+    def __init__(self, keys: np.ndarray, offsets: np.ndarray,
+                 actions: np.ndarray, probs: np.ndarray, best: Optional[np.ndarray] = None):
+        self.keys = keys
+        self.offsets = offsets
+        self.actions = actions
+        self.probs = probs
+        self.best = best
+        # Хранилища прежнего формата содержат ключи-строки (начинаются с цифры улицы)
+        self.packed_keys = not len(keys) or keys[0][:1] < b'0'
+        # Квантованная вероятность — доля от максимума целого типа
+        self.scale = float(np.iinfo(probs.dtype).max) if probs.dtype.kind == 'u' else 1.0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @classmethod
+    def from_mccfr(cls, mccfr) -> 'PolicyStore':
+        """Построение хранилища из обученного MCCFR"""
+        return cls.from_strategies(
+            (state_str, node.get_average_strategy())
+            for state_str, node in mccfr.nodes.items()
+        )
+
+    @classmethod
+    def from_strategies(cls, strategies) -> 'PolicyStore':
+        """Построение хранилища из пар (состояние, стратегия)"""
+        items = sorted(((encode_key(state_str), strategy) for state_str, strategy in strategies
+                        if strategy), key=lambda item: item[0])
+        offsets = np.zeros(len(items) + 1, dtype=np.int64)
+        best = np.zeros(len(items), dtype=np.int16)
+        actions, probs = [], []
+        for i, (_, strategy) in enumerate(items):
+            actions.extend(encode_action(action) for action in strategy)
+            probs.extend(strategy.values())
+            offsets[i + 1] = len(actions)
+            best[i] = encode_action(max(strategy.items(), key=lambda x: x[1])[0])
+
+        keys = np.array([key for key, _ in items] or [b''], dtype=bytes)[:len(items)]
+        return cls(keys, offsets, np.array(actions, dtype=np.int16),
+                   np.array(probs, dtype=np.float32), best)
+
+    @classmethod
+    def from_json(cls, filepath: str) -> 'PolicyStore':
+        """Построение хранилища из ai_strategy.json"""
+        with open(filepath, 'r') as f:
+            data = json.load(f)
+        return cls.from_strategies(
+            (state_str, _average(node_data['strategy_sum']))
+            for state_str, node_data in data['nodes'].items()
+        )
+
+    def quantize(self, dtype: str = Config.POLICY_PROB_DTYPE) -> 'PolicyStore':
+        """Хранилище для сервинга с квантованными вероятностями
+
+        Вероятность записывается как round(p * max) целого типа dtype;
+        действия, вероятность которых округлилась до нуля, отбрасываются
+        (лучшее действие состояния сохраняется всегда).
+        """
+        if dtype not in PROB_DTYPES:
+            raise ValueError(f"Unknown probability type: {dtype}")
+        if self.probs.dtype.kind == 'u':
+            raise ValueError("Policy store is already quantized")
+        if dtype == 'float32':
+            return self
+        best = self.best if self.best is not None else self._best_actions()
+        scale = np.iinfo(dtype).max
+        quantized = np.rint(np.asarray(self.probs, dtype=np.float64) * scale)
+        state = self._entry_states()
+        keep = (quantized > 0) | (self.actions == best[state])
+        offsets = np.zeros(len(self.keys) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(state[keep], minlength=len(self.keys)), out=offsets[1:])
+        return PolicyStore(np.array(self.keys), offsets, np.array(self.actions[keep]),
+                           quantized[keep].astype(dtype), np.array(best))
+
+    def nbytes(self) -> int:
+        """Объем массивов хранилища"""
+        return sum(array.nbytes for array in (self.keys, self.offsets, self.actions,
+                                              self.probs, self.best) if array is not None)
+
+    def _entry_states(self) -> np.ndarray:
+        """Индекс состояния для каждой записи действия"""
+        return np.repeat(np.arange(len(self.keys)), np.diff(self.offsets))
+
+    def _best_actions(self) -> np.ndarray:
+        """Лучшее действие каждого состояния (для хранилищ без best)"""
+        best = np.zeros(len(self.keys), dtype=np.int16)
+        for index in range(len(self.keys)):
+            start, end = self.offsets[index], self.offsets[index + 1]
+            best[index] = self.actions[start + int(np.argmax(self.probs[start:end]))]
+        return best
+
+    def save(self, store_dir: str):
+        """Сохранение массивов (запись во временный каталог и атомарная замена файлов)"""
+        os.makedirs(store_dir, exist_ok=True)
+        for name in STORE_ARRAYS + OPTIONAL_ARRAYS:
+            if getattr(self, name) is None:
+                continue
+            path = os.path.join(store_dir, f"{name}.npy")
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, getattr(self, name))
+            os.replace(tmp_path, path)
+
+    def publish(self, link_path: str, keep: int = Config.POLICY_KEEP_VERSIONS) -> str:
+        """Публикация новой версии: запись в отдельный каталог и атомарная
+        замена символической ссылки link_path; возвращает имя версии
+
+        Воркеры, уже отобразившие прежнюю версию, продолжают ее читать;
+        удаление старых файлов не ломает их отображения.
+        """
+        versions_dir = f"{link_path}_versions"
+        os.makedirs(versions_dir, exist_ok=True)
+        existing = sorted(name for name in os.listdir(versions_dir) if name.startswith('v'))
+        version = f"v{int(existing[-1][1:]) + 1 if existing else 1:06d}"
+        self.save(os.path.join(versions_dir, version))
+
+        tmp_link = f"{link_path}.{os.getpid()}.tmp"
+        os.symlink(os.path.relpath(os.path.join(versions_dir, version), os.path.dirname(link_path)),
+                   tmp_link)
+        if os.path.isdir(link_path) and not os.path.islink(link_path):
+            # Каталог прежнего формата (без версий)
+            shutil.rmtree(link_path)
+        os.replace(tmp_link, link_path)
+
+        for name in (existing + [version])[:-keep]:
+            shutil.rmtree(os.path.join(versions_dir, name), ignore_errors=True)
+        return version
+
+    @classmethod
+    def load(cls, store_dir: str) -> 'PolicyStore':
+        """Загрузка хранилища через mmap (только чтение)"""
+        arrays = [np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode='r')
+                  for name in STORE_ARRAYS]
+        best_path = os.path.join(store_dir, 'best.npy')
+        best = np.load(best_path, mmap_mode='r') if os.path.exists(best_path) else None
+        return cls(*arrays, best)
+
+    @staticmethod
+    def exists(store_dir: str) -> bool:
+        """Проверка наличия всех файлов хранилища"""
+        return all(os.path.exists(os.path.join(store_dir, f"{name}.npy"))
+                   for name in STORE_ARRAYS)
+
+    def _find(self, state_str: str) -> int:
+        """Индекс состояния или -1"""
+        key = encode_key(state_str) if self.packed_keys else state_str.encode('ascii')
+        if not len(self.keys) or len(key) > self.keys.dtype.itemsize:
+            return -1
+        index = int(np.searchsorted(self.keys, key))
+        if index < len(self.keys) and self.keys[index] == key:
+            return index
+        return -1
+
+    def lookup(self, state_str: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Коды действий и вероятности для состояния"""
+        index = self._find(state_str)
+        if index < 0:
+            return None
+        start, end = self.offsets[index], self.offsets[index + 1]
+        probs = self.probs[start:end]
+        return self.actions[start:end], probs / self.scale if self.scale != 1.0 else probs
+
+    def get_strategy(self, state_str: str) -> Dict[str, float]:
+        """Усредненная стратегия состояния в виде словаря"""
+        found = self.lookup(state_str)
+        if found is None:
+            return {}
+        actions, probs = found
+        return {decode_action(code): float(prob) for code, prob in zip(actions, probs)}
+
+    def best_action(self, state_str: str) -> Optional[str]:
+        """Наиболее вероятное действие или None, если состояние не встречалось"""
+        if self.best is not None:
+            index = self._find(state_str)
+            return decode_action(self.best[index]) if index >= 0 else None
+        found = self.lookup(state_str)
+        if found is None or not len(found[0]):
+            return None
+        actions, probs = found
+        return decode_action(actions[int(np.argmax(probs))])
+
+
+def fidelity_report(reference: PolicyStore, served: PolicyStore) -> Dict:
+    """Расхождение хранилища сервинга с исходной стратегией
+
+    Для каждого состояния исходного хранилища сравниваются вероятности
+    действий (отброшенное действие считается нулевым) и лучшие действия.
+    """
+    count = len(reference.keys)
+    ref_state = reference._entry_states()
+    ref_probs = np.asarray(reference.probs, dtype=np.float64) / reference.scale
+
+    # Записи сервинга в нумерации состояний исходного хранилища
+    mapped = np.searchsorted(reference.keys, served.keys)
+    srv_pairs = mapped[served._entry_states()] * ACTION_CODES + served.actions
+    order = np.argsort(srv_pairs)
+    srv_pairs = srv_pairs[order]
+    srv_probs = (np.asarray(served.probs, dtype=np.float64) / served.scale)[order]
+
+    ref_pairs = ref_state * ACTION_CODES + reference.actions
+    position = np.minimum(np.searchsorted(srv_pairs, ref_pairs), max(len(srv_pairs) - 1, 0))
+    found = (srv_pairs[position] == ref_pairs) if len(srv_pairs) else np.zeros(len(ref_pairs), bool)
+    served_probs = np.where(found, srv_probs[position] if len(srv_probs) else 0.0, 0.0)
+    error = np.abs(ref_probs - served_probs)
+    variation = 0.5 * np.bincount(ref_state, weights=error, minlength=count)
+
+    ref_best = reference.best if reference.best is not None else reference._best_actions()
+    srv_best = served.best if served.best is not None else served._best_actions()
+    same_best = np.zeros(count, dtype=bool)
+    same_best[mapped] = srv_best == ref_best[mapped]
+    return {
+        'states': count,
+        'states_served': len(served.keys),
+        'actions': len(reference.actions),
+        'actions_served': len(served.actions),
+        'max_abs_error': float(error.max()) if len(error) else 0.0,
+        'mean_total_variation': float(variation.mean()) if count else 0.0,
+        'max_total_variation': float(variation.max()) if count else 0.0,
+        'best_action_agreement': float(same_best.mean()) if count else 1.0,
+        'bytes': reference.nbytes(),
+        'bytes_served': served.nbytes()
+    }
+
+
+def policy_version(link_path: str) -> Optional[str]:
+    """Имя опубликованной версии или None для каталога без версий"""
+    if os.path.islink(link_path):
+        return os.path.basename(os.readlink(link_path))
+    return None
+
+
+def _average(strategy_sum: Dict[str, float]) -> Dict[str, float]:
+    """Нормализация суммы стратегий (как MCCFRNode.get_average_strategy)"""
+    normalizing_sum = sum(strategy_sum.values())
+    if normalizing_sum > 0:
+        return {action: value / normalizing_sum for action, value in strategy_sum.items()}
+    return {action: 1.0 / len(strategy_sum) for action in strategy_sum}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export the serving policy and report its fidelity')
+    parser.add_argument('--source', default=Config.AI_STRATEGY_FILE, help='ai_strategy.json')
+    parser.add_argument('--dtype', default=Config.POLICY_PROB_DTYPE, choices=PROB_DTYPES)
+    parser.add_argument('--publish', action='store_true', help='опубликовать в POLICY_STORE_DIR')
+    args = parser.parse_args()
+
+    reference = PolicyStore.from_json(args.source)
+    served = reference.quantize(args.dtype)
+    report = fidelity_report(reference, served)
+    report['source_bytes'] = os.path.getsize(args.source)
+    for name, value in report.items():
+        print(f"{name}: {value}")
+    print(f"serving/source: {served.nbytes() / report['source_bytes']:.2%}")
+    if args.publish:
+        print(f"published: {served.publish(Config.POLICY_STORE_DIR)}")
+
+
+if __name__ == '__main__':
+    main()
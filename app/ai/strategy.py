@@ -1,26 +1,81 @@
 from typing import Dict, List, Optional
-from ..game.deck import Card
 from ..game.player import Player
 from ..game.scoring import calculate_score
+from ..game.cards import card_index, card_dict, intern_card
 from .mccfr import MCCFR, GameState
+from .policy_store import PolicyStore, policy_version
+from .checkpoint import CheckpointStore
+from .opening_book import OpeningBook, HAND_SIZE
+from config import Config
 import os
 import json
+import time
 
 class AIStrategy:
-    def __init__(self):
-        self.mccfr = MCCFR()
-        self.load_progress()
+    def __init__(self, use_policy_store: bool = True):
+        self.mccfr = MCCFR(nodes=self._node_store())
+        self.policy: Optional[PolicyStore] = None
+        self.policy_version: Optional[str] = None
+        self._use_policy_store = use_policy_store
+        self._policy_checked_at = time.monotonic()
+        self.opening_book: Optional[OpeningBook] = None
+        if OpeningBook.exists(Config.OPENING_BOOK_DIR):
+            self.opening_book = OpeningBook.load(Config.OPENING_BOOK_DIR)
+        if use_policy_store and PolicyStore.exists(Config.POLICY_STORE_DIR):
+            # Сервинг из общего хранилища без разбора JSON
+            self.policy_version = policy_version(Config.POLICY_STORE_DIR)
+            self.policy = PolicyStore.load(Config.POLICY_STORE_DIR)
+        else:
+            self.load_progress()
+            
+    def refresh_policy(self) -> bool:
+        """Подхват новой версии стратегии, опубликованной процессом обучения
+
+        Воркер, запущенный до первой публикации, открывает хранилище, как
+        только оно появится.
+        """
+        if not self._use_policy_store:
+            return False
+        now = time.monotonic()
+        if now - self._policy_checked_at < Config.POLICY_RELOAD_INTERVAL:
+            return False
+        self._policy_checked_at = now
+        version = policy_version(Config.POLICY_STORE_DIR)
+        if self.policy is not None and version == self.policy_version:
+            return False
+        if not PolicyStore.exists(Config.POLICY_STORE_DIR):
+            return False
+        self.policy = PolicyStore.load(Config.POLICY_STORE_DIR)
+        self.policy_version = version
+        return True
+        
+    def state_key(self, game_state: Dict) -> str:
+        """Ключ состояния стратегии для вида стола ИИ"""
+        return self._create_game_state(game_state).to_string()
         
-    def initialize(self):
-        """Инициализация стратегии"""
+    def initialize(self, iterations: int = Config.TRAIN_ITERATIONS):
+        """Инициализация стратегии (с продолжением прерванного обучения)"""
+        checkpoint = CheckpointStore(Config.CHECKPOINT_DIR)
+        resumed = MCCFR.resume(checkpoint, self._node_store())
+        if resumed is not None:
+            self.mccfr = resumed
         initial_state = self._get_initial_state()
-        self.mccfr.train(initial_state, iterations=1000)
+        self.mccfr.train(initial_state, iterations=max(iterations - self.mccfr.iteration, 0),
+                         checkpoint=checkpoint)
         self.save_progress()
         
     def make_move(self, game_state: Dict) -> Optional[Dict]:
         """Выполнение хода ИИ"""
+        move = self._opening_move(game_state)
+        if move is not None:
+            return move
+            
         state = self._create_game_state(game_state)
-        action = self.mccfr.get_action(state)
+        action = None
+        if self.policy is not None:
+            action = self.policy.best_action(state.to_string())
+        if not action:
+            action = self.mccfr.get_action(state)
         
         if not action:
             return None
@@ -35,8 +90,31 @@ class AIStrategy:
             'position': int(pos)
         }
         
+    def _opening_move(self, game_state: Dict) -> Optional[Dict]:
+        """Ход первой улицы по книге дебютов (без поиска)"""
+        if self.opening_book is None or game_state['current_street'] != 1:
+            return None
+        rows = {row: game_state[f'ai_{row}_row'] for row in ('top', 'middle', 'bottom')}
+        placed = [card for cards in rows.values() for card in cards if card]
+        hand = game_state['ai_cards']
+        if len(placed) + len(hand) != HAND_SIZE:
+            return None
+            
+        # Книга хранит раскладку всей руки улицы; уже выложенные карты — ее часть
+        plan = self.opening_book.lookup([card_index(card) for card in placed + hand])
+        if plan is None:
+            return None
+        for card, row in zip(hand, plan[len(placed):]):
+            if None in rows[row]:
+                return {
+                    'card': card_dict(card),
+                    'row': row,
+                    'position': rows[row].index(None)
+                }
+        return None
+        
     def _get_initial_state(self) -> GameState:
-        """Получение начального состояния игры"""
+        """Корень обучения: пустая доска и полная колода (раздачи сэмплирует MCCFR)"""
         return GameState(
             player_cards=[],
             placed_cards={
@@ -44,13 +122,13 @@ class AIStrategy:
                 'middle': [None] * 5,
                 'bottom': [None] * 5
             },
-            remaining_deck=[],
+            remaining_deck=[intern_card(code) for code in range(52)],
             current_street=1
         )
         
     def _create_game_state(self, game_state: Dict) -> GameState:
         """Создание состояния игры из словаря"""
-        player_cards = [Card(**card) for card in game_state['ai_cards']]
+        player_cards = [intern_card(card) for card in game_state['ai_cards']]
         
         placed_cards = {
             'top': [],
@@ -60,7 +138,7 @@ class AIStrategy:
         
         for row in placed_cards:
             cards = game_state[f'ai_{row}_row']
-            placed_cards[row] = [Card(**card) if card else None for card in cards]
+            placed_cards[row] = [intern_card(card) if card else None for card in cards]
             
         return GameState(
             player_cards=player_cards,
@@ -71,20 +149,44 @@ class AIStrategy:
         
     def save_progress(self):
         """Сохранение прогресса обучения"""
-        progress_dir = os.path.join(os.path.dirname(os.path.dirname(
-            os.path.dirname(__file__))), 'progress')
-            
-        if not os.path.exists(progress_dir):
-            os.makedirs(progress_dir)
-            
-        filepath = os.path.join(progress_dir, 'ai_strategy.json')
-        self.mccfr.save_progress(filepath)
+        os.makedirs(os.path.dirname(Config.AI_STRATEGY_FILE), exist_ok=True)
+        self.mccfr.save_progress(Config.AI_STRATEGY_FILE)
         
     def load_progress(self):
         """Загрузка прогресса обучения"""
-        progress_dir = os.path.join(os.path.dirname(os.path.dirname(
-            os.path.dirname(__file__))), 'progress')
-        filepath = os.path.join(progress_dir, 'ai_strategy.json')
+        if not os.path.exists(Config.AI_STRATEGY_FILE):
+            return
+        nodes = self._node_store()
+        if (nodes is not None and len(nodes) and
+                os.path.getmtime(Config.NODE_STORE_FILE) >= os.path.getmtime(Config.AI_STRATEGY_FILE)):
+            # Узлы уже на диске — JSON не разбирается
+            self.mccfr = MCCFR(nodes=nodes)
+            return
+        self.mccfr = MCCFR.load_progress(Config.AI_STRATEGY_FILE, nodes)
+        
+    def _node_store(self):
+        """Хранилище узлов с потолком памяти, если он задан"""
+        if not Config.NODE_STORE_MAX_MB:
+            return None
+        from .node_store import NodeStore
+        return NodeStore(Config.NODE_STORE_FILE, Config.NODE_STORE_MAX_MB * 1024 * 1024)
+        
+    def memory_stats(self) -> Dict:
+        """Статистика хранилища узлов (или размер таблицы в памяти)"""
+        if hasattr(self.mccfr.nodes, 'stats'):
+            return self.mccfr.nodes.stats()
+        return {'hot_nodes': len(self.mccfr.nodes), 'disk_nodes': 0}
+
+
+def build_policy_store(force: bool = False) -> Optional[PolicyStore]:
+    """Пересборка хранилища сервинга, если ai_strategy.json новее него"""
+    if not os.path.exists(Config.AI_STRATEGY_FILE):
+        return None
+        
+    marker = os.path.join(Config.POLICY_STORE_DIR, 'keys.npy')
+    if (not force and PolicyStore.exists(Config.POLICY_STORE_DIR) and
+            os.path.getmtime(marker) >= os.path.getmtime(Config.AI_STRATEGY_FILE)):
+        return PolicyStore.load(Config.POLICY_STORE_DIR)
         
-        if os.path.exists(filepath):
-            self.mccfr = MCCFR.load_progress(filepath)
+    PolicyStore.from_json(Config.AI_STRATEGY_FILE).quantize().publish(Config.POLICY_STORE_DIR)
+    return PolicyStore.load(Config.POLICY_STORE_DIR)
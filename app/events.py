@@ -0,0 +1,128 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Интервал комментария-пульса в потоке SSE, секунд
+HEARTBEAT_INTERVAL = 15
+
+
+class EventBroker:
+    """Локальный брокер событий игры (заглушка внешнего брокера)
+
+    Действия игроков выполняются в asyncio-цикле фонового потока: действия
+    одного канала (игры) по очереди, разных игр — параллельно. События
+    (раздача, ходы ИИ, итоговый счет) рассылаются подписчикам каналов через
+    потокобезопасные очереди.
+
+    Брокер живет в памяти процесса: действие и поток событий игры должны
+    приходить в один воркер (один воркер gunicorn или sticky-сессии по
+    game_id, который передается в строке запроса обоих эндпоинтов).
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        # Блокировки действий по каналам и число ожидающих их действий
+        self._action_locks: Dict[str, asyncio.Lock] = {}
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._subscribers: Dict[str, List[queue.Queue]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Запуск цикла событий в фоновом потоке"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_loop, args=(ready,), name='event-broker', daemon=True
+            )
+            self._thread.start()
+        ready.wait()
+
+    def _run_loop(self, ready: threading.Event):
+        """Тело фонового потока"""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        ready.set()
+        self._loop.run_forever()
+
+    def subscribe(self, channel: str) -> queue.Queue:
+        """Подписка на канал"""
+        events = queue.Queue()
+        with self._lock:
+            self._subscribers[channel].append(events)
+        return events
+
+    def unsubscribe(self, channel: str, events: queue.Queue):
+        """Отписка от канала"""
+        with self._lock:
+            if events in self._subscribers[channel]:
+                self._subscribers[channel].remove(events)
+            if not self._subscribers[channel]:
+                del self._subscribers[channel]
+
+    def stream_count(self) -> int:
+        """Число открытых потоков событий процесса"""
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, channel: str, event: str, data: Dict):
+        """Отправка события всем подписчикам канала (из любого потока)"""
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, []))
+        for events in subscribers:
+            events.put((event, data))
+
+    def submit(self, channel: str, action: Callable[[], Optional[Dict]],
+               on_result: Callable[[Dict], None]):
+        """Постановка действия в очередь цикла; запрос не ждет его выполнения"""
+        self.start()
+        asyncio.run_coroutine_threadsafe(self._execute(channel, action, on_result), self._loop)
+
+    async def _execute(self, channel: str, action: Callable[[], Optional[Dict]],
+                       on_result: Callable[[Dict], None]):
+        """Выполнение действия в пуле потоков цикла, по одному за раз на канал"""
+        # Словари меняются только в потоке цикла, поэтому без блокировки
+        lock = self._action_locks.get(channel)
+        if lock is None:
+            lock = self._action_locks[channel] = asyncio.Lock()
+        self._pending[channel] += 1
+        try:
+            async with lock:
+                try:
+                    result = await self._loop.run_in_executor(None, action)
+                    on_result(result)
+                except Exception as e:
+                    logger.error(f"Error executing action: {str(e)}")
+                    self.publish(channel, 'error', {'error': str(e)})
+        finally:
+            self._pending[channel] -= 1
+            if not self._pending[channel]:
+                del self._pending[channel]
+                del self._action_locks[channel]
+
+    def stream(self, channel: str) -> Iterator[str]:
+        """Поток Server-Sent Events для канала"""
+        events = self.subscribe(channel)
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                try:
+                    event, data = events.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ': heartbeat\n\n'
+                    continue
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        finally:
+            self.unsubscribe(channel, events)
+
+
+# Глобальный брокер процесса
+broker = EventBroker()
@@ -0,0 +1,92 @@
+"""Колода в массиве NumPy для стола и симуляций.
+
+Порядок карт — перестановка кодов 0..51 (int8), раздача — сдвиг позиции
+без копирования. Генератор колоды создается из зерна игры, поэтому игра
+воспроизводится по зерну (и восстанавливается после загрузки по числу
+перетасовок и позиции). Для розыгрышей Монте-Карло отдельный поток того же
+зерна выдает пачки независимых достроек из живых карт (не розданных и не
+отмеченных мертвыми) без создания объектов Card.
+"""
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from .cards import card_index, intern_card
+
+DECK_SIZE = 52
+
+
+class ArrayDeck:
+    def __init__(self, seed: Optional[int] = None):
+        sequence = np.random.SeedSequence(seed)
+        self.seed: int = sequence.entropy
+        game, simulation = sequence.spawn(2)
+        self._rng = np.random.default_rng(game)
+        self._sim_rng = np.random.default_rng(simulation)
+        self.cards = np.empty(0, dtype=np.int8)
+        self.dead = np.zeros(DECK_SIZE, dtype=bool)
+        self.position = 0
+        self.shuffles = 0
+        self.reset()
+
+    def reset(self):
+        """Перетасовка полной колоды"""
+        # Новый массив: ранее розданные срезы прежней колоды не меняются
+        self.cards = self._rng.permutation(DECK_SIZE).astype(np.int8)
+        self.dead[:] = False
+        self.position = 0
+        self.shuffles += 1
+
+    def __len__(self) -> int:
+        return len(self.live())
+
+    def deal_codes(self, count: int) -> np.ndarray:
+        """Следующие count живых карт колоды (коды); мертвые пропускаются"""
+        rest = self.cards[self.position:]
+        if not self.dead.any():
+            if count > len(rest):
+                raise ValueError(f"Not enough cards in deck: {count} > {len(rest)}")
+            self.position += count
+            return rest[:count]
+        live = np.flatnonzero(~self.dead[rest])
+        if count > len(live):
+            raise ValueError(f"Not enough cards in deck: {count} > {len(live)}")
+        cards = rest[live[:count]]
+        self.position += int(live[count - 1]) + 1 if count else 0
+        return cards
+
+    def deal(self, count: int) -> List:
+        """Следующие count карт колоды в виде объектов Card (для стола)"""
+        return [intern_card(int(code)) for code in self.deal_codes(count)]
+
+    def kill(self, cards: Iterable):
+        """Отметка карт, известных вне колоды (коды, Card или словари)"""
+        self.dead[[card_index(card) for card in cards]] = True
+
+    def live(self) -> np.ndarray:
+        """Коды карт, которые еще могут прийти: не розданы и не мертвы"""
+        rest = self.cards[self.position:]
+        return rest[~self.dead[rest]]
+
+    def completions(self, samples: int, count: int,
+                    rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """samples независимых наборов по count живых карт без повторов: (samples, count)"""
+        live = self.live()
+        if count > len(live):
+            raise ValueError(f"Not enough live cards: {count} > {len(live)}")
+        rng = rng or self._sim_rng
+        order = np.argsort(rng.random((samples, len(live))), axis=1)[:, :count]
+        return live[order]
+
+    def state(self) -> Dict:
+        """Данные для восстановления колоды после загрузки игры"""
+        return {'seed': self.seed, 'shuffles': self.shuffles, 'position': self.position,
+                'dead': np.flatnonzero(self.dead).tolist()}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'ArrayDeck':
+        """Колода, повторенная по зерну до сохраненной позиции"""
+        deck = cls(state['seed'])
+        for _ in range(state['shuffles'] - 1):
+            deck.reset()
+        deck.position = state['position']
+        deck.dead[state.get('dead', [])] = True
+        return deck
@@ -0,0 +1,198 @@
+"""Границы силы незаполненных рядов для раннего обнаружения мертвой руки.
+
+Сила ряда может только вырасти при добавлении карт: нижняя граница — сила
+уже выложенных карт (категория и ранги без недостающих кикеров), верхняя —
+лучшая категория, достижимая на свободных слотах (без учета вышедших карт).
+Если нижняя граница ряда выше верхней границы следующего ряда, доска
+мертва при любом продолжении.
+
+Сводки рядов (RowSummary, BoardSummary) хранят эти границы вместе с
+роялти и обновляются при выкладке каждой карты пересчетом одного ряда, так
+что проверка расклада, мертвой руки и предварительных роялти не требует
+оценки всей доски.
+"""
+from typing import Dict, Optional, Sequence, Tuple
+from .cards import card_index
+from .evaluator import (
+    ROWS, ROW_SLOTS, CATEGORIES, CATEGORY_BASE, HIGH_CARD, PAIR, TWO_PAIRS, THREE_OF_KIND,
+    STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH,
+    row_strength, row_royalty, tables
+)
+
+ROW_SIZES = {row: ROW_SLOTS[row].stop - ROW_SLOTS[row].start for row in ROWS}
+
+# Окна рангов стрита (A может быть младшей картой)
+_STRAIGHT_WINDOWS = [set(range(low, low + 5)) for low in range(9)] + [{12, 0, 1, 2, 3}]
+_ROYAL_WINDOW = _STRAIGHT_WINDOWS[8]
+
+Bounds = Tuple[int, int]
+
+
+def _made(ranks: Sequence[int]) -> Tuple[int, int]:
+    """Категория выложенных карт и их ранги, упакованные как кикеры"""
+    counts = {rank: ranks.count(rank) for rank in ranks}
+    ordered = sorted(ranks, key=lambda rank: (counts[rank], rank), reverse=True)
+    packed = sum(rank * 13 ** (4 - i) for i, rank in enumerate(ordered))
+    groups = sorted(counts.values(), reverse=True)
+    if groups[0] == 4:
+        category = FOUR_OF_KIND
+    elif groups[0] == 3:
+        category = FULL_HOUSE if len(groups) > 1 and groups[1] == 2 else THREE_OF_KIND
+    elif groups[0] == 2:
+        category = TWO_PAIRS if len(groups) > 1 and groups[1] == 2 else PAIR
+    else:
+        category = HIGH_CARD
+    return category, packed
+
+
+def _reachable(row: str, codes: Sequence[int]) -> int:
+    """Лучшая категория, достижимая добавлением карт на свободные слоты"""
+    ranks = [code >> 2 for code in codes]
+    free = ROW_SIZES[row] - len(codes)
+    distinct = set(ranks)
+    most = max((ranks.count(rank) for rank in distinct), default=0)
+    if row == 'top':
+        if len(distinct) <= 1:
+            return THREE_OF_KIND
+        return PAIR if len(distinct) <= 2 else HIGH_CARD
+
+    suited = len({code & 3 for code in codes}) <= 1
+    windows = [window for window in _STRAIGHT_WINDOWS
+               if len(distinct) == len(ranks) and distinct <= window]
+    if suited and windows:
+        return ROYAL_FLUSH if _ROYAL_WINDOW in windows else STRAIGHT_FLUSH
+    if most + free >= 4 and len(distinct) <= 2:
+        return FOUR_OF_KIND
+    if len(distinct) <= 2:
+        return FULL_HOUSE
+    if suited:
+        return FLUSH
+    if windows:
+        return STRAIGHT
+    if most + free >= 3 and len(distinct) <= 3:
+        return THREE_OF_KIND
+    if len(distinct) <= 3:
+        return TWO_PAIRS
+    return PAIR if len(distinct) <= 4 else HIGH_CARD
+
+
+def row_bounds(row: str, codes: Sequence[int]) -> Bounds:
+    """Нижняя и верхняя граница силы ряда с выложенными картами codes"""
+    if len(codes) == ROW_SIZES[row]:
+        strength = row_strength(codes)
+        return strength, strength
+    if not codes:
+        return 0, (_reachable(row, codes) + 1) * CATEGORY_BASE - 1
+    category, packed = _made([code >> 2 for code in codes])
+    return category * CATEGORY_BASE + packed, (_reachable(row, codes) + 1) * CATEGORY_BASE - 1
+
+
+def board_bounds(rows: Dict[str, Sequence[int]]) -> Dict[str, Bounds]:
+    return {row: row_bounds(row, rows[row]) for row in ROWS}
+
+
+def doomed(bounds: Dict[str, Bounds]) -> bool:
+    """Доска мертва при любом заполнении свободных слотов"""
+    return bounds['top'][0] > bounds['middle'][1] or bounds['middle'][0] > bounds['bottom'][1]
+
+
+def doomed_with(bounds: Dict[str, Bounds], row: str, row_bound: Bounds) -> bool:
+    """Проверка доски после замены границ одного ряда"""
+    return doomed({**bounds, row: row_bound})
+
+
+def _made_royalty(row: str, codes: Sequence[int], low: int) -> int:
+    """Роялти, уже гарантированные выложенными картами ряда"""
+    if len(codes) == ROW_SIZES[row]:
+        return row_royalty(row, codes)
+    category = low // CATEGORY_BASE
+    if row != 'top':
+        return int(tables()['category_royalty'][category])
+    if category != PAIR:
+        return 0
+    # Роялти верхней пары не зависят от кикера: достраивается любой другой ранг
+    pair = low // 13 ** 4 % 13
+    kicker = 0 if pair else 4
+    return row_royalty(row, [pair * 4, pair * 4, kicker])
+
+
+class RowSummary:
+    """Выложенные карты ряда, границы его силы и роялти (неизменяемая)"""
+    __slots__ = ('row', 'codes', 'low', 'high', 'royalty')
+
+    def __init__(self, row: str, codes: Sequence[int] = ()):
+        self.row = row
+        self.codes = tuple(codes)
+        self.low, self.high = row_bounds(row, self.codes)
+        self.royalty = _made_royalty(row, self.codes, self.low) if self.codes else 0
+
+    @property
+    def complete(self) -> bool:
+        return len(self.codes) == ROW_SIZES[self.row]
+
+    @property
+    def category(self) -> Optional[str]:
+        """Комбинация выложенных карт (для полного ряда — итоговая)"""
+        return CATEGORIES[self.low // CATEGORY_BASE] if self.codes else None
+
+    def add(self, code: int) -> 'RowSummary':
+        """Сводка после выкладки карты; ряд не больше 5 карт, поэтому O(1)"""
+        return RowSummary(self.row, self.codes + (code,))
+
+    def to_dict(self) -> Dict:
+        return {'count': len(self.codes), 'complete': self.complete,
+                'category': self.category, 'royalty': self.royalty}
+
+
+class BoardSummary:
+    """Сводки трех рядов места и маска выложенных карт"""
+    __slots__ = ('rows', 'mask', 'valid')
+
+    def __init__(self, rows: Optional[Dict[str, RowSummary]] = None, mask: int = 0, valid: bool = True):
+        self.rows = rows or {row: RowSummary(row) for row in ROWS}
+        self.mask = mask
+        self.valid = valid
+
+    @classmethod
+    def from_rows(cls, rows: Dict[str, Sequence]) -> 'BoardSummary':
+        """Сводка по рядам карт (Card, словари или коды; пустые слоты — None)"""
+        board = cls()
+        for row in ROWS:
+            for card in rows[row]:
+                if card is not None:
+                    board = board.place(row, card_index(card))
+        return board
+
+    def place(self, row: str, code: int) -> 'BoardSummary':
+        """Новая сводка с картой в ряду; повтор карты или переполнение ряда — invalid"""
+        summary = self.rows[row]
+        bit = 1 << code
+        if not self.valid or self.mask & bit or summary.complete:
+            return BoardSummary(self.rows, self.mask | bit, False)
+        return BoardSummary({**self.rows, row: summary.add(code)}, self.mask | bit)
+
+    @property
+    def bounds(self) -> Dict[str, Bounds]:
+        return {row: (summary.low, summary.high) for row, summary in self.rows.items()}
+
+    @property
+    def complete(self) -> bool:
+        return all(summary.complete for summary in self.rows.values())
+
+    @property
+    def fouled(self) -> bool:
+        """Мертвая рука при любом заполнении (для полной доски — обычная проверка)"""
+        return doomed(self.bounds)
+
+    @property
+    def royalties(self) -> int:
+        """Сумма гарантированных роялти; у мертвой руки их нет"""
+        return 0 if self.fouled else sum(summary.royalty for summary in self.rows.values())
+
+    def to_dict(self) -> Dict:
+        return {
+            'valid': self.valid,
+            'fouled': self.fouled,
+            'royalties': self.royalties,
+            'rows': {row: summary.to_dict() for row, summary in self.rows.items()}
+        }
@@ -0,0 +1,69 @@
+from typing import Dict, Iterable, List
+
+# Кодирование карт: code = rank_index * 4 + suit_index (0..51)
+RANKS = '23456789TJQKA'
+SUITS = 'hdcs'
+
+RANK_INDEX = {rank: i for i, rank in enumerate(RANKS)}
+RANK_INDEX['10'] = RANK_INDEX['T']
+SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+SUIT_INDEX.update({'hearts': 0, 'diamonds': 1, 'clubs': 2, 'spades': 3,
+                   '♥': 0, '♦': 1, '♣': 2, '♠': 3})
+
+
+def card_index(card) -> int:
+    """Код карты 0..51 для объекта Card, словаря, строки вида 'Ah' или числа"""
+    # Общие объекты карт (intern_card) живут всегда, поэтому их id уникальны
+    code = _CARD_CODES.get(id(card))
+    if code is not None:
+        return code
+    if isinstance(card, str):
+        rank, suit = card[:-1], card[-1]
+    elif isinstance(card, dict):
+        rank, suit = card['rank'], card['suit']
+    elif hasattr(card, 'rank'):
+        rank, suit = card.rank, card.suit
+    else:
+        return int(card)
+    return RANK_INDEX[str(rank)] * 4 + SUIT_INDEX[str(suit)]
+
+
+def card_codes(cards: Iterable) -> List[int]:
+    """Коды карт ряда (пустые слоты пропускаются)"""
+    return [card_index(card) for card in cards if card is not None]
+
+
+def card_code(card) -> str:
+    """Двухсимвольный код карты, например 'Ah'"""
+    code = card_index(card)
+    return RANKS[code >> 2] + SUITS[code & 3]
+
+
+def card_dict(code) -> Dict[str, str]:
+    """Словарь карты {'rank', 'suit'} по коду"""
+    index = card_index(code)
+    return {'rank': RANKS[index >> 2], 'suit': SUITS[index & 3]}
+
+
+# Общие объекты 52 карт и их словари (создаются один раз при первом обращении)
+_CARDS: List = []
+_CARD_CODES: Dict[int, int] = {}
+_CARD_DICTS: List[Dict[str, str]] = [card_dict(code) for code in range(52)]
+
+
+def intern_card(card):
+    """Общий объект Card для карты (Card, словарь, строка 'Ah' или код)
+
+    Карты неизменяемы, поэтому все места хранят одни и те же 52 объекта и
+    могут сравнивать их по идентичности (is).
+    """
+    if not _CARDS:
+        from .deck import Card
+        _CARDS.extend(Card(RANKS[code >> 2], SUITS[code & 3]) for code in range(52))
+        _CARD_CODES.update((id(card), code) for code, card in enumerate(_CARDS))
+    return _CARDS[card_index(card)]
+
+
+def cached_card_dict(card) -> Dict[str, str]:
+    """Общий словарь карты для ответов API (не изменять)"""
+    return _CARD_DICTS[card_index(card)]
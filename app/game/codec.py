@@ -0,0 +1,54 @@
+from typing import Any, Dict
+from .cards import card_code, card_dict
+
+# Маркер компактного формата в сохраненных состояниях
+COMPACT_ENCODING = 'compact-v1'
+
+
+def _is_card(value: Any) -> bool:
+    """Словарь карты вида {'rank': ..., 'suit': ...}"""
+    return isinstance(value, dict) and value.keys() == {'rank', 'suit'}
+
+
+def _is_card_field(key: str) -> bool:
+    """Поля состояния, содержащие карты"""
+    return key == 'cards' or key.endswith('_cards') or key.endswith('_row')
+
+
+def compact_state(state: Any) -> Any:
+    """Компактное представление состояния: карты как коды 'Ah', ряды как массивы"""
+    if _is_card(state):
+        return card_code(state)
+    if isinstance(state, dict):
+        return {key: compact_state(value) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return [compact_state(value) for value in state]
+    return state
+
+
+def expand_state(state: Any, card_field: bool = False) -> Any:
+    """Обратное преобразование compact_state"""
+    if isinstance(state, dict):
+        return {key: expand_state(value, isinstance(key, str) and _is_card_field(key))
+                for key, value in state.items()}
+    if isinstance(state, list):
+        return [expand_state(value, card_field) for value in state]
+    if card_field and isinstance(state, str):
+        return card_dict(state)
+    return state
+
+
+def encode_saved_state(state: Dict) -> Dict:
+    """Состояние для записи на диск"""
+    encoded = compact_state(state)
+    encoded['encoding'] = COMPACT_ENCODING
+    return encoded
+
+
+def decode_saved_state(state: Dict) -> Dict:
+    """Состояние после чтения с диска (старые сохранения возвращаются как есть)"""
+    if state.get('encoding') != COMPACT_ENCODING:
+        return state
+    decoded = expand_state(state)
+    del decoded['encoding']
+    return decoded
@@ -0,0 +1,62 @@
+import random
+from typing import Dict, List
+from .cards import RANKS, SUITS, intern_card
+
+
+class Card:
+    """Игральная карта (неизменяемая)
+
+    Общие объекты 52 карт создает cards.intern_card; новые Card нужны только
+    там, где карта приходит извне (словарь клиента, строка сохранения).
+    """
+    __slots__ = ('rank', 'suit')
+
+    def __init__(self, rank: str, suit: str):
+        if rank == '10':
+            rank = 'T'
+        if rank not in RANKS or suit not in SUITS:
+            raise ValueError(f"Invalid card: {rank}{suit}")
+        object.__setattr__(self, 'rank', rank)
+        object.__setattr__(self, 'suit', suit)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Card is immutable')
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Card) and self.rank == other.rank and self.suit == other.suit
+
+    def __hash__(self) -> int:
+        return hash((self.rank, self.suit))
+
+    def __repr__(self) -> str:
+        return f"{self.rank}{self.suit}"
+
+    def to_dict(self) -> Dict[str, str]:
+        return {'rank': self.rank, 'suit': self.suit}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> 'Card':
+        return intern_card(data)
+
+
+class Deck:
+    """Колода из общих объектов карт на списке (стол использует ArrayDeck)"""
+
+    def __init__(self):
+        self.cards: List[Card] = []
+        self.reset()
+
+    def reset(self):
+        """Перетасовка полной колоды"""
+        self.cards = [intern_card(code) for code in range(len(RANKS) * len(SUITS))]
+        random.shuffle(self.cards)
+
+    def deal(self, count: int) -> List[Card]:
+        """Раздача count карт с верха колоды"""
+        if count > len(self.cards):
+            raise ValueError(f"Not enough cards: {count} > {len(self.cards)}")
+        dealt, self.cards = self.cards[:count], self.cards[count:]
+        return dealt
+
+    def __len__(self) -> int:
+        return len(self.cards)
@@ -0,0 +1,6 @@
+class ConflictError(Exception):
+    """Запрос к устаревшей версии стола или стол занят другим запросом"""
+
+    def __init__(self, message: str, version: int):
+        super().__init__(message)
+        self.version = version
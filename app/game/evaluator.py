@@ -0,0 +1,297 @@
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from config import Config
+from .cards import RANKS, SUITS, RANK_INDEX, SUIT_INDEX, card_index, card_codes
+
+ROWS = ('top', 'middle', 'bottom')
+
+# Категории комбинаций по возрастанию силы
+CATEGORIES = (
+    'high_card', 'pair', 'two_pairs', 'three_of_kind', 'straight',
+    'flush', 'full_house', 'four_of_kind', 'straight_flush', 'royal_flush'
+)
+HIGH_CARD, PAIR, TWO_PAIRS, THREE_OF_KIND, STRAIGHT, FLUSH, \
+    FULL_HOUSE, FOUR_OF_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH = range(len(CATEGORIES))
+
+# Сила руки: category * CATEGORY_BASE + кикеры в системе счисления по основанию 13
+CATEGORY_BASE = 13 ** 5
+TOP_SIZE = 13 ** 3
+FIVE_SIZE = 13 ** 5
+
+TABLES_VERSION = 1
+
+
+def top_index(codes: Sequence[int]) -> int:
+    """Индекс 3-карточного верхнего ряда в TOP_* таблицах"""
+    return (codes[0] >> 2) + 13 * (codes[1] >> 2) + 169 * (codes[2] >> 2)
+
+
+def five_index(codes: Sequence[int]) -> Tuple[int, int]:
+    """Индекс 5-карточного ряда в FIVE_* таблицах: (флеш, ранги)"""
+    index = 0
+    for code in reversed(codes):
+        index = index * 13 + (code >> 2)
+    suit = codes[0] & 3
+    is_flush = int(all((code & 3) == suit for code in codes))
+    return is_flush, index
+
+
+def _rank_digits(size: int, length: int) -> np.ndarray:
+    """Все упорядоченные наборы рангов длины length"""
+    index = np.arange(size, dtype=np.int64)
+    return np.stack([(index // 13 ** k) % 13 for k in range(length)], axis=1)
+
+
+def _pack_kickers(ranks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Количество повторов рангов и упакованные кикеры (пары впереди)"""
+    counts = (ranks[:, :, None] == np.arange(13)).sum(axis=1)
+    per_card = np.take_along_axis(counts, ranks, axis=1)
+    keys = -np.sort(-(per_card * 16 + ranks), axis=1)
+    ordered = keys % 16
+    packed = np.zeros(len(ranks), dtype=np.int64)
+    for i in range(ranks.shape[1]):
+        packed += ordered[:, i] * 13 ** (4 - i)
+    return counts, packed
+
+
+def _build_top_tables() -> Dict[str, np.ndarray]:
+    """Сила, роялти и фантазия для каждого верхнего ряда"""
+    ranks = _rank_digits(TOP_SIZE, 3)
+    counts, kickers = _pack_kickers(ranks)
+    max_count = counts.max(axis=1)
+
+    category = np.full(TOP_SIZE, HIGH_CARD, dtype=np.int64)
+    category[max_count == 2] = PAIR
+    category[max_count == 3] = THREE_OF_KIND
+
+    made_rank = counts.argmax(axis=1)
+    royalty = np.zeros(TOP_SIZE, dtype=np.int8)
+    fantasy = np.zeros(TOP_SIZE, dtype=np.int8)
+    for rank_idx, rank in enumerate(RANKS):
+        for cards, combo in ((2, PAIR), (3, THREE_OF_KIND)):
+            mask = (category == combo) & (made_rank == rank_idx)
+            royalty[mask] = Config.TOP_LINE_BONUSES.get(rank * cards, 0)
+            if combo == THREE_OF_KIND:
+                fantasy[mask] = Config.FANTASY_TRIPS_CARDS
+            else:
+                fantasy[mask] = Config.FANTASY_CARDS.get(rank * cards, 0)
+
+    return {
+        'top_strength': (category * CATEGORY_BASE + kickers).astype(np.int32),
+        'top_royalty': royalty,
+        'top_fantasy': fantasy,
+    }
+
+
+def _build_five_tables() -> Dict[str, np.ndarray]:
+    """Сила и роялти для каждого 5-карточного ряда (без флеша и с флешем)"""
+    ranks = _rank_digits(FIVE_SIZE, 5)
+    counts, kickers = _pack_kickers(ranks)
+    max_count = counts.max(axis=1)
+    pairs = (counts == 2).sum(axis=1)
+    distinct = max_count == 1
+
+    low = ranks.min(axis=1)
+    high = ranks.max(axis=1)
+    wheel = distinct & (high == 12) & (np.sort(ranks, axis=1)[:, 3] == 3)
+    straight = distinct & ((high - low == 4) | wheel)
+    straight_kicker = np.where(wheel, 3, high) * 13 ** 4
+
+    category = np.full(FIVE_SIZE, HIGH_CARD, dtype=np.int64)
+    category[pairs == 1] = PAIR
+    category[pairs == 2] = TWO_PAIRS
+    category[max_count == 3] = THREE_OF_KIND
+    category[(max_count == 3) & (pairs == 1)] = FULL_HOUSE
+    category[max_count == 4] = FOUR_OF_KIND
+    category[straight] = STRAIGHT
+
+    plain = category * CATEGORY_BASE + np.where(straight, straight_kicker, kickers)
+    plain[max_count > 4] = -1
+
+    flush_category = np.where(straight, STRAIGHT_FLUSH, FLUSH)
+    flush_category[straight & ~wheel & (high == 12)] = ROYAL_FLUSH
+    flush = flush_category * CATEGORY_BASE + np.where(straight, straight_kicker, kickers)
+    flush[~distinct] = -1
+
+    strength = np.stack([plain, flush]).astype(np.int32)
+    category_royalty = np.array(
+        [Config.COMBINATIONS_SCORES.get(name, 0) for name in CATEGORIES], dtype=np.int8
+    )
+    royalty = np.where(strength >= 0, category_royalty[strength // CATEGORY_BASE], 0)
+
+    return {
+        'five_strength': strength,
+        'five_royalty': royalty.astype(np.int8),
+        'category_royalty': category_royalty,
+    }
+
+
+def build_tables() -> Dict[str, np.ndarray]:
+    """Генерация всех таблиц оценки"""
+    tables = _build_top_tables()
+    tables.update(_build_five_tables())
+    tables['version'] = np.array([TABLES_VERSION], dtype=np.int32)
+    return tables
+
+
+def load_tables(cache_dir: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Загрузка таблиц из кэша через mmap или генерация с сохранением в кэш
+
+    Таблицы в кэше отображаются в память только для чтения: страницы общие
+    для всех процессов и не копируются после fork.
+    """
+    cache_dir = cache_dir or Config.EVALUATOR_CACHE
+    if cache_dir and os.path.isdir(cache_dir):
+        try:
+            tables = {
+                filename[:-4]: np.load(os.path.join(cache_dir, filename), mmap_mode='r')
+                for filename in os.listdir(cache_dir) if filename.endswith('.npy')
+            }
+            if int(tables['version'][0]) == TABLES_VERSION:
+                return tables
+        except (OSError, ValueError, KeyError):
+            pass
+
+    tables = build_tables()
+    if cache_dir:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            for name, array in tables.items():
+                path = os.path.join(cache_dir, f"{name}.npy")
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    np.save(f, array)
+                os.replace(tmp_path, path)
+        except OSError:
+            pass
+    return tables
+
+
+_TABLES: Optional[Dict[str, np.ndarray]] = None
+_TABLE_NAMES = {
+    'TOP_STRENGTH': 'top_strength',
+    'TOP_ROYALTY': 'top_royalty',
+    'TOP_FANTASY': 'top_fantasy',
+    'FIVE_STRENGTH': 'five_strength',
+    'FIVE_ROYALTY': 'five_royalty',
+    'CATEGORY_ROYALTY': 'category_royalty',
+}
+
+
+def tables() -> Dict[str, np.ndarray]:
+    """Таблицы оценки (загружаются при первом обращении)"""
+    global _TABLES
+    if _TABLES is None:
+        _TABLES = load_tables()
+    return _TABLES
+
+
+def __getattr__(name: str):
+    """Ленивый доступ к таблицам как к атрибутам модуля (TOP_STRENGTH и т.д.)"""
+    if name in _TABLE_NAMES:
+        return tables()[_TABLE_NAMES[name]]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def row_strength(codes: Sequence[int]) -> int:
+    """Сила ряда; -1 для незаполненного ряда"""
+    if len(codes) == 3:
+        return int(tables()['top_strength'][top_index(codes)])
+    if len(codes) == 5:
+        is_flush, index = five_index(codes)
+        return int(tables()['five_strength'][is_flush, index])
+    return -1
+
+
+def row_royalty(row: str, codes: Sequence[int]) -> int:
+    """Роялти за ряд"""
+    if row == 'top':
+        return int(tables()['top_royalty'][top_index(codes)]) if len(codes) == 3 else 0
+    if len(codes) != 5:
+        return 0
+    is_flush, index = five_index(codes)
+    return int(tables()['five_royalty'][is_flush, index])
+
+
+def fantasy_cards(top_codes: Sequence[int]) -> int:
+    """Количество карт фантазии за верхний ряд (0 — фантазии нет)"""
+    if len(top_codes) != 3:
+        return 0
+    return int(tables()['top_fantasy'][top_index(top_codes)])
+
+
+def category_name(strength: int) -> str:
+    """Название комбинации по силе"""
+    if strength < 0:
+        return 'incomplete'
+    return CATEGORIES[strength // CATEGORY_BASE]
+
+
+def board_codes(player) -> Dict[str, List[int]]:
+    """Коды карт по рядам для объекта с атрибутами *_row"""
+    return {row: card_codes(getattr(player, f"{row}_row")) for row in ROWS}
+
+
+def board_royalties(rows: Dict[str, Sequence[int]]) -> Dict[str, int]:
+    """Роялти по рядам"""
+    return {row: row_royalty(row, rows[row]) for row in ROWS}
+
+
+def is_fouled(rows: Dict[str, Sequence[int]]) -> bool:
+    """Проверка мертвой руки (нарушен порядок силы рядов)"""
+    top = row_strength(rows['top'])
+    middle = row_strength(rows['middle'])
+    bottom = row_strength(rows['bottom'])
+    return top > middle or middle > bottom
+
+
+# Раскладка доски из 13 слотов: top 0..2, middle 3..7, bottom 8..12
+ROW_SLOTS = {'top': slice(0, 3), 'middle': slice(3, 8), 'bottom': slice(8, 13)}
+BOARD_SIZE = 13
+EMPTY = -1
+_TOP_POWERS = 13 ** np.arange(3)
+_FIVE_POWERS = 13 ** np.arange(5)
+
+
+def board_array(rows: Dict[str, Sequence]) -> List[int]:
+    """Доска в виде 13 кодов (EMPTY для пустого слота)"""
+    board = []
+    for row in ROWS:
+        cards = list(rows[row])
+        size = ROW_SLOTS[row].stop - ROW_SLOTS[row].start
+        cards += [None] * (size - len(cards))
+        board.extend(card_index(card) if card is not None else EMPTY for card in cards)
+    return board
+
+
+def _lookup_rows(codes: np.ndarray, strength_table: np.ndarray,
+                 royalty_table: np.ndarray, powers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Векторный поиск силы и роялти для рядов одной длины"""
+    complete = (codes >= 0).all(axis=1)
+    safe = np.where(codes >= 0, codes, 0)
+    index = ((safe >> 2) * powers).sum(axis=1)
+    if strength_table.ndim == 2:
+        suits = safe & 3
+        is_flush = (suits == suits[:, :1]).all(axis=1).astype(np.intp)
+        strength = strength_table[is_flush, index]
+        royalty = royalty_table[is_flush, index]
+    else:
+        strength = strength_table[index]
+        royalty = royalty_table[index]
+    return np.where(complete, strength, -1), np.where(complete, royalty, 0)
+
+
+def evaluate_boards(boards: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Сила и роялти рядов для пачки досок (N, 13) -> (N, 3), (N, 3)"""
+    boards = np.asarray(boards, dtype=np.int16).reshape(-1, BOARD_SIZE)
+    table = tables()
+    top = _lookup_rows(boards[:, ROW_SLOTS['top']], table['top_strength'],
+                       table['top_royalty'], _TOP_POWERS)
+    middle = _lookup_rows(boards[:, ROW_SLOTS['middle']], table['five_strength'],
+                          table['five_royalty'], _FIVE_POWERS)
+    bottom = _lookup_rows(boards[:, ROW_SLOTS['bottom']], table['five_strength'],
+                          table['five_royalty'], _FIVE_POWERS)
+    strengths = np.stack([top[0], middle[0], bottom[0]], axis=1).astype(np.int32)
+    royalties = np.stack([top[1], middle[1], bottom[1]], axis=1).astype(np.int16)
+    return strengths, royalties
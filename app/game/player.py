@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional
+from config import Config
+from .cards import cached_card_dict
+from .deck import Card
+
+ROW_SIZES = {
+    'top': Config.TOP_ROW_SIZE,
+    'middle': Config.MIDDLE_ROW_SIZE,
+    'bottom': Config.BOTTOM_ROW_SIZE
+}
+
+
+class Player:
+    """Место за столом: карты на руке и три ряда фиксированной длины (None — пустой слот)"""
+    __slots__ = ('is_ai', 'current_hand', 'top_row', 'middle_row', 'bottom_row')
+
+    def __init__(self, is_ai: bool = False):
+        self.is_ai = is_ai
+        self.reset()
+
+    def reset(self):
+        """Пустая рука и пустые ряды"""
+        self.current_hand: List[Card] = []
+        self.top_row: List[Optional[Card]] = [None] * ROW_SIZES['top']
+        self.middle_row: List[Optional[Card]] = [None] * ROW_SIZES['middle']
+        self.bottom_row: List[Optional[Card]] = [None] * ROW_SIZES['bottom']
+
+    def receive_cards(self, cards: List[Card]):
+        """Получение карт улицы"""
+        self.current_hand.extend(cards)
+
+    def place_card(self, card: Card, row: str, position: int) -> bool:
+        """Перенос карты с руки в свободный слот ряда"""
+        if row not in ROW_SIZES or card not in self.current_hand:
+            return False
+        cards = getattr(self, f"{row}_row")
+        if not 0 <= position < ROW_SIZES[row] or cards[position] is not None:
+            return False
+        cards[position] = card
+        self.current_hand.remove(card)
+        return True
+
+    def is_valid_placement(self) -> bool:
+        """Ряды не длиннее допустимого и без повторов карт"""
+        placed = []
+        for row, size in ROW_SIZES.items():
+            cards = [card for card in getattr(self, f"{row}_row") if card is not None]
+            if len(cards) > size:
+                return False
+            placed.extend(cards)
+        return len(set(placed)) == len(placed)
+
+    def get_state(self) -> Dict:
+        """Рука и ряды места в виде словарей карт"""
+        state = {
+            'is_ai': self.is_ai,
+            'cards': [cached_card_dict(card) for card in self.current_hand]
+        }
+        for row in ROW_SIZES:
+            state[f"{row}_row"] = [cached_card_dict(card) if card else None
+                                   for card in getattr(self, f"{row}_row")]
+        return state
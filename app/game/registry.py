@@ -0,0 +1,75 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+from config import Config
+from .table import Table
+
+
+class TableRegistry:
+    """Столы активных игр процесса по game_id
+
+    Каждый стол защищен собственной блокировкой (см. mutation в table.py),
+    поэтому разные игры обрабатываются параллельно, а запросы одной игры —
+    по очереди. Реестр живет в памяти воркера: при нескольких воркерах
+    запросы одной игры должны попадать в один воркер (sticky-маршрутизация),
+    иначе стол восстанавливается из сохранения.
+    """
+
+    def __init__(self, factory: Callable[[], Table] = Table,
+                 idle_timeout: int = Config.TABLE_IDLE_TIMEOUT):
+        self._factory = factory
+        self._idle_timeout = idle_timeout
+        self._tables: Dict[str, Tuple[Table, float]] = {}
+        self._default: Optional[Table] = None
+        self._lock = threading.Lock()
+
+    def create(self) -> Table:
+        """Новый стол; регистрируется после старта игры (когда есть game_id)"""
+        return self._factory()
+
+    def register(self, table: Table):
+        """Регистрация стола под его game_id"""
+        if table.game_id:
+            with self._lock:
+                self._tables[table.game_id] = (table, time.monotonic())
+
+    def get(self, game_id: Optional[str] = None) -> Optional[Table]:
+        """Стол игры; при промахе — загрузка из сохранения, без game_id — стол по умолчанию"""
+        if not game_id:
+            with self._lock:
+                if self._default is None:
+                    self._default = self._factory()
+                return self._default
+
+        with self._lock:
+            entry = self._tables.get(game_id)
+            if entry is not None:
+                self._tables[game_id] = (entry[0], time.monotonic())
+                return entry[0]
+
+        table = self._factory()
+        if not table.load_game(game_id):
+            return None
+        with self._lock:
+            # Параллельный запрос мог загрузить ту же игру раньше
+            entry = self._tables.setdefault(game_id, (table, time.monotonic()))
+        return entry[0]
+
+    def set_default(self, table: Table):
+        """Стол для клиентов, не передающих game_id"""
+        with self._lock:
+            self._default = table
+
+    def evict_idle(self) -> int:
+        """Удаление столов без обращений дольше idle_timeout; возвращает их число"""
+        deadline = time.monotonic() - self._idle_timeout
+        with self._lock:
+            idle = [game_id for game_id, (table, used) in self._tables.items()
+                    if used < deadline and table is not self._default]
+            for game_id in idle:
+                del self._tables[game_id]
+        return len(idle)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tables)
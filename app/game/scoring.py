@@ -1,41 +1,129 @@
-from typing import Dict, List
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
 from .player import Player
 from .deck import Card
+from .evaluator import ROWS, board_array, board_codes, row_royalty, row_strength, evaluate_boards
 from config import Config
 
-def calculate_score(player: Player, ai: Player) -> Dict:
-    """Подсчет очков за игру"""
+# Проигрыш всех линий и скупа против доски без роялти
+FOUL_PENALTY = len(ROWS) + Config.SCOOP_BONUS
+
+
+def board_summary(rows: Dict[str, Sequence[int]]) -> Tuple[List[int], List[int], bool]:
+    """Сила и роялти рядов доски и признак мертвой руки"""
+    strengths = [row_strength(rows[row]) for row in ROWS]
+    fouled = min(strengths) < 0 or strengths[0] > strengths[1] or strengths[1] > strengths[2]
+    if fouled:
+        return [-1] * len(ROWS), [0] * len(ROWS), True
+    return strengths, [row_royalty(row, rows[row]) for row in ROWS], False
+
+
+def score_boards(rows_a: Dict[str, Sequence[int]], rows_b: Dict[str, Sequence[int]]) -> Dict:
+    """Подсчет очков двух досок (скалярный API)"""
+    strengths_a, royalties_a, fouled_a = board_summary(rows_a)
+    strengths_b, royalties_b, fouled_b = board_summary(rows_b)
+
     scores = {
-        'player': {'top': 0, 'middle': 0, 'bottom': 0, 'total': 0, 'bonuses': {}},
-        'ai': {'top': 0, 'middle': 0, 'bottom': 0, 'total': 0, 'bonuses': {}}
+        'player': {'top': 0, 'middle': 0, 'bottom': 0, 'total': 0,
+                   'bonuses': dict(zip(ROWS, royalties_a)), 'fouled': fouled_a},
+        'ai': {'top': 0, 'middle': 0, 'bottom': 0, 'total': 0,
+               'bonuses': dict(zip(ROWS, royalties_b)), 'fouled': fouled_b}
     }
-    
+
     # Подсчет очков за каждую линию
-    for row in ['top', 'middle', 'bottom']:
-        player_cards = getattr(player, f"{row}_row")
-        ai_cards = getattr(ai, f"{row}_row")
-        
-        player_combo = player.evaluate_hand(player_cards)
-        ai_combo = ai.evaluate_hand(ai_cards)
-        
-        if player_combo[1] > ai_combo[1]:
+    for row, strength_a, strength_b in zip(ROWS, strengths_a, strengths_b):
+        if strength_a > strength_b:
             scores['player'][row] = 1
-        elif ai_combo[1] > player_combo[1]:
+        elif strength_b > strength_a:
             scores['ai'][row] = 1
-    
-    # Подсчет бонусов
-    scores['player']['bonuses'] = player.calculate_bonuses()
-    scores['ai']['bonuses'] = ai.calculate_bonuses()
-    
+
     # Подсчет общего счета
-    for player_type in ['player', 'ai']:
-        base_score = sum(scores[player_type][row] for row in ['top', 'middle', 'bottom'])
-        bonus_score = sum(scores[player_type]['bonuses'].values())
-        
+    for side in ['player', 'ai']:
+        base_score = sum(scores[side][row] for row in ROWS)
+
         # Бонус за выигрыш всех линий
-        if base_score == 3:
+        if base_score == len(ROWS):
             base_score += Config.SCOOP_BONUS
-            
-        scores[player_type]['total'] = base_score + bonus_score
-    
+
+        scores[side]['total'] = base_score + sum(scores[side]['bonuses'].values())
+
     return scores
+
+
+def score_batch(strengths_a: np.ndarray, royalties_a: np.ndarray,
+                strengths_b: np.ndarray, royalties_b: np.ndarray) -> Dict[str, np.ndarray]:
+    """Подсчет очков для пачки пар досок (векторный API)
+
+    На входе силы и роялти рядов формы (N, 3), как возвращает evaluate_boards.
+    Возвращает выигранные линии, признаки мертвой руки и итог каждой стороны.
+    """
+    fouled_a = _fouled(strengths_a)
+    fouled_b = _fouled(strengths_b)
+    effective_a = np.where(fouled_a[:, None], -1, strengths_a)
+    effective_b = np.where(fouled_b[:, None], -1, strengths_b)
+
+    lines_a = effective_a > effective_b
+    lines_b = effective_b > effective_a
+    wins_a = lines_a.sum(axis=1)
+    wins_b = lines_b.sum(axis=1)
+
+    total_a = (wins_a + (wins_a == len(ROWS)) * Config.SCOOP_BONUS
+               + np.where(fouled_a, 0, royalties_a.sum(axis=1)))
+    total_b = (wins_b + (wins_b == len(ROWS)) * Config.SCOOP_BONUS
+               + np.where(fouled_b, 0, royalties_b.sum(axis=1)))
+
+    return {
+        'lines_a': lines_a,
+        'lines_b': lines_b,
+        'fouled_a': fouled_a,
+        'fouled_b': fouled_b,
+        'total_a': total_a,
+        'total_b': total_b,
+        'net_a': total_a - total_b
+    }
+
+
+def board_value(rows: Dict[str, Sequence[int]]) -> int:
+    """Выплата доски против нейтральной доски (ничьи по линиям, без роялти)"""
+    _, royalties, fouled = board_summary(rows)
+    return -FOUL_PENALTY if fouled else sum(royalties)
+
+
+def board_values(boards: np.ndarray) -> np.ndarray:
+    """Векторный вариант board_value для пачки досок (N, 13)"""
+    strengths, royalties = evaluate_boards(boards)
+    return np.where(_fouled(strengths), -FOUL_PENALTY, royalties.sum(axis=1))
+
+
+def _fouled(strengths: np.ndarray) -> np.ndarray:
+    """Признак мертвой руки для пачки сил рядов (N, 3)"""
+    return ((strengths < 0).any(axis=1)
+            | (strengths[:, 0] > strengths[:, 1])
+            | (strengths[:, 1] > strengths[:, 2]))
+
+
+def calculate_score(player: Player, ai: Player) -> Dict:
+    """Подсчет очков за игру"""
+    return score_boards(board_codes(player), board_codes(ai))
+
+
+def score_table(boards: List[Dict[str, Sequence[int]]]) -> Dict:
+    """Попарный подсчет очков всех мест за столом одним векторным проходом"""
+    strengths, royalties = evaluate_boards(np.array([board_array(rows) for rows in boards]))
+    first, second = np.triu_indices(len(boards), k=1)
+    result = score_batch(strengths[first], royalties[first],
+                         strengths[second], royalties[second])
+
+    # Итог каждого места — сумма чистых очков по всем парам
+    net = np.zeros(len(boards), dtype=np.int64)
+    np.add.at(net, first, result['net_a'])
+    np.add.at(net, second, -result['net_a'])
+
+    return {
+        'net': net.tolist(),
+        'fouled': _fouled(strengths).tolist(),
+        'pairs': [
+            {'seats': [int(a), int(b)], 'net': int(value)}
+            for a, b, value in zip(first, second, result['net_a'])
+        ]
+    }
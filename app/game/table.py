@@ -1,223 +1,601 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
+import copy
+import functools
+import threading
+import uuid
 from .player import Player
-from .deck import Deck, Card
-from .scoring import calculate_score
-from ..utils.state import save_game_state
+from .deck import Card
+from .array_deck import ArrayDeck
+from .bounds import BoardSummary
+from .cards import card_index, intern_card, cached_card_dict
+from .errors import ConflictError
+from ..ai.learning import record_outcome
+from .scoring import calculate_score, score_table
+from .evaluator import ROWS, board_codes, fantasy_cards
+from ..utils.state import (save_game_state, load_game_state, save_deck_state,
+                           load_deck_state, remove_deck_state)
 import os
 from datetime import datetime
 import json
+from config import Config
+
+ROW_SIZES = {
+    'top': Config.TOP_ROW_SIZE,
+    'middle': Config.MIDDLE_ROW_SIZE,
+    'bottom': Config.BOTTOM_ROW_SIZE
+}
+
+_ai_strategy = None
+_ai_strategy_lock = threading.Lock()
+
+
+def _get_ai_strategy():
+    """Общая стратегия ИИ (загружается один раз на процесс)"""
+    global _ai_strategy
+    if _ai_strategy is None:
+        with _ai_strategy_lock:
+            if _ai_strategy is None:
+                from ..ai.strategy import AIStrategy
+                _ai_strategy = AIStrategy()
+    else:
+        _ai_strategy.refresh_policy()
+    return _ai_strategy
+
+
+def mutation(method):
+    """Изменение стола под блокировкой игры с проверкой ожидаемой версии
+
+    Успешное изменение увеличивает версию стола; запрос с другой
+    expected_version отклоняется ConflictError. События стола копятся до
+    конца изменения и рассылаются, только если оно принято.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, expected_version: Optional[int] = None, **kwargs):
+        if not self._lock.acquire(timeout=Config.GAME_LOCK_TIMEOUT):
+            raise ConflictError('Game is busy', self.version)
+        # Вложенное изменение пишет события в буфер внешнего
+        outermost = self._events is None
+        try:
+            if expected_version is not None and expected_version != self.version:
+                raise ConflictError('Stale state', self.version)
+
+            # Новая версия видна сохранению внутри метода; при неудаче откатывается
+            previous = self.version
+            self.version += 1
+            if outermost:
+                self._events = []
+            try:
+                result = method(self, *args, **kwargs)
+            except Exception:
+                self.version = previous
+                raise
+            if not result:
+                self.version = previous
+                if outermost:
+                    self._events = []
+            elif isinstance(result, dict):
+                result['version'] = self.version
+            if outermost:
+                events, self._events = self._events, None
+                for event, data in events:
+                    self._publish(event, data)
+            return result
+        finally:
+            if outermost:
+                self._events = None
+            self._lock.release()
+    return wrapper
+
 
 class Table:
-    def __init__(self):
-        self.deck = Deck()
-        self.player = Player(is_ai=False)
-        self.ai = Player(is_ai=True)
+    __slots__ = ('deck', 'seats', 'current_street', 'game_id', 'fantasy_round',
+                 'last_action_time', 'listener', '_lock', 'version', '_ai_decisions', 'boards',
+                 '_events')
+
+    def __init__(self, num_seats: int = Config.TABLE_SEATS):
+        self.deck = ArrayDeck()
+        self.seats: List[Player] = []
+        # Сводки рядов по местам, обновляются при выкладке каждой карты
+        self.boards: List[BoardSummary] = []
+        self._seat_players(num_seats)
         self.current_street = 0
         self.game_id = None
         self.fantasy_round = False
         self.last_action_time = None
-        
-    def start_new_game(self) -> Dict:
-        """Начало новой игры"""
-        self.game_id = datetime.now().strftime('%Y%m%d_%H%M%S')
-        self.deck.reset()
-        self.player.reset()
-        self.ai.reset()
+        # Получатель событий стола (раздача, ходы ИИ, счет)
+        self.listener: Optional[Callable[[str, Dict], None]] = None
+        # Блокировка и версия игры для оптимистичной конкуренции
+        self._lock = threading.RLock()
+        self.version = 0
+        # Решения ИИ текущей игры по местам для онлайн-обучения
+        self._ai_decisions: Dict[int, List[Tuple[str, str]]] = {}
+        # События изменения, ожидающие его завершения (None вне mutation)
+        self._events: Optional[List[Tuple[str, Dict]]] = None
+
+    def _emit(self, event: str, data: Dict):
+        """Событие стола; внутри изменения рассылается после его принятия"""
+        data = dict(data, game_id=self.game_id)
+        if self._events is not None:
+            self._events.append((event, data))
+        else:
+            self._publish(event, data)
+
+    def _publish(self, event: str, data: Dict):
+        """Передача события получателю, если он подключен"""
+        if self.listener is not None:
+            self.listener(event, data)
+
+    @property
+    def player(self) -> Player:
+        """Место игрока-человека"""
+        return self.seats[0]
+
+    @property
+    def ai(self) -> Player:
+        """Первое место ИИ (совместимость с игрой вдвоем)"""
+        return self.seats[1]
+
+    @property
+    def ai_seats(self) -> List[int]:
+        """Индексы мест ИИ"""
+        return list(range(1, len(self.seats)))
+
+    def _seat_players(self, num_seats: int):
+        """Рассадка игрока и ИИ по местам"""
+        if not 2 <= num_seats <= Config.MAX_TABLE_SEATS:
+            raise ValueError(f"Unsupported number of seats: {num_seats}")
+        self.seats = [Player(is_ai=False)] + [Player(is_ai=True) for _ in range(num_seats - 1)]
+        self.boards = [BoardSummary() for _ in self.seats]
+
+    def _refresh_board(self, index: int):
+        """Пересчет сводки места по его рядам (после сброса или загрузки)"""
+        seat = self.seats[index]
+        self.boards[index] = BoardSummary.from_rows({row: getattr(seat, f"{row}_row") for row in ROWS})
+
+    def _place(self, index: int, card: Card, row: str, position: int) -> bool:
+        """Размещение карты места с обновлением сводки одного ряда"""
+        if not self.seats[index].place_card(card, row, position):
+            return False
+        self.boards[index] = self.boards[index].place(row, card_index(card))
+        return True
+
+    @mutation
+    def start_new_game(self, num_seats: Optional[int] = None, seed: Optional[int] = None) -> Dict:
+        """Начало новой игры (с seed раздача воспроизводима)"""
+        if num_seats and num_seats != len(self.seats):
+            self._seat_players(num_seats)
+
+        self.game_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self.deck = ArrayDeck(seed)
+        for index, seat in enumerate(self.seats):
+            seat.reset()
+            self._refresh_board(index)
         self.current_street = 1
         self.fantasy_round = False
         self.last_action_time = datetime.now()
-        
-        # Раздача первых 5 карт
-        player_cards = self.deck.deal(5)
-        ai_cards = self.deck.deal(5)
-        
-        self.player.receive_cards(player_cards)
-        self.ai.receive_cards(ai_cards)
-        
+        self._ai_decisions = {index: [] for index in self.ai_seats}
+
+        # Раздача первых 5 карт каждому месту
+        dealt = self._deal_all(Config.CARDS_FIRST_STREET)
+
+        # ИИ раскладывают первую улицу
+        self._ai_move()
+
         self._save_current_state()
-        
+
         return {
             'game_id': self.game_id,
-            'player_cards': [card.to_dict() for card in player_cards],
-            'current_street': self.current_street
+            'player_cards': [cached_card_dict(card) for card in dealt[0]],
+            'current_street': self.current_street,
+            'seats': len(self.seats)
         }
 
-  def next_street(self) -> Optional[Dict]:
+    @mutation
+    def next_street(self) -> Optional[Dict]:
         """Переход к следующей улице"""
+        return self._advance_street()
+
+    def _advance_street(self) -> Optional[Dict]:
+        """Проверка улицы, раздача следующей и ход ИИ"""
         if not self._validate_current_street():
             return None
-            
+
         if self.current_street >= 5 and not self.fantasy_round:
             return self._check_fantasy()
-            
+
         if self.current_street >= 5 and self.fantasy_round:
             return self._end_game()
-            
+
         self.current_street += 1
         self.last_action_time = datetime.now()
-        
+
+        # Оставшаяся в руке карта прошлой улицы уходит в сброс
+        for seat in self.seats:
+            del seat.current_hand[:]
+
         # Раздача 3 карт на последующих улицах
-        player_cards = self.deck.deal(3)
-        ai_cards = self.deck.deal(3)
-        
-        self.player.receive_cards(player_cards)
-        self.ai.receive_cards(ai_cards)
-        
-        # ИИ делает свой ход
+        dealt = self._deal_all(Config.CARDS_OTHER_STREETS)
+
+        # ИИ делают свой ход
         self._ai_move()
-        
+
         self._save_current_state()
-        
+
         return {
-            'player_cards': [card.to_dict() for card in player_cards],
+            'player_cards': [cached_card_dict(card) for card in dealt[0]],
             'current_street': self.current_street
         }
-        
+
+    def _deal_all(self, count: int) -> List[List[Card]]:
+        """Раздача count карт каждому месту"""
+        dealt = []
+        for seat in self.seats:
+            cards = self.deck.deal(count)
+            seat.receive_cards(cards)
+            dealt.append(cards)
+        return dealt
+
     def _ai_move(self):
-        """Ход ИИ"""
-        from ..ai.strategy import AIStrategy
-        
-        strategy = AIStrategy()
-        game_state = self.get_state()
-        move = strategy.make_move(game_state)
-        
-        if move:
-            self.ai.place_card(
-                Card(**move['card']),
-                move['row'],
-                move['position']
-            )
+        """Ход ИИ: места по очереди
+
+        Поиск хода — чистый Python под GIL, а хранилище узлов сериализует
+        обращения своей блокировкой, поэтому потоки на место не сокращают время хода.
+        """
+        for index in self.ai_seats:
+            self._ai_seat_move(index)
+
+    def _ai_seat_move(self, index: int):
+        """Раскладка карт одного места ИИ"""
+        strategy = _get_ai_strategy()
+        seat = self.seats[index]
 
+        # На первой улице раскладываются все карты, далее одна уходит в сброс
+        keep = 0 if self.current_street == 1 or self.fantasy_round else 1
+        while len(seat.current_hand) > keep and not self.boards[index].complete:
+            view = self._ai_view(index)
+            move = strategy.make_move(view)
+            if not move or not self._place(index, intern_card(move['card']), move['row'], move['position']):
+                break
+            if Config.ONLINE_LEARNING:
+                action = f"{move['card']['rank']}{move['card']['suit']}_{move['row']}_{move['position']}"
+                self._ai_decisions.setdefault(index, []).append((strategy.state_key(view), action))
+            self._emit('ai_place', dict(move, seat=index, street=self.current_street))
+
+    @mutation
     def place_card(self, card_data: Dict, row: str, position: int) -> bool:
         """Размещение карты игрока"""
-        card = Card(card_data['rank'], card_data['suit'])
-        result = self.player.place_card(card, row, position)
-        
+        card = intern_card(card_data)
+        result = self._place(0, card, row, position)
+
         if result:
             self.last_action_time = datetime.now()
             self._save_current_state()
-            
+
+        return result
+
+    @mutation
+    def submit_street(self, placements: List[Dict], discard: Optional[Dict] = None) -> Optional[Dict]:
+        """Размещение всех карт улицы игрока одним запросом
+
+        Расклад проверяется целиком до изменения состояния; затем ходят ИИ,
+        раздается следующая улица и состояние сохраняется один раз.
+        """
+        if not self.game_id or self.current_street < 1:
+            raise ValueError('Game is not started')
+        if self._is_timeout():
+            raise ValueError('Move timeout')
+
+        hand = list(self.player.current_hand)
+        cards = self._check_street_placement(hand, placements, discard)
+
+        # Снимок для отката: улица принимается целиком или не меняет стол
+        snapshot = self._snapshot()
+        try:
+            for card, placement in zip(cards, placements):
+                if not self._place(0, card, placement['row'], int(placement['position'])):
+                    raise ValueError('Invalid placement')
+            self.last_action_time = datetime.now()
+            result = self._advance_street()
+        except Exception:
+            self._restore(snapshot)
+            raise
+        if result is None:
+            self._restore(snapshot)
+            return None
+        result['ai_boards'] = [
+            {key: value for key, value in self._seat_view(index).items() if key != 'cards'}
+            for index in self.ai_seats
+        ]
         return result
-        
+
+    def _snapshot(self) -> Dict:
+        """Изменяемое состояние стола (руки, ряды, колода, улица) для отката"""
+        return {
+            'seats': [(list(seat.current_hand),
+                       {row: list(getattr(seat, f"{row}_row")) for row in ROWS})
+                      for seat in self.seats],
+            'boards': list(self.boards),
+            'deck': copy.deepcopy(self.deck),
+            'current_street': self.current_street,
+            'fantasy_round': self.fantasy_round,
+            'last_action_time': self.last_action_time,
+            'ai_decisions': {index: list(decisions) for index, decisions in self._ai_decisions.items()}
+        }
+
+    def _restore(self, snapshot: Dict):
+        """Возврат стола к снимку _snapshot"""
+        for seat, (hand, rows) in zip(self.seats, snapshot['seats']):
+            seat.current_hand[:] = hand
+            for row, cards in rows.items():
+                setattr(seat, f"{row}_row", cards)
+        self.boards = snapshot['boards']
+        self.deck = snapshot['deck']
+        self.current_street = snapshot['current_street']
+        self.fantasy_round = snapshot['fantasy_round']
+        self.last_action_time = snapshot['last_action_time']
+        self._ai_decisions = snapshot['ai_decisions']
+
+    def _check_street_placement(self, hand: List[Card], placements: List[Dict],
+                                discard: Optional[Dict]) -> List[Card]:
+        """Проверка расклада улицы за один проход; возвращает размещаемые карты"""
+        view = self._seat_view(0)
+        empty_slots = {
+            (row, position)
+            for row in ROWS
+            for position, card in enumerate(view[f"{row}_row"])
+            if card is None
+        }
+        if self.fantasy_round:
+            expected = min(len(hand), len(empty_slots))
+        elif self.current_street == 1:
+            expected = Config.CARDS_FIRST_STREET
+        else:
+            expected = Config.CARDS_OTHER_STREETS - 1
+        if len(placements) != expected:
+            raise ValueError(f'Expected {expected} cards to place')
+
+        remaining = list(hand)
+        cards = []
+        used_slots = set()
+        for placement in placements:
+            card = intern_card(placement['card'])
+            slot = (placement['row'], int(placement['position']))
+            if card not in remaining:
+                raise ValueError('Card is not in hand')
+            if slot not in empty_slots or slot in used_slots:
+                raise ValueError('Slot is not available')
+            remaining.remove(card)
+            used_slots.add(slot)
+            cards.append(card)
+
+        if discard is not None and intern_card(discard) not in remaining:
+            raise ValueError('Discarded card is not in hand')
+        return cards
+
+    def validate_placement(self, placement) -> Dict:
+        """Проверка предполагаемой выкладки карт игрока без изменения стола
+
+        placement — размещение {'card', 'row', 'position'} или их список
+        поверх текущей доски. Ответ — сводка доски после выкладки (мертвая
+        рука, комбинации и роялти по рядам) из сводок рядов, без оценки
+        всей доски, поэтому его можно запрашивать при каждом перетаскивании.
+        """
+        placements = placement if isinstance(placement, list) else [placement]
+        view = self._seat_view(0)
+        board = self.boards[0]
+        remaining = list(self.player.current_hand)
+        used_slots = set()
+        for item in placements:
+            card = intern_card(item['card'])
+            row, position = item['row'], int(item['position'])
+            if (row not in ROWS or not 0 <= position < ROW_SIZES[row] or card not in remaining
+                    or view[f"{row}_row"][position] is not None or (row, position) in used_slots):
+                return dict(board.to_dict(), valid=False)
+            remaining.remove(card)
+            used_slots.add((row, position))
+            board = board.place(row, card_index(card))
+        return board.to_dict()
+
     def _validate_current_street(self) -> bool:
         """Проверка валидности текущей улицы"""
         # Проверка таймаута
         if self._is_timeout():
             return False
-            
-        # Проверка правильности размещения карт
-        if not self.player.is_valid_placement():
-            return False
-            
-        if not self.ai.is_valid_placement():
+
+        # Доски без повторов карт и переполненных рядов; мертвая рука улицу
+        # не останавливает (ход уже сделан) и штрафуется при подсчете очков
+        if not all(board.valid for board in self.boards):
             return False
-            
-        # Проверка количества размещенных карт
+
+        # Проверка количества размещенных карт; лишние карты фантазии уходят в сброс
+        if self.fantasy_round:
+            return all(board.complete for board in self.boards)
         if self.current_street == 1:
-            return (len(self.player.current_hand) == 0 and 
-                   len(self.ai.current_hand) == 0)
+            return all(len(seat.current_hand) == 0 for seat in self.seats)
         else:
-            return (len(self.player.current_hand) <= 1 and 
-                   len(self.ai.current_hand) <= 1)
-    
+            return all(len(seat.current_hand) <= 1 for seat in self.seats)
+
     def _is_timeout(self) -> bool:
         """Проверка таймаута хода"""
         if not self.last_action_time:
             return False
-            
-        from config import Config
+
         timeout = datetime.now() - self.last_action_time
         return timeout.total_seconds() > Config.MOVE_TIMEOUT
-        
+
     def _check_fantasy(self) -> Optional[Dict]:
         """Проверка и активация режима фантазии"""
-        player_fantasy = self.player.check_fantasy()
-        ai_fantasy = self.ai.check_fantasy()
-        
-        if not player_fantasy and not ai_fantasy:
+        # Количество карт фантазии по комбинации в верхней линии (0 — нет фантазии)
+        counts = [self._fantasy_cards(index) for index in range(len(self.seats))]
+
+        if not any(counts):
             return self._end_game()
-            
+
         self.fantasy_round = True
-        fantasy_cards = 14  # Базовое количество карт для фантазии
-        
-        # Определение количества карт для фантазии на основе комбинации
-        if player_fantasy:
-            top_combo, _ = self.player.evaluate_hand(self.player.top_row)
-            if top_combo == 'three_of_kind':
-                fantasy_cards = 17
-            elif top_combo == 'pair':
-                pair_value = max([Card.get_card_value(card) for card in self.player.top_row 
-                                if self.player.top_row.count(card) == 2])
-                if pair_value == 13:  # KK
-                    fantasy_cards = 15
-                elif pair_value == 14:  # AA
-                    fantasy_cards = 16
-                    
+
         # Раздача карт для фантазии
         self.deck.reset()
-        player_cards = self.deck.deal(fantasy_cards if player_fantasy else 0)
-        ai_cards = self.deck.deal(fantasy_cards if ai_fantasy else 0)
-        
-        if player_fantasy:
-            self.player.receive_cards(player_cards)
-        if ai_fantasy:
-            self.ai.receive_cards(ai_cards)
-            
+        dealt = []
+        for index, (seat, count) in enumerate(zip(self.seats, counts)):
+            cards = self.deck.deal(count)
+            if count:
+                # Фантазия раскладывается на новую доску: прежняя уже заполнена
+                seat.reset()
+                self._refresh_board(index)
+                seat.receive_cards(cards)
+            dealt.append(cards)
+
+        self._ai_move()
         self._save_current_state()
-        
+
         return {
             'fantasy': True,
-            'player_fantasy': player_fantasy,
-            'ai_fantasy': ai_fantasy,
-            'player_cards': [card.to_dict() for card in player_cards] if player_fantasy else [],
-            'fantasy_cards': fantasy_cards
+            'player_fantasy': counts[0] > 0,
+            'ai_fantasy': any(counts[1:]),
+            'seat_fantasy': [count > 0 for count in counts],
+            'player_cards': [cached_card_dict(card) for card in dealt[0]],
+            'fantasy_cards': next(count for count in counts if count)
         }
-        
+
+    def check_fantasy(self) -> Dict:
+        """Карты фантазии игрока в текущем раунде"""
+        return {
+            'fantasy': self.fantasy_round,
+            'player_cards': [cached_card_dict(card) for card in self.player.current_hand]
+                            if self.fantasy_round else []
+        }
+
+    def _fantasy_cards(self, index: int) -> int:
+        """Количество карт фантазии для места без мертвой руки"""
+        board = self.boards[index]
+        if board.fouled:
+            return 0
+        return fantasy_cards(board.rows['top'].codes)
+
     def _end_game(self) -> Dict:
         """Завершение игры и подсчет очков"""
         scores = self._calculate_scores()
-        self._save_current_state(is_final=True)
-        
+        self._save_current_state(is_final=True, scores=scores)
+        if Config.ONLINE_LEARNING and self._ai_decisions:
+            # Итог уходит в очередь обучения без ожидания записи
+            record_outcome({
+                'game_id': self.game_id,
+                'decisions': {str(index): decisions for index, decisions in self._ai_decisions.items()},
+                'rewards': {str(index): scores['seats']['net'][index] for index in self._ai_decisions}
+            })
+
         return {
             'final': True,
             'scores': scores,
             'player_state': self.player.get_state(),
-            'ai_state': self.ai.get_state()
+            'ai_state': self.ai.get_state(),
+            'seat_states': [seat.get_state() for seat in self.seats]
         }
-        
+
+    def get_scores(self) -> Dict:
+        """Текущий счет: итоговый после заполнения всех досок, до того — гарантированные роялти"""
+        if all(board.complete for board in self.boards):
+            return dict(self._calculate_scores(), final=True)
+        return {
+            'final': False,
+            'royalties': [board.royalties for board in self.boards],
+            'fouled': [board.fouled for board in self.boards]
+        }
+
     def _calculate_scores(self) -> Dict:
         """Подсчет очков игры"""
-        scores = {
-            'player': {'top': 0, 'middle': 0, 'bottom': 0, 'total': 0, 'bonuses': {}},
-            'ai': {'top': 0, 'middle': 0, 'bottom': 0, 'total': 0, 'bonuses': {}}
-        }
-        
-        # Подсчет очков за каждую линию
-        for row in ['top', 'middle', 'bottom']:
-            player_cards = getattr(self.player, f"{row}_row")
-            ai_cards = getattr(self.ai, f"{row}_row")
-            
-            player_combo = self.player.evaluate_hand(player_cards)
-            ai_combo = self.ai.evaluate_hand(ai_cards)
-            
-            if player_combo[1] > ai_combo[1]:
-                scores['player'][row] = 1
-            elif ai_combo[1] > player_combo[1]:
-                scores['ai'][row] = 1
-                
-        # Подсчет бонусов
-        scores['player']['bonuses'] = self.player.calculate_bonuses()
-        scores['ai']['bonuses'] = self.ai.calculate_bonuses()
-        
-        # Подсчет общего счета
-        for player_type in ['player', 'ai']:
-            base_score = sum(scores[player_type][row] for row in ['top', 'middle', 'bottom'])
-            bonus_score = sum(scores[player_type]['bonuses'].values())
-            
-            # Бонус за выигрыш всех линий
-            if base_score == 3:
-                base_score += 3
-                
-            scores[player_type]['total'] = base_score + bonus_score
-            
+        scores = calculate_score(self.player, self.ai)
+
+        # Попарный подсчет по всем местам стола
+        scores['seats'] = score_table([board_codes(seat) for seat in self.seats])
         return scores
+
+    def _seat_view(self, index: int) -> Dict:
+        """Состояние одного места: рука и ряды фиксированной длины"""
+        seat = self.seats[index]
+        view = {
+            'is_ai': index > 0,
+            'cards': [cached_card_dict(card) for card in seat.current_hand]
+        }
+        for row in ROWS:
+            cards = [cached_card_dict(card) if card else None for card in getattr(seat, f"{row}_row")]
+            view[f"{row}_row"] = cards + [None] * (ROW_SIZES[row] - len(cards))
+        return view
+
+    def _ai_view(self, index: int) -> Dict:
+        """Состояние места ИИ в формате AIStrategy"""
+        view = self._seat_view(index)
+        state = {'current_street': self.current_street, 'ai_cards': view['cards']}
+        for row in ROWS:
+            state[f"ai_{row}_row"] = view[f"{row}_row"]
+        return state
+
+    def get_state(self) -> Dict:
+        """Текущее состояние стола"""
+        seats = [self._seat_view(index) for index in range(len(self.seats))]
+        state = {
+            'game_id': self.game_id,
+            'current_street': self.current_street,
+            'fantasy_round': self.fantasy_round,
+            'version': self.version,
+            'seats': seats
+        }
+        for prefix, view in (('player', seats[0]), ('ai', seats[1])):
+            state[f"{prefix}_cards"] = view['cards']
+            for row in ROWS:
+                state[f"{prefix}_{row}_row"] = view[f"{row}_row"]
+        return state
+
+    @mutation
+    def load_game(self, game_id: str) -> bool:
+        """Восстановление стола из сохраненного состояния"""
+        state = load_game_state(game_id)
+        if not state:
+            return False
+
+        seats = state.get('seats') or [
+            {'cards': state.get(f"{prefix}_cards", []),
+             **{f"{row}_row": state.get(f"{prefix}_{row}_row", []) for row in ROWS}}
+            for prefix in ('player', 'ai')
+        ]
+        self._seat_players(len(seats))
+        for index, (seat, view) in enumerate(zip(self.seats, seats)):
+            seat.reset()
+            seat.current_hand[:] = [intern_card(card) for card in view['cards']]
+            for row in ROWS:
+                setattr(seat, f"{row}_row", [intern_card(card) if card else None
+                                             for card in view[f"{row}_row"]])
+            self._refresh_board(index)
+
+        self.game_id = state['game_id']
+        self.current_street = state['current_street']
+        self.fantasy_round = state.get('fantasy_round', False)
+        self.version = state.get('state_version', 0)
+        # Колода повторяется по зерну из локального файла; без него (другой сервер,
+        # старое сохранение) — новая колода без видимых карт
+        deck_state = load_deck_state(game_id) or state.get('deck')
+        self.deck = ArrayDeck.from_state(deck_state) if deck_state else ArrayDeck()
+        if not deck_state:
+            self.deck.kill(card for seat in self.seats for card in seat.current_hand)
+            self.deck.kill(card for seat in self.seats for row in ROWS
+                           for card in getattr(seat, f"{row}_row") if card)
+        self.last_action_time = datetime.now()
+        return True
+
+    def _save_current_state(self, is_final: bool = False, scores: Optional[Dict] = None):
+        """Сохранение текущего состояния стола"""
+        if not self.game_id:
+            return
+        state = self.get_state()
+        state['is_final'] = is_final
+        state['fantasy_enabled'] = self.fantasy_round
+        # Поле version в файле занято версией приложения
+        state['state_version'] = self.version
+        if scores is not None:
+            state['scores'] = scores
+        save_game_state(state)
+        # Зерно колоды раскрыло бы будущие карты, поэтому хранится вне progress/
+        if is_final:
+            remove_deck_state(self.game_id)
+        else:
+            save_deck_state(self.game_id, self.deck.state())
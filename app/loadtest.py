@@ -0,0 +1,262 @@
+"""Нагрузочный тест игрового API: виртуальные игроки проводят полные игры.
+
+Каждый игрок держит свое keep-alive соединение (простой HTTP/1.1 клиент на
+asyncio) и играет игры подряд: /api/start, раскладка улиц через /api/place
+и /api/next (или одним запросом /api/street), запрос /api/fantasy в раунде
+фантазии. Отчет — пропускная способность и p50/p95/p99 по эндпоинтам.
+
+Сервер запускается без синхронизации с GitHub:
+    GITHUB_SYNC=0 gunicorn run:app -c gunicorn.conf.py
+
+Запуск:
+    python -m app.loadtest --url http://127.0.0.1:8000 --players 50 --games 500
+    python -m app.loadtest --duration 60 --think 0.2 --street-share 0.5 --seats 2 3 --json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+# Порядок заполнения слотов доски виртуальным игроком
+SLOTS = ([('bottom', pos) for pos in range(5)] + [('middle', pos) for pos in range(5)] +
+         [('top', pos) for pos in range(3)])
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, body: Dict):
+        super().__init__(f"HTTP {status}: {body.get('error', '')}")
+        self.status = status
+        self.body = body
+
+
+class HttpClient:
+    """Минимальный HTTP/1.1 клиент с keep-alive для JSON-запросов"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, payload: Optional[Dict] = None) -> Tuple[int, Dict]:
+        body = json.dumps(payload).encode() if payload is not None else b''
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n").encode()
+        for attempt in range(2):
+            if self._writer is None:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self._writer.write(head + body)
+                await self._writer.drain()
+                return await self._read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                # Сервер закрыл простаивающее соединение — один повтор на новом
+                await self.close()
+                if attempt:
+                    raise
+
+    async def _read_response(self) -> Tuple[int, Dict]:
+        status_line = await self._reader.readuntil(b'\r\n')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readuntil(b'\r\n')
+            if line == b'\r\n':
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int((await self._reader.readuntil(b'\r\n')).split(b';')[0], 16)
+                chunk = await self._reader.readexactly(size + 2)
+                if not size:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self._reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, json.loads(body) if body else {}
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except ConnectionError:
+                pass
+        self._reader = self._writer = None
+
+
+class Stats:
+    """Задержки и ошибки по эндпоинтам"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.games = 0
+        self.failed_games = 0
+
+    def report(self, elapsed: float) -> Dict:
+        endpoints = {}
+        for path, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            endpoints[path] = {
+                'requests': len(values),
+                'errors': self.errors[path],
+                'rps': len(values) / elapsed,
+                **{f"p{q}": _percentile(values, q) * 1000 for q in (50, 95, 99)},
+                'max': values[-1] * 1000
+            }
+        requests = sum(len(values) for values in self.latencies.values())
+        return {
+            'elapsed': elapsed,
+            'requests': requests,
+            'rps': requests / elapsed,
+            'games': self.games,
+            'failed_games': self.failed_games,
+            'games_per_second': self.games / elapsed,
+            'endpoints': endpoints
+        }
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Перцентиль по ближайшему рангу для отсортированного списка"""
+    return values[min(len(values) - 1, max(0, int(round(q / 100 * len(values))) - 1))]
+
+
+class Player:
+    """Виртуальный игрок: раскладывает карты по порядку слотов"""
+
+    def __init__(self, client: HttpClient, stats: Stats, args, rng: random.Random):
+        self.client = client
+        self.stats = stats
+        self.args = args
+        self.rng = rng
+        self.game_id: Optional[str] = None
+        self.version: Optional[int] = None
+
+    async def call(self, path: str, payload: Dict) -> Dict:
+        if self.args.think:
+            await asyncio.sleep(self.rng.expovariate(1 / self.args.think))
+        if self.game_id:
+            payload = dict(payload, game_id=self.game_id, version=self.version)
+        started = time.perf_counter()
+        try:
+            status, body = await self.client.request('POST', path, payload)
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            self.stats.errors[path] += 1
+            raise
+        finally:
+            self.stats.latencies[path].append(time.perf_counter() - started)
+        if status >= 400:
+            self.stats.errors[path] += 1
+            raise HttpError(status, body)
+        self.version = body.get('version', self.version)
+        return body
+
+    async def play(self):
+        """Одна полная игра"""
+        self.game_id = self.version = None
+        batch = self.rng.random() < self.args.street_share
+        result = await self.call('/api/start', {'seats': self.rng.choice(self.args.seats)})
+        self.game_id = result['game_id']
+        slots = list(SLOTS)
+        street, fantasy = 1, False
+        hand = result['player_cards']
+
+        while True:
+            # На улицах после первой одна карта уходит в сброс
+            count = len(hand) if street == 1 or fantasy else len(hand) - 1
+            count = min(count, len(slots))
+            placements = [{'card': card, 'row': row, 'position': pos}
+                          for card, (row, pos) in zip(hand, slots)]
+            placements = placements[:count]
+            slots = slots[count:]
+
+            if batch and not fantasy:
+                discard = hand[count] if count < len(hand) else None
+                result = await self.call('/api/street', {'placements': placements, 'discard': discard})
+            else:
+                for placement in placements:
+                    await self.call('/api/place', placement)
+                result = await self.call('/api/next', {})
+
+            if result.get('final'):
+                return
+            if result.get('fantasy'):
+                fantasy = True
+                await self.call('/api/fantasy', {})
+                # Фантазия раскладывается на новую доску; без нее доска игрока заполнена
+                slots = list(SLOTS) if result.get('player_fantasy') else []
+            street = result.get('current_street', street + 1)
+            hand = result.get('player_cards', [])
+
+    async def run(self, deadline: float, games_left: List[int]):
+        while time.monotonic() < deadline and games_left[0] > 0:
+            games_left[0] -= 1
+            try:
+                await self.play()
+                self.stats.games += 1
+            except (HttpError, OSError, asyncio.IncompleteReadError, ValueError, KeyError):
+                self.stats.failed_games += 1
+                await self.client.close()
+        await self.client.close()
+
+
+async def run(args) -> Dict:
+    url = urlsplit(args.url)
+    stats = Stats()
+    games_left = [args.games if args.games else float('inf')]
+    deadline = time.monotonic() + (args.duration if args.duration else float('inf'))
+    rng = random.Random(args.seed)
+    players = [Player(HttpClient(url.hostname, url.port or 80), stats, args,
+                      random.Random(rng.getrandbits(64)))
+               for _ in range(args.players)]
+    started = time.perf_counter()
+    await asyncio.gather(*(player.run(deadline, games_left) for player in players))
+    return stats.report(time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test of the game HTTP API')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--players', type=int, default=20, help='одновременных игроков')
+    parser.add_argument('--games', type=int, default=200, help='всего игр (0 — без ограничения)')
+    parser.add_argument('--duration', type=float, default=0, help='секунд (0 — до --games)')
+    parser.add_argument('--think', type=float, default=0.0, help='средняя пауза перед запросом, с')
+    parser.add_argument('--street-share', type=float, default=0.0,
+                        help='доля игр через /api/street вместо /api/place')
+    parser.add_argument('--seats', type=int, nargs='+', default=[2], help='число мест (выбор случайно)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', action='store_true', help='отчет в JSON')
+    args = parser.parse_args()
+    if not args.games and not args.duration:
+        parser.error('--games 0 requires --duration')
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['games']} games ({report['failed_games']} failed), {report['requests']} requests "
+          f"in {report['elapsed']:.1f}s: {report['rps']:.1f} req/s, "
+          f"{report['games_per_second']:.2f} games/s")
+    print(f"{'endpoint':<14} {'requests':>9} {'errors':>7} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for path, row in report['endpoints'].items():
+        print(f"{path:<14} {row['requests']:>9} {row['errors']:>7} {row['rps']:>8.1f} "
+              f"{row['p50']:>8.1f} {row['p95']:>8.1f} {row['p99']:>8.1f} {row['max']:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,106 @@
-from flask import Blueprint, jsonify, request, render_template, current_app
-from .game.table import Table
+from flask import Blueprint, Response, jsonify, request, render_template, current_app, url_for
+from .events import broker
+from .game.codec import compact_state
+from .game.errors import ConflictError
 from .utils.state import save_game_state, load_game_state, list_saved_games
-from .game.scoring import calculate_score
-from typing import Dict
+from config import Config
+from typing import Dict, Optional, Tuple
+import functools
+import gzip
+import hashlib
+import json
+import os
+import threading
 import time
 
 bp = Blueprint('main', __name__)
 
-# Глобальный экземпляр игрового стола
-table = Table()
+# Реестр столов по game_id (создается при первом игровом запросе,
+# чтобы модули ИИ, NumPy и таблицы оценки не грузились при старте)
+_registry = None
+_registry_lock = threading.Lock()
+
+def events_channel(game_id: str) -> str:
+    """Канал событий игры: подписчик получает только события своей игры"""
+    return f"game:{game_id}"
+
+def _new_table():
+    """Стол, публикующий события в канал своей игры"""
+    from .game.table import Table
+    table = Table()
+    table.listener = lambda event, data: broker.publish(events_channel(data['game_id']), event, data)
+    return table
+
+def get_registry():
+    """Реестр столов процесса"""
+    global _registry
+    if _registry is None:
+        # Первые запросы воркера приходят параллельно из разных потоков
+        with _registry_lock:
+            if _registry is None:
+                from .game.registry import TableRegistry
+                _registry = TableRegistry(factory=_new_table)
+    return _registry
+
+def _request_game(data: Optional[Dict] = None) -> Tuple[Optional[str], Optional[int]]:
+    """game_id и ожидаемая версия игры из тела, строки запроса или заголовков"""
+    data = data or {}
+    game_id = data.get('game_id') or request.args.get('game_id') or request.headers.get('X-Game-Id')
+    version = data.get('version')
+    if version is None:
+        version = request.headers.get('If-Match', '').strip('W/').strip('"') or None
+    try:
+        return game_id, int(version) if version is not None else None
+    except (TypeError, ValueError):
+        return game_id, None
+
+def get_table(game_id: Optional[str] = None):
+    """Стол игры запроса (без game_id — стол по умолчанию)"""
+    if game_id is None:
+        game_id, _ = _request_game(request.get_json(silent=True))
+    return get_registry().get(game_id)
+
+def _conflict(e) -> Tuple[Response, int]:
+    """Ответ 409 с актуальной версией игры"""
+    return jsonify({'error': str(e), 'version': e.version}), 409
+
+def _publish_result(game_id: str, result: Optional[Dict], event: str):
+    """Рассылка результата действия в канал игры"""
+    channel = events_channel(game_id)
+    if result is None:
+        broker.publish(channel, 'error', {'error': 'Invalid state', 'game_id': game_id})
+        return
+    result = dict(result, game_id=game_id)
+    if result.get('conflict'):
+        broker.publish(channel, 'conflict', result)
+    elif result.get('final'):
+        broker.publish(channel, 'scores', result)
+    elif result.get('fantasy') and event == 'deal':
+        broker.publish(channel, 'fantasy', result)
+    else:
+        broker.publish(channel, event, result)
 
 @bp.before_request
 def before_request():
     """Действия перед каждым запросом"""
     request.start_time = time.time()
 
+_scheduler_started = False
+
+@bp.before_app_request
+def ensure_scheduler():
+    """Планировщик обслуживания в процессе, обслуживающем запросы
+
+    Запуск при первом запросе работает под любым сервером (run.py,
+    dev-сервер Flask, воркеры gunicorn), но не в мастере gunicorn до fork;
+    задачи выполняет один процесс хоста — владелец файловой блокировки.
+    """
+    global _scheduler_started
+    if not _scheduler_started:
+        _scheduler_started = True
+        from .utils.scheduler import start_scheduler
+        start_scheduler()
+
 @bp.after_request
 def after_request(response):
     """Действия после каждого запроса"""
@@ -30,6 +116,103 @@ def after_request(response):
     
     return response
 
+MSGPACK_MIMETYPE = 'application/x-msgpack'
+
+def _state_response(payload, conditional: bool = False) -> Response:
+    """Ответ с состоянием в формате по запросу клиента
+
+    Accept: application/x-msgpack — компактный msgpack (если установлен),
+    ?format=compact — компактный JSON, иначе полный JSON. При conditional
+    добавляется ETag и поддерживается If-None-Match (304).
+    """
+    if MSGPACK_MIMETYPE in request.headers.get('Accept', ''):
+        try:
+            import msgpack
+            response = Response(msgpack.packb(compact_state(payload)), mimetype=MSGPACK_MIMETYPE)
+        except ImportError:
+            response = jsonify(compact_state(payload))
+        response.vary.add('Accept')
+    elif request.args.get('format') == 'compact':
+        response = Response(json.dumps(compact_state(payload), separators=(',', ':')),
+                            mimetype='application/json')
+    else:
+        response = jsonify(payload)
+        
+    if conditional:
+        response.add_etag()
+        response.headers['Cache-Control'] = 'no-cache'
+        response = response.make_conditional(request)
+    return response
+
+def _compress(response: Response) -> Response:
+    """Сжатие тела ответа brotli или gzip по Accept-Encoding"""
+    if (response.direct_passthrough or response.status_code != 200 or
+            'Content-Encoding' in response.headers or
+            response.mimetype == 'text/event-stream'):
+        return response
+        
+    body = response.get_data()
+    if len(body) < Config.COMPRESS_MIN_SIZE:
+        return response
+        
+    accepted = request.headers.get('Accept-Encoding', '')
+    encoding = None
+    if 'br' in accepted:
+        try:
+            import brotli
+            body, encoding = brotli.compress(body), 'br'
+        except ImportError:
+            pass
+    if encoding is None and 'gzip' in accepted:
+        body, encoding = gzip.compress(body, compresslevel=Config.COMPRESS_LEVEL), 'gzip'
+    if encoding is None:
+        return response
+        
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    
+    # ETag несжатого тела становится слабым для сжатого варианта
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+@bp.after_app_request
+def compress_and_cache(response):
+    """Сжатие ответов и долгий кэш версионированной статики"""
+    if request.path.startswith('/static/') and response.status_code == 200:
+        # Год кэша только для URL с хэшем содержимого (static_url), остальное — с проверкой
+        if request.args.get('v'):
+            response.headers['Cache-Control'] = f'public, max-age={Config.SEND_FILE_MAX_AGE_DEFAULT}, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        if response.direct_passthrough:
+            return response
+    return _compress(response)
+
+@functools.lru_cache(maxsize=256)
+def _static_hash(path: str, mtime_ns: int, size: int) -> str:
+    """Хэш содержимого файла статики (пересчитывается при изменении файла)"""
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 16), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+@bp.app_context_processor
+def static_assets():
+    """static_url(filename) — URL статики с хэшем содержимого для сброса кэша"""
+    def static_url(filename: str) -> str:
+        path = os.path.join(current_app.static_folder, filename)
+        try:
+            stat = os.stat(path)
+            version = _static_hash(path, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = Config.VERSION
+        return url_for('static', filename=filename, v=version)
+    return {'static_url': static_url}
+
 @bp.route('/')
 def index():
     """Главная страница"""
@@ -39,8 +222,18 @@ def index():
 def start_game():
     """Начало новой игры"""
     try:
-        result = table.start_new_game()
+        data = request.get_json(silent=True) or {}
+        registry = get_registry()
+        table = registry.create()
+        # Зерно раздачи задается только в режиме отладки (воспроизведение игр)
+        seed = data.get('seed') if Config.DEBUG else None
+        result = table.start_new_game(num_seats=data.get('seats'), seed=seed)
+        registry.register(table)
+        registry.set_default(table)
+        registry.evict_idle()
         return jsonify(result)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f'Error starting game: {str(e)}')
         return jsonify({'error': 'Failed to start game'}), 500
@@ -49,10 +242,16 @@ def start_game():
 def next_street():
     """Переход к следующей улице"""
     try:
-        result = table.next_street()
+        game_id, version = _request_game(request.get_json(silent=True))
+        table = get_table(game_id)
+        if table is None:
+            return jsonify({'error': 'Game not found'}), 404
+        result = table.next_street(expected_version=version)
         if result is None:
             return jsonify({'error': 'Invalid state'}), 400
         return jsonify(result)
+    except ConflictError as e:
+        return _conflict(e)
     except Exception as e:
         current_app.logger.error(f'Error in next street: {str(e)}')
         return jsonify({'error': 'Failed to proceed to next street'}), 500
@@ -65,22 +264,112 @@ def place_card():
         if not data or 'card' not in data or 'row' not in data or 'position' not in data:
             return jsonify({'error': 'Invalid request data'}), 400
             
+        game_id, version = _request_game(data)
+        table = get_table(game_id)
+        if table is None:
+            return jsonify({'error': 'Game not found'}), 404
         result = table.place_card(
             data['card'],
             data['row'],
-            data['position']
+            data['position'],
+            expected_version=version
         )
-        return jsonify({'success': result})
+        return jsonify({'success': result, 'version': table.version})
+    except ConflictError as e:
+        return _conflict(e)
     except Exception as e:
         current_app.logger.error(f'Error placing card: {str(e)}')
         return jsonify({'error': 'Failed to place card'}), 500
 
+@bp.route('/api/street', methods=['POST'])
+def submit_street():
+    """Размещение всех карт улицы, ход ИИ и раздача следующей улицы"""
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('placements'), list):
+            return jsonify({'error': 'Invalid request data'}), 400
+        for placement in data['placements']:
+            if not isinstance(placement, dict) or not {'card', 'row', 'position'} <= placement.keys():
+                return jsonify({'error': 'Invalid request data'}), 400
+            
+        game_id, version = _request_game(data)
+        table = get_table(game_id)
+        if table is None:
+            return jsonify({'error': 'Game not found'}), 404
+        result = table.submit_street(data['placements'], data.get('discard'),
+                                     expected_version=version)
+        if result is None:
+            return jsonify({'error': 'Invalid state'}), 400
+        return jsonify(result)
+    except ConflictError as e:
+        return _conflict(e)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f'Error submitting street: {str(e)}')
+        return jsonify({'error': 'Failed to submit street'}), 500
+
+@bp.route('/api/events', methods=['GET'])
+def game_events():
+    """Поток событий одной игры (Server-Sent Events), ?game_id=..."""
+    game_id, _ = _request_game()
+    if not game_id:
+        return jsonify({'error': 'game_id is required'}), 400
+    # Поток занимает поток воркера на все время подключения: часть потоков
+    # остается обычным запросам, клиент без потока событий работает запросами
+    if broker.stream_count() >= Config.MAX_EVENT_STREAMS:
+        return jsonify({'error': 'Too many event streams'}), 503
+    return Response(
+        broker.stream(events_channel(game_id)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@bp.route('/api/action', methods=['POST'])
+def submit_action():
+    """Прием действия игрока; результат приходит через /api/events игры
+
+    Игра начинается через /api/start: его ответ дает game_id для подписки.
+    """
+    data = request.get_json()
+    if not data or 'type' not in data:
+        return jsonify({'error': 'Invalid request data'}), 400
+        
+    game_id, version = _request_game(data)
+    table = get_registry().get(game_id)
+    if table is None or not table.game_id:
+        return jsonify({'error': 'Game not found'}), 404
+
+    # Тип действия -> (обработчик, событие с результатом)
+    actions = {
+        'street': (lambda: table.submit_street(data.get('placements') or [], data.get('discard'),
+                                               expected_version=version), 'deal'),
+        'next': (lambda: table.next_street(expected_version=version), 'deal'),
+        'fantasy': (table.check_fantasy, 'fantasy_cards')
+    }
+    if data['type'] not in actions:
+        return jsonify({'error': 'Unknown action'}), 400
+        
+    handler, event = actions[data['type']]
+    game_id = table.game_id
+
+    def action():
+        try:
+            return handler()
+        except ConflictError as e:
+            return {'conflict': True, 'error': str(e), 'version': e.version}
+
+    broker.submit(events_channel(game_id), action,
+                  lambda result: _publish_result(game_id, result, event))
+    return jsonify({'accepted': True}), 202
+
 @bp.route('/api/load/<game_id>', methods=['GET'])
 def load_game(game_id: str):
     """Загрузка сохраненной игры"""
     try:
-        if table.load_game(game_id):
-            return jsonify({'success': True, 'state': table.get_state()})
+        table = get_registry().get(game_id)
+        if table is not None:
+            return _state_response({'success': True, 'state': table.get_state()})
         return jsonify({'error': 'Game not found'}), 404
     except Exception as e:
         current_app.logger.error(f'Error loading game: {str(e)}')
@@ -90,7 +379,7 @@ def load_game(game_id: str):
 def get_saved_games():
     """Получение списка сохраненных игр"""
     try:
-        return jsonify(list_saved_games())
+        return _state_response(list_saved_games(), conditional=True)
     except Exception as e:
         current_app.logger.error(f'Error listing saved games: {str(e)}')
         return jsonify({'error': 'Failed to list saved games'}), 500
@@ -99,21 +388,29 @@ def get_saved_games():
 def get_game_state():
     """Получение текущего состояния игры"""
     try:
-        return jsonify(table.get_state())
+        table = get_table()
+        if table is None:
+            return jsonify({'error': 'Game not found'}), 404
+        return _state_response(table.get_state(), conditional=True)
     except Exception as e:
         current_app.logger.error(f'Error getting game state: {str(e)}')
         return jsonify({'error': 'Failed to get game state'}), 500
 
 @bp.route('/api/validate', methods=['POST'])
 def validate_placement():
-    """Проверка правильности размещения карт"""
+    """Проверка размещения карт и предварительные роялти (состояние не меняется)"""
     try:
         data = request.get_json()
         if not data or 'placement' not in data:
             return jsonify({'error': 'Invalid request data'}), 400
             
-        is_valid = table.validate_placement(data['placement'])
-        return jsonify({'valid': is_valid})
+        game_id, _ = _request_game(data)
+        table = get_table(game_id)
+        if table is None:
+            return jsonify({'error': 'Game not found'}), 404
+        return jsonify(table.validate_placement(data['placement']))
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Invalid request data'}), 400
     except Exception as e:
         current_app.logger.error(f'Error validating placement: {str(e)}')
         return jsonify({'error': 'Failed to validate placement'}), 500
@@ -122,6 +419,9 @@ def validate_placement():
 def check_fantasy():
     """Проверка возможности фантазии"""
     try:
+        table = get_table()
+        if table is None:
+            return jsonify({'error': 'Game not found'}), 404
         result = table.check_fantasy()
         return jsonify(result)
     except Exception as e:
@@ -132,6 +432,9 @@ def check_fantasy():
 def get_scores():
     """Получение текущего счета"""
     try:
+        table = get_table()
+        if table is None:
+            return jsonify({'error': 'Game not found'}), 404
         scores = table.get_scores()
         return jsonify(scores)
     except Exception as e:
@@ -149,6 +452,12 @@ def internal_error(error):
     current_app.logger.error(f'Server Error: {str(error)}')
     return jsonify({'error': 'Internal server error'}), 500
 
+@bp.route('/api/maintenance', methods=['GET'])
+def maintenance_stats():
+    """Статистика фоновых задач обслуживания (длительность, ошибки)"""
+    from .utils.scheduler import read_stats
+    return jsonify(read_stats())
+
 @bp.route('/api/health', methods=['GET'])
 def health_check():
     """Проверка работоспособности сервера"""
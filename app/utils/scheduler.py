@@ -0,0 +1,259 @@
+"""Планировщик фонового обслуживания: очистка сохранений, резервные копии,
+синхронизация с GitHub.
+
+Планировщик запускается потоком при первом запросе в каждом обслуживающем
+процессе (воркеры gunicorn, run.py, dev-сервер; см. routes.ensure_scheduler),
+но задачи выполняет только процесс, удерживающий файловую блокировку
+Config.SCHEDULER_LOCK_FILE; остальные периодически пытаются ее захватить и
+подхватывают работу, если владелец завершился. Новый владелец продолжает
+расписание по статистике прошлого (перезапуск воркера не запускает все
+задачи сразу); без статистики первый запуск — через интервал задачи.
+Отдельным процессом:
+
+    python -m app.utils.scheduler          # работа в переднем плане
+    python -m app.utils.scheduler --once   # однократный запуск всех задач
+    python -m app.utils.scheduler --stats  # длительность задач
+"""
+import argparse
+import fcntl
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """Периодическая задача и статистика ее выполнения"""
+
+    def __init__(self, name: str, interval: int, func: Callable[[], object]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self.next_run = time.monotonic() + interval
+        self.runs = 0
+        self.failures = 0
+        self.last_run: Optional[str] = None
+        self.last_duration = 0.0
+        self.total_duration = 0.0
+        self.max_duration = 0.0
+        self.last_result = None
+
+    def due(self, now: float) -> bool:
+        return now >= self.next_run
+
+    def run(self):
+        """Выполнение задачи с замером длительности"""
+        started = time.perf_counter()
+        try:
+            self.last_result = self.func()
+        except Exception as e:
+            self.failures += 1
+            self.last_result = None
+            logger.error(f"Maintenance job {self.name} failed: {str(e)}")
+        finally:
+            duration = time.perf_counter() - started
+            self.runs += 1
+            self.last_run = datetime.now().isoformat()
+            self.last_duration = duration
+            self.total_duration += duration
+            self.max_duration = max(self.max_duration, duration)
+            self.next_run = time.monotonic() + self.interval
+
+    def stats(self) -> Dict:
+        return {
+            'interval': self.interval,
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_run': self.last_run,
+            'last_duration': round(self.last_duration, 4),
+            'avg_duration': round(self.total_duration / self.runs, 4) if self.runs else 0.0,
+            'max_duration': round(self.max_duration, 4),
+            'last_result': self.last_result if isinstance(self.last_result, (int, str)) else None
+        }
+
+
+def default_jobs() -> List[Job]:
+    """Задачи обслуживания каталога прогресса"""
+    from .state import get_game_state
+    game_state = get_game_state()
+    return [
+        Job('sync', Config.SYNC_INTERVAL, game_state.sync_pending),
+        Job('cleanup', Config.CLEANUP_INTERVAL, game_state.cleanup_old_games),
+        Job('backup', Config.BACKUP_INTERVAL, game_state.backup_progress)
+    ]
+
+
+class MaintenanceScheduler:
+    """Выполнение задач обслуживания в фоновом потоке, один экземпляр на хост"""
+
+    def __init__(self, jobs: Optional[List[Job]] = None,
+                 lock_file: str = Config.SCHEDULER_LOCK_FILE,
+                 stats_file: str = Config.SCHEDULER_STATS_FILE):
+        self._jobs = jobs
+        self.lock_file = lock_file
+        self.stats_file = stats_file
+        self._lock_fd: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def jobs(self) -> List[Job]:
+        if self._jobs is None:
+            self._jobs = default_jobs()
+        return self._jobs
+
+    @property
+    def is_owner(self) -> bool:
+        return self._lock_fd is not None
+
+    def acquire(self) -> bool:
+        """Захват файловой блокировки хоста без ожидания"""
+        if self._lock_fd is not None:
+            return True
+        os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+        fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        self._lock_fd = fd
+        self._resume_schedule()
+        logger.info(f"Maintenance scheduler running in process {os.getpid()}")
+        return True
+
+    def _resume_schedule(self):
+        """Сроки задач от последних запусков прошлого владельца блокировки"""
+        try:
+            previous = read_stats(self.stats_file).get('jobs', {})
+        except (OSError, ValueError):
+            return
+        now = time.monotonic()
+        for job in self.jobs:
+            last_run = previous.get(job.name, {}).get('last_run')
+            if last_run:
+                # Время запуска переносится в статистику нового владельца
+                job.last_run = last_run
+                elapsed = (datetime.now() - datetime.fromisoformat(last_run)).total_seconds()
+                job.next_run = now + min(max(job.interval - elapsed, 0.0), job.interval)
+
+    def release(self):
+        if self._lock_fd is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def run_pending(self, force: bool = False) -> int:
+        """Выполнение наступивших задач; возвращает их число"""
+        executed = 0
+        for job in self.jobs:
+            if force or job.due(time.monotonic()):
+                job.run()
+                executed += 1
+        if executed:
+            self._write_stats()
+        return executed
+
+    def run_forever(self, poll_interval: float = 1.0):
+        """Цикл планировщика до вызова stop()"""
+        try:
+            while not self._stop.is_set():
+                if self.acquire():
+                    self.run_pending()
+                    wait = min(job.next_run for job in self.jobs) - time.monotonic()
+                else:
+                    # Владелец блокировки может завершиться — повторяем попытку
+                    wait = Config.SYNC_INTERVAL
+                self._stop.wait(max(wait, poll_interval))
+        finally:
+            self.release()
+
+    def start(self) -> threading.Thread:
+        """Запуск в фоновом потоке"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name='maintenance',
+                                            daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> Dict:
+        return {
+            'pid': os.getpid(),
+            'updated': datetime.now().isoformat(),
+            'jobs': {job.name: job.stats() for job in self.jobs}
+        }
+
+    def _write_stats(self):
+        """Статистика в файл, чтобы ее видели все процессы хоста"""
+        tmp_path = f"{self.stats_file}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.stats(), f)
+        os.replace(tmp_path, self.stats_file)
+
+
+def read_stats(stats_file: str = Config.SCHEDULER_STATS_FILE) -> Dict:
+    """Последняя статистика планировщика хоста"""
+    if not os.path.exists(stats_file):
+        return {}
+    with open(stats_file, 'r') as f:
+        return json.load(f)
+
+
+_scheduler: Optional[MaintenanceScheduler] = None
+
+
+def start_scheduler() -> Optional[MaintenanceScheduler]:
+    """Запуск планировщика процесса, если он включен в настройках"""
+    global _scheduler
+    if not Config.SCHEDULER_ENABLED:
+        return None
+    if _scheduler is None:
+        _scheduler = MaintenanceScheduler()
+    _scheduler.start()
+    return _scheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Background maintenance scheduler')
+    parser.add_argument('--once', action='store_true', help='выполнить все задачи один раз')
+    parser.add_argument('--stats', action='store_true', help='показать длительность задач')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.stats:
+        print(json.dumps(read_stats(), indent=2))
+        return
+
+    scheduler = MaintenanceScheduler()
+    if not scheduler.acquire():
+        print(f"Scheduler is already running (lock: {scheduler.lock_file})")
+        return
+    if args.once:
+        try:
+            scheduler.run_pending(force=True)
+            print(json.dumps(scheduler.stats(), indent=2))
+        finally:
+            scheduler.release()
+        return
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,419 @@
+import json
+import os
+from typing import Dict, Optional, List
+from datetime import datetime, timedelta
+import shutil
+import base64
+import hashlib
+import zipfile
+from config import Config
+from ..game.codec import encode_saved_state, decode_saved_state
+import logging
+
+logger = logging.getLogger(__name__)
+
+class GameState:
+    def __init__(self):
+        self.progress_dir = Config.PROGRESS_DIR
+        if not os.path.exists(self.progress_dir):
+            os.makedirs(self.progress_dir)
+
+    def save_game_state(self, state: Dict):
+        """Сохранение состояния игры"""
+        try:
+            filename = f"game_{state['game_id']}.json"
+            filepath = os.path.join(self.progress_dir, filename)
+            
+            # Добавляем метаданные
+            state['timestamp'] = datetime.now().isoformat()
+            state['version'] = Config.VERSION
+            
+            # Компактная запись: карты кодами, без отступов
+            encoded = encode_saved_state(state)
+            with open(filepath, 'w') as f:
+                json.dump(encoded, f, separators=(',', ':'))
+                
+            # Синхронизацию и очистку выполняет планировщик обслуживания
+            if not Config.SCHEDULER_ENABLED:
+                self._sync_with_github(filename, encoded)
+                self.cleanup_old_games()
+            
+        except Exception as e:
+            logger.error(f"Error saving game state: {str(e)}")
+            raise
+
+    def load_game_state(self, game_id: str) -> Optional[Dict]:
+        """Загрузка состояния игры"""
+        try:
+            filename = f"game_{game_id}.json"
+            filepath = os.path.join(self.progress_dir, filename)
+            
+            if not os.path.exists(filepath):
+                return None
+                
+            with open(filepath, 'r') as f:
+                return decode_saved_state(json.load(f))
+                
+        except Exception as e:
+            logger.error(f"Error loading game state: {str(e)}")
+            return None
+
+    def save_deck_state(self, game_id: str, deck_state: Dict):
+        """Локальное сохранение колоды: зерно не попадает в синхронизируемые файлы"""
+        self._write_json(self._deck_state_path(game_id), deck_state)
+
+    def load_deck_state(self, game_id: str) -> Optional[Dict]:
+        """Состояние колоды игры; None, если его нет на этом сервере"""
+        try:
+            return self._read_json(self._deck_state_path(game_id), None)
+        except Exception as e:
+            logger.error(f"Error loading deck state: {str(e)}")
+            return None
+
+    def remove_deck_state(self, game_id: str):
+        """Удаление колоды завершенной или удаленной игры"""
+        try:
+            os.remove(self._deck_state_path(game_id))
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _deck_state_path(game_id: str) -> str:
+        return os.path.join(Config.DECK_STATE_DIR, f"deck_{game_id}.json")
+
+    def list_saved_games(self) -> List[Dict]:
+        """Получение списка сохраненных игр"""
+        try:
+            if not os.path.exists(self.progress_dir):
+                return []
+                
+            games = []
+            for filename in os.listdir(self.progress_dir):
+                if filename.endswith('.json') and filename.startswith('game_'):
+                    filepath = os.path.join(self.progress_dir, filename)
+                    with open(filepath, 'r') as f:
+                        state = json.load(f)
+                        games.append({
+                            'game_id': state['game_id'],
+                            'timestamp': state['timestamp'],
+                            'current_street': state['current_street'],
+                            'is_final': state.get('is_final', False)
+                        })
+            
+            return sorted(games, key=lambda x: x['timestamp'], reverse=True)
+            
+        except Exception as e:
+            logger.error(f"Error listing saved games: {str(e)}")
+            return []
+
+    def _sync_with_github(self, filename: str, content: Dict) -> bool:
+        """Синхронизация с GitHub"""
+        if not Config.GITHUB_SYNC:
+            return False
+        token = Config.AI_PROGRESS_TOKEN
+        if not token:
+            logger.warning("GitHub token not found, skipping sync")
+            return False
+
+        try:
+            import requests
+            
+            headers = {
+                'Authorization': f'token {token}',
+                'Accept': 'application/vnd.github.v3+json'
+            }
+
+            # Формируем URL для API GitHub
+            api_url = f"{Config.GITHUB_API_URL}/repos/{Config.GITHUB_REPO_OWNER}/{Config.GITHUB_REPO_NAME}/contents/progress/{filename}"
+
+            # Кодируем содержимое в base64
+            content_bytes = json.dumps(content, separators=(',', ':')).encode('utf-8')
+            content_base64 = base64.b64encode(content_bytes).decode('utf-8')
+
+            # Проверяем существование файла
+            response = requests.get(api_url, headers=headers)
+            
+            data = {
+                'message': f'Update game progress {datetime.now().isoformat()}',
+                'content': content_base64,
+                'branch': 'main'
+            }
+
+            if response.status_code == 200:
+                # Файл существует, добавляем его SHA
+                current_file = response.json()
+                data['sha'] = current_file['sha']
+                
+            # Отправляем запрос
+            response = requests.put(api_url, headers=headers, json=data)
+            
+            if response.status_code not in [200, 201]:
+                logger.error(f"GitHub sync failed: {response.text}")
+                return False
+            logger.info(f"Successfully synced {filename} with GitHub")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error syncing with GitHub: {str(e)}")
+            return False
+
+    def cleanup_old_games(self) -> int:
+        """Очистка старых сохранений"""
+        try:
+            current_time = datetime.now()
+            cleanup_threshold = current_time - timedelta(days=Config.CLEANUP_DAYS)
+            
+            # Подсчет количества файлов
+            files = []
+            for filename in os.listdir(self.progress_dir):
+                if filename.endswith('.json') and filename.startswith('game_'):
+                    filepath = os.path.join(self.progress_dir, filename)
+                    with open(filepath, 'r') as f:
+                        state = json.load(f)
+                        timestamp = datetime.fromisoformat(state['timestamp'])
+                        files.append((filepath, timestamp))
+
+            # Сортировка файлов по времени
+            files.sort(key=lambda x: x[1], reverse=True)
+
+            # Удаление старых файлов
+            removed = 0
+            for filepath, timestamp in files[Config.MAX_SAVED_GAMES:]:
+                if timestamp < cleanup_threshold:
+                    os.remove(filepath)
+                    self.remove_deck_state(os.path.basename(filepath)[len('game_'):-len('.json')])
+                    removed += 1
+                    logger.info(f"Removed old save file: {filepath}")
+            return removed
+
+        except Exception as e:
+            logger.error(f"Error cleaning up old games: {str(e)}")
+            return 0
+
+    def backup_progress(self, incremental: bool = True) -> Optional[str]:
+        """Создание резервной копии прогресса
+
+        Инкрементальная копия содержит только файлы, измененные после
+        предыдущей копии; полная делается первой и каждые
+        Config.FULL_BACKUP_EVERY копий. Возвращает путь к архиву или None,
+        если изменений не было.
+        """
+        try:
+            backup_dir = Config.BACKUP_DIR
+            os.makedirs(backup_dir, exist_ok=True)
+            manifest = self._load_backup_manifest()
+            backups = manifest['backups']
+            
+            current = self._progress_files()
+            since_full = next((i for i, b in enumerate(reversed(backups)) if b['type'] == 'full'), None)
+            full = not incremental or since_full is None or since_full >= Config.FULL_BACKUP_EVERY
+            if full:
+                changed = sorted(current)
+            else:
+                previous = manifest['files']
+                changed = sorted(name for name, stat in current.items() if previous.get(name) != stat)
+                if not changed and set(previous) == set(current):
+                    return None
+                
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            kind = 'full' if full else 'incr'
+            backup_file = os.path.join(backup_dir, f'progress_backup_{timestamp}_{kind}.zip')
+            
+            tmp_file = f"{backup_file}.tmp"
+            with zipfile.ZipFile(tmp_file, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for name in changed:
+                    archive.write(os.path.join(self.progress_dir, name), name)
+            os.replace(tmp_file, backup_file)
+            
+            # Список файлов на момент копии нужен для восстановления удалений
+            backups.append({
+                'file': os.path.basename(backup_file),
+                'type': 'full' if full else 'incremental',
+                'files': sorted(current)
+            })
+            manifest['files'] = current
+            self._write_json(self._backup_manifest_path(), manifest)
+            
+            logger.info(f"Created {backups[-1]['type']} backup: {backup_file} ({len(changed)} files)")
+            return backup_file
+
+        except Exception as e:
+            logger.error(f"Error creating backup: {str(e)}")
+            raise
+
+    def restore_backup(self, backup_file: str):
+        """Восстановление из резервной копии (полная копия и цепочка инкрементальных)"""
+        try:
+            if not os.path.exists(backup_file):
+                raise FileNotFoundError("Backup file not found")
+                
+            backups = self._load_backup_manifest()['backups']
+            names = [b['file'] for b in backups]
+            name = os.path.basename(backup_file)
+            if name in names:
+                index = names.index(name)
+                start = max(i for i in range(index + 1) if backups[i]['type'] == 'full')
+                chain = [os.path.join(os.path.dirname(backup_file), b['file'])
+                         for b in backups[start:index + 1]]
+                present = set(backups[index]['files'])
+            else:
+                # Архив старого формата — полная копия
+                chain, present = [backup_file], None
+                
+            # Очищаем текущую директорию прогресса
+            if os.path.exists(self.progress_dir):
+                shutil.rmtree(self.progress_dir)
+            os.makedirs(self.progress_dir)
+                
+            # Распаковываем архивы по порядку
+            for archive in chain:
+                shutil.unpack_archive(archive, self.progress_dir)
+            if present is not None:
+                for filename in os.listdir(self.progress_dir):
+                    if filename not in present:
+                        os.remove(os.path.join(self.progress_dir, filename))
+            
+            logger.info(f"Restored from backup: {backup_file} ({len(chain)} archives)")
+            
+            # Файлы, отличающиеся от отправленных, синхронизируются с GitHub
+            if not Config.SCHEDULER_ENABLED:
+                self.sync_pending()
+
+        except Exception as e:
+            logger.error(f"Error restoring from backup: {str(e)}")
+            raise
+
+    def sync_pending(self) -> int:
+        """Синхронизация с GitHub сохранений, изменившихся после последней отправки
+
+        Отправленное содержимое запоминается по хэшу, поэтому файлы,
+        восстановленные из копии без изменений, повторно не выгружаются.
+        Возвращает число отправленных файлов.
+        """
+        if not Config.AI_PROGRESS_TOKEN or not Config.GITHUB_SYNC:
+            return 0
+            
+        synced = self._read_json(Config.SYNC_MANIFEST_FILE, {})
+        sent = 0
+        try:
+            for filename in sorted(self._progress_files()):
+                if not (filename.endswith('.json') and filename.startswith('game_')):
+                    continue
+                with open(os.path.join(self.progress_dir, filename), 'rb') as f:
+                    raw = f.read()
+                digest = hashlib.sha1(raw).hexdigest()
+                if synced.get(filename) == digest:
+                    continue
+                if self._sync_with_github(filename, json.loads(raw)):
+                    synced[filename] = digest
+                    sent += 1
+        finally:
+            self._write_json(Config.SYNC_MANIFEST_FILE, synced)
+        return sent
+
+    def _progress_files(self) -> Dict[str, List]:
+        """Файлы каталога прогресса: имя -> [mtime_ns, размер]"""
+        files = {}
+        for entry in os.scandir(self.progress_dir):
+            if entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = [stat.st_mtime_ns, stat.st_size]
+        return files
+
+    def _backup_manifest_path(self) -> str:
+        return os.path.join(Config.BACKUP_DIR, 'backup_manifest.json')
+
+    def _load_backup_manifest(self) -> Dict:
+        """Список резервных копий и состояние файлов на момент последней"""
+        return self._read_json(self._backup_manifest_path(), {'backups': [], 'files': {}})
+
+    @staticmethod
+    def _read_json(path: str, default):
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    @staticmethod
+    def _write_json(path: str, data):
+        """Атомарная запись JSON"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def get_game_stats(self) -> Dict:
+        """Получение статистики по играм"""
+        try:
+            stats = {
+                'total_games': 0,
+                'completed_games': 0,
+                'fantasy_games': 0,
+                'average_score': 0,
+                'highest_score': 0,
+                'total_time_played': 0
+            }
+            
+            scores = []
+            for filename in os.listdir(self.progress_dir):
+                if filename.endswith('.json') and filename.startswith('game_'):
+                    with open(os.path.join(self.progress_dir, filename), 'r') as f:
+                        state = json.load(f)
+                        stats['total_games'] += 1
+                        
+                        if state.get('is_final'):
+                            stats['completed_games'] += 1
+                            if 'scores' in state:
+                                player_score = state['scores']['player']['total']
+                                scores.append(player_score)
+                                stats['highest_score'] = max(
+                                    stats['highest_score'], 
+                                    player_score
+                                )
+                        
+                        if state.get('fantasy_enabled'):
+                            stats['fantasy_games'] += 1
+            
+            if scores:
+                stats['average_score'] = sum(scores) / len(scores)
+            
+            return stats
+
+        except Exception as e:
+            logger.error(f"Error getting game stats: {str(e)}")
+            return {}
+
+# Глобальный экземпляр для управления состоянием (создается при первом обращении)
+_game_state: Optional[GameState] = None
+
+def get_game_state() -> GameState:
+    """Глобальный экземпляр GameState"""
+    global _game_state
+    if _game_state is None:
+        _game_state = GameState()
+    return _game_state
+
+def save_game_state(state: Dict):
+    """Обертка для сохранения состояния"""
+    get_game_state().save_game_state(state)
+
+def load_game_state(game_id: str) -> Optional[Dict]:
+    """Обертка для загрузки состояния"""
+    return get_game_state().load_game_state(game_id)
+
+def save_deck_state(game_id: str, deck_state: Dict):
+    """Обертка для локального сохранения колоды"""
+    get_game_state().save_deck_state(game_id, deck_state)
+
+def load_deck_state(game_id: str) -> Optional[Dict]:
+    """Обертка для загрузки колоды"""
+    return get_game_state().load_deck_state(game_id)
+
+def remove_deck_state(game_id: str):
+    """Обертка для удаления колоды"""
+    get_game_state().remove_deck_state(game_id)
+
+def list_saved_games() -> List[Dict]:
+    """Обертка для получения списка сохраненных игр"""
+    return get_game_state().list_saved_games()
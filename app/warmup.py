@@ -0,0 +1,134 @@
+"""Прогрев приложения в мастер-процессе gunicorn и замер памяти воркеров.
+
+При preload_app мастер один раз загружает таблицы оценки и хранилище
+стратегии (массивы NumPy, отображенные через mmap), после чего замораживает
+сборщик мусора. Воркеры после fork делят эти страницы с мастером.
+
+Без прогрева (PRELOAD=0) тяжелые модули — requests, NumPy, стратегия ИИ и
+таблицы оценки — загружаются при первом обращении, а /api/health отвечает
+сразу после старта.
+
+Замер:
+    python -m app.warmup                  # время прогрева в текущем процессе
+    python -m app.warmup --importtime     # профиль импорта при холодном старте
+    python -m app.warmup --pid <master>   # RSS/PSS мастера и воркеров gunicorn
+"""
+import argparse
+import gc
+import logging
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> Dict[str, float]:
+    """Загрузка общих данных до fork; возвращает длительность этапов в секундах"""
+    timings = {}
+    started = time.perf_counter()
+
+    from .game import evaluator
+    evaluator.tables()
+    timings['evaluator_tables'] = time.perf_counter() - started
+
+    stage = time.perf_counter()
+    from .ai.strategy import build_policy_store
+    from .game import table
+    build_policy_store()
+    table._get_ai_strategy()
+    timings['policy_store'] = time.perf_counter() - stage
+
+    # Объекты, созданные до fork, больше не трогаются сборщиком мусора
+    gc.collect()
+    gc.freeze()
+
+    timings['total'] = time.perf_counter() - started
+    logger.info("Warm-up finished in %.3fs (%s)", timings['total'],
+                ', '.join(f"{name}={value:.3f}s" for name, value in timings.items()))
+    return timings
+
+
+def process_memory(pid: int) -> Dict[str, int]:
+    """Память процесса в КБ из /proc/<pid>/smaps_rollup"""
+    fields = ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty')
+    memory = {}
+    with open(f"/proc/{pid}/smaps_rollup", 'r') as f:
+        for line in f:
+            name, _, value = line.partition(':')
+            if name in fields:
+                memory[name] = int(value.split()[0])
+    return memory
+
+
+def child_pids(pid: int) -> List[int]:
+    """Дочерние процессы (воркеры gunicorn)"""
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        path = f"/proc/{pid}/task/{task}/children"
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                children.extend(int(child) for child in f.read().split())
+    return children
+
+
+def memory_report(master_pid: int) -> Dict:
+    """Отчет по памяти мастера и воркеров"""
+    workers = {pid: process_memory(pid) for pid in child_pids(master_pid)}
+    return {
+        'master': process_memory(master_pid),
+        'workers': workers,
+        'private_per_worker_kb': (
+            sum(m.get('Private_Dirty', 0) + m.get('Private_Clean', 0) for m in workers.values())
+            // max(len(workers), 1)
+        )
+    }
+
+
+def import_profile(module: str = 'run', limit: int = 20) -> List[Tuple[str, int, int]]:
+    """Профиль импорта модуля в чистом интерпретаторе (python -X importtime)
+
+    Возвращает (модуль, собственное время, накопленное время) в микросекундах,
+    отсортированные по накопленному времени.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=root, env=dict(os.environ, PRELOAD='0'), capture_output=True, text=True
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        entries.append((name.strip(), int(self_us), int(cumulative_us)))
+    entries.sort(key=lambda entry: entry[2], reverse=True)
+    return entries[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm-up timing and worker memory report')
+    parser.add_argument('--pid', type=int, help='PID мастер-процесса gunicorn')
+    parser.add_argument('--importtime', action='store_true', help='профиль импорта run.py')
+    args = parser.parse_args()
+
+    if args.importtime:
+        print(f"{'cumulative':>12} {'self':>10}  module")
+        for name, self_us, cumulative_us in import_profile():
+            print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms  {name}")
+    elif args.pid:
+        report = memory_report(args.pid)
+        print(f"master: {report['master']}")
+        for pid, memory in report['workers'].items():
+            print(f"worker {pid}: {memory}")
+        print(f"private memory per worker: {report['private_per_worker_kb']} kB")
+    else:
+        logging.basicConfig(level=logging.INFO)
+        for name, value in warm_up().items():
+            print(f"{name}: {value:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
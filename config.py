@@ -6,6 +6,7 @@ class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'default-secret-key-for-dev')
     AI_PROGRESS_TOKEN = os.environ.get('AI_PROGRESS_TOKEN')
     PROGRESS_DIR = os.path.join(os.path.dirname(__file__), 'progress')
+    CACHE_DIR = os.environ.get('CACHE_DIR', os.path.join(os.path.dirname(__file__), 'cache'))
     VERSION = '1.0.0'
     
     # Настройки сервера
@@ -23,9 +24,15 @@ class Config:
     MIDDLE_ROW_SIZE = 5
     BOTTOM_ROW_SIZE = 5
 
+    # Места за столом (игрок + ИИ)
+    TABLE_SEATS = int(os.environ.get('TABLE_SEATS', 2))
+    MAX_TABLE_SEATS = 3
+
     # Таймауты
     MOVE_TIMEOUT = 30  # секунд
     GAME_TIMEOUT = 600  # секунд
+    GAME_LOCK_TIMEOUT = 5  # секунд ожидания блокировки игры
+    TABLE_IDLE_TIMEOUT = 3600  # секунд до выгрузки неактивного стола из памяти
     
     # Очки
     SCOOP_BONUS = 3  # Бонус за выигрыш всех линий
@@ -53,11 +60,87 @@ class Config:
         '77': 2, '66': 1
     }
 
+    # Количество карт в фантазии за комбинацию в верхней линии
+    FANTASY_CARDS = {'QQ': 14, 'KK': 15, 'AA': 16}
+    FANTASY_TRIPS_CARDS = 17
+
+    # Кэш предвычисленных таблиц оценки рук (каталог .npy для загрузки через mmap)
+    EVALUATOR_CACHE = os.path.join(CACHE_DIR, 'evaluator')
+
+    # Стратегия ИИ: обучаемая таблица и компактное хранилище для сервинга
+    AI_STRATEGY_FILE = os.path.join(PROGRESS_DIR, 'ai_strategy.json')
+    POLICY_STORE_DIR = os.path.join(CACHE_DIR, 'policy')
+
+    # Книга дебютов: раскладка первой улицы для канонических рук
+    OPENING_BOOK_DIR = os.path.join(CACHE_DIR, 'opening_book')
+    OPENING_BOOK_ROLLOUTS = 64
+
+    # Отбрасывание ходов MCCFR, ведущих к неизбежно мертвой руке
+    FOUL_PRUNING = os.environ.get('FOUL_PRUNING', '1') == '1'
+
+    # Контрольные точки обучения: дельта-сегменты каждые CHECKPOINT_INTERVAL итераций
+    CHECKPOINT_DIR = os.path.join(CACHE_DIR, 'checkpoints')
+    # Состояние колод (с зерном) только локально: progress/ синхронизируется в GitHub
+    DECK_STATE_DIR = os.path.join(CACHE_DIR, 'decks')
+    CHECKPOINT_INTERVAL = int(os.environ.get('CHECKPOINT_INTERVAL', 100))
+    CHECKPOINT_COMPACT_SEGMENTS = 10  # сегментов до фонового уплотнения
+    TRAIN_ITERATIONS = 1000
+    # Розыгрышей на оценку доски в конце улицы при обучении (свободные слоты
+    # заполняются случайными картами из колоды)
+    STREET_ROLLOUTS = 16
+
+    # Хранилище узлов MCCFR с потолком памяти (0 — без ограничения, обычный dict)
+    NODE_STORE_FILE = os.path.join(CACHE_DIR, 'nodes.sqlite')
+    NODE_STORE_MAX_MB = int(os.environ.get('NODE_STORE_MAX_MB', 0))
+
+    # Онлайн-обучение: итоги игр в спул, процесс app.ai.learner публикует версии стратегии
+    ONLINE_LEARNING = os.environ.get('ONLINE_LEARNING', '0') == '1'
+    LEARNING_SPOOL_DIR = os.path.join(CACHE_DIR, 'outcomes')
+    LEARNING_QUEUE_SIZE = 10000
+    LEARNER_CHECKPOINT_DIR = os.path.join(CACHE_DIR, 'learner')
+    LEARNER_BATCH_FILES = 100  # файлов спула за пакет
+    LEARNER_PUBLISH_INTERVAL = 300  # секунд между публикациями стратегии
+    POLICY_KEEP_VERSIONS = 3
+    # Формат вероятностей стратегии сервинга: float32, uint16 или uint8
+    POLICY_PROB_DTYPE = os.environ.get('POLICY_PROB_DTYPE', 'uint8')
+    POLICY_RELOAD_INTERVAL = 30  # секунд между проверками новой версии в воркерах
+
+    # Сжатие ответов и кэширование статики
+    COMPRESS_MIN_SIZE = 512  # байт
+    COMPRESS_LEVEL = 6
+    SEND_FILE_MAX_AGE_DEFAULT = 31536000  # секунд, URL статики содержат хэш содержимого
+
+    # Потоки воркера gunicorn и предел открытых потоков событий (SSE) в нем:
+    # каждый поток /api/events держит поток воркера, пока открыта вкладка
+    WORKER_THREADS = int(os.environ.get('THREADS', 32))
+    MAX_EVENT_STREAMS = int(os.environ.get('MAX_EVENT_STREAMS', WORKER_THREADS * 3 // 4))
+
+    # Несколько воркеров gunicorn только за балансировщиком со sticky-сессиями
+    STICKY_SESSIONS = os.environ.get('STICKY_SESSIONS', '0') == '1'
+
+    # Прогрев в мастер-процессе gunicorn до fork. Память делится только между
+    # несколькими воркерами, поэтому по умолчанию он включен вместе со sticky-сессиями
+    PRELOAD = os.environ.get('PRELOAD', '1' if STICKY_SESSIONS else '0') == '1'
+
     # Настройки GitHub
     GITHUB_API_URL = 'https://api.github.com'
     GITHUB_REPO_OWNER = os.environ.get('GITHUB_REPOSITORY', '').split('/')[0]
     GITHUB_REPO_NAME = os.environ.get('GITHUB_REPOSITORY', '').split('/')[-1]
+    # GITHUB_SYNC=0 отключает отправку сохранений (нагрузочные тесты, локальный запуск)
+    GITHUB_SYNC = os.environ.get('GITHUB_SYNC', '1') == '1'
 
     # Настройки сохранения
     MAX_SAVED_GAMES = 100
     CLEANUP_DAYS = 30
+    BACKUP_DIR = os.path.join(os.path.dirname(PROGRESS_DIR), 'progress_backup')
+    FULL_BACKUP_EVERY = 24  # инкрементальных копий между полными
+
+    # Фоновое обслуживание: очистка, резервные копии и синхронизация с GitHub.
+    # Выключенный планировщик возвращает очистку и синхронизацию в сохранение игры.
+    SCHEDULER_ENABLED = os.environ.get('MAINTENANCE_SCHEDULER', '1') == '1'
+    SCHEDULER_LOCK_FILE = os.path.join(CACHE_DIR, 'maintenance.lock')
+    SCHEDULER_STATS_FILE = os.path.join(CACHE_DIR, 'maintenance_stats.json')
+    SYNC_MANIFEST_FILE = os.path.join(CACHE_DIR, 'sync_manifest.json')
+    CLEANUP_INTERVAL = int(os.environ.get('CLEANUP_INTERVAL', 3600))  # секунд
+    BACKUP_INTERVAL = int(os.environ.get('BACKUP_INTERVAL', 6 * 3600))  # секунд
+    SYNC_INTERVAL = int(os.environ.get('SYNC_INTERVAL', 60))  # секунд
@@ -0,0 +1,30 @@
+import os
+from config import Config
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+# Столы с их блокировками и версиями хранятся в памяти воркера: два воркера
+# с одной игрой приняли бы изменения одной версии, и сохранение последнего
+# затерло бы первое. Поэтому воркер один, если балансировщик не направляет
+# игру всегда в один воркер (sticky-сессии по game_id, STICKY_SESSIONS=1).
+workers = int(os.environ.get('WEB_CONCURRENCY', 2)) if Config.STICKY_SESSIONS else 1
+
+# Потоки внутри воркера: разные игры обрабатываются параллельно, запросы
+# одной игры упорядочены блокировкой стола. Открытый поток событий (SSE)
+# занимает поток на все время подключения, поэтому потоков много, а число
+# потоков событий ограничено MAX_EVENT_STREAMS.
+worker_class = 'gthread'
+threads = Config.WORKER_THREADS
+
+# Приложение и общие данные загружаются в мастере один раз до fork.
+# Время прогрева пишется в лог ("Warm-up finished in ..."), память воркеров
+# проверяется командой: python -m app.warmup --pid <PID мастера>
+preload_app = Config.PRELOAD
+
+
+def on_starting(server):
+    """Прогрев таблиц оценки и хранилища стратегии в мастер-процессе"""
+    if Config.PRELOAD:
+        from app.warmup import warm_up
+        timings = warm_up()
+        server.log.info("Preloaded shared data in %.3fs", timings['total'])
+
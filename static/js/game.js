@@ -5,21 +5,121 @@ class ChinesePoker {
         this.gameState = {
             currentStreet: 0,
             gameId: null,
+            version: null,
             playerCards: [],
             placedCards: {
                 top: Array(3).fill(null),
                 middle: Array(5).fill(null),
                 bottom: Array(5).fill(null)
             },
+            streetPlacements: [],
             timer: 30,
             timerInterval: null
         };
 
+        this.events = null;
+
         this.initializeElements();
         this.attachEventListeners();
         this.loadGameState();
     }
 
+    connectEvents(gameId) {
+        // Канал событий своей игры (SSE); без него — обычные запросы
+        if (this.events) {
+            this.events.close();
+            this.events = null;
+        }
+        if (!window.EventSource || !gameId) {
+            return;
+        }
+
+        this.events = new EventSource(`/api/events?game_id=${encodeURIComponent(gameId)}`);
+        const handlers = {
+            deal: data => this.onStreetResult(data),
+            fantasy: data => this.onStreetResult(data),
+            scores: data => this.onStreetResult(data),
+            fantasy_cards: data => this.onFantasyCards(data),
+            ai_place: data => this.renderAiCard(data),
+            conflict: data => this.onConflict(data),
+            error: data => this.onActionError(data)
+        };
+
+        this.events.onerror = () => {
+            // Сервер отказал в потоке (например, 503) — дальше обычные запросы
+            if (this.events && this.events.readyState === EventSource.CLOSED) {
+                this.events = null;
+            }
+        };
+
+        Object.entries(handlers).forEach(([event, handler]) => {
+            this.events.addEventListener(event, e => {
+                // Событие error без данных — обрыв соединения, EventSource переподключится сам
+                if (!e.data) {
+                    return;
+                }
+                const data = JSON.parse(e.data);
+                // События другой игры (после новой игры в этой вкладке) отбрасываются
+                if (data.game_id && data.game_id !== this.gameState.gameId) {
+                    return;
+                }
+                handler(data);
+            });
+        });
+    }
+
+    async sendAction(type, payload = {}) {
+        // Действие принимается сразу, результат приходит событием
+        // game_id и в строке запроса: по нему балансировщик направляет игру в один воркер
+        const query = payload.game_id ? `?game_id=${encodeURIComponent(payload.game_id)}` : '';
+        const response = await fetch(`/api/action${query}`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ type, ...payload })
+        });
+
+        if (!response.ok) {
+            const data = await response.json();
+            throw new Error(data.error || 'Failed to send action');
+        }
+    }
+
+    gameRequest(payload = {}) {
+        // Игра и версия состояния, на которую опирается действие
+        return { game_id: this.gameState.gameId, version: this.gameState.version, ...payload };
+    }
+
+    trackVersion(data) {
+        if (data && data.version !== undefined) {
+            this.gameState.version = data.version;
+        }
+    }
+
+    onConflict(data) {
+        // Состояние изменилось в другой вкладке или запросе — перечитываем игру
+        if (data.game_id && data.game_id !== this.gameState.gameId) {
+            return;
+        }
+        this.hideLoader();
+        this.showToast('Состояние игры изменилось, загружаем заново', 'warning');
+        this.gameState.version = data.version;
+        this.saveGameState();
+        this.loadGameState();
+    }
+
+    onActionError(data) {
+        this.hideLoader();
+        this.showToast(data.error || 'Action failed', 'error');
+    }
+
+    renderAiCard(data) {
+        const slots = this.elements.aiTable.querySelectorAll(`.${data.row}-row .card-slot`);
+        const slot = slots[data.position];
+        if (slot && !slot.children.length) {
+            slot.appendChild(this.deck.createCardElement(data.card));
+        }
+    }
+
     initializeElements() {
         this.elements = {
             startBtn: document.getElementById('start-btn'),
@@ -95,6 +195,7 @@ class ChinesePoker {
     async startGame() {
         try {
             this.showLoader();
+            // Новая игра начинается обычным запросом: его ответ дает game_id для канала событий
             const response = await fetch('/api/start', { 
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' }
@@ -105,7 +206,19 @@ class ChinesePoker {
                 throw new Error(data.error || 'Failed to start game');
             }
 
+            await this.onGameStarted(data);
+        } catch (error) {
+            this.showToast(error.message, 'error');
+            console.error('Error starting game:', error);
+            this.hideLoader();
+        }
+    }
+
+    async onGameStarted(data) {
+        try {
             this.gameState.gameId = data.game_id;
+            this.connectEvents(data.game_id);
+            this.trackVersion(data);
             this.gameState.currentStreet = 1;
             this.elements.currentStreet.textContent = '1';
             
@@ -122,9 +235,6 @@ class ChinesePoker {
             this.startTimer();
 
             this.showToast('Игра началась!', 'success');
-        } catch (error) {
-            this.showToast(error.message, 'error');
-            console.error('Error starting game:', error);
         } finally {
             this.hideLoader();
         }
@@ -138,16 +248,55 @@ class ChinesePoker {
 
         try {
             this.showLoader();
-            const response = await fetch('/api/next', { 
+            // Весь расклад улицы и сброс отправляются одним запросом
+            const discardElement = this.elements.playerHand.querySelector('.card');
+            const payload = {
+                placements: this.gameState.streetPlacements,
+                discard: discardElement
+                    ? { rank: discardElement.dataset.rank, suit: discardElement.dataset.suit }
+                    : null
+            };
+
+            if (this.events) {
+                await this.sendAction('street', this.gameRequest(payload));
+                return;
+            }
+
+            const response = await fetch('/api/street', { 
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' }
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(this.gameRequest(payload))
             });
             const data = await response.json();
 
+            if (response.status === 409) {
+                this.onConflict(data);
+                return;
+            }
             if (!response.ok) {
                 throw new Error(data.error || 'Failed to proceed to next street');
             }
 
+            await this.onStreetResult(data);
+        } catch (error) {
+            this.showToast(error.message, 'error');
+            console.error('Error in next street:', error);
+            this.hideLoader();
+        }
+    }
+
+    async onStreetResult(data) {
+        try {
+            if (data.game_id && data.game_id !== this.gameState.gameId) {
+                return;
+            }
+            this.trackVersion(data);
+            this.gameState.streetPlacements = [];
+            const discardElement = this.elements.playerHand.querySelector('.card');
+            if (discardElement) {
+                discardElement.remove();
+            }
+
             if (data.final) {
                 await this.showFinalScores(data.scores);
             } else if (data.fantasy) {
@@ -158,9 +307,6 @@ class ChinesePoker {
                 await this.dealStreetCards(data.player_cards);
                 this.resetTimer();
             }
-        } catch (error) {
-            this.showToast(error.message, 'error');
-            console.error('Error in next street:', error);
         } finally {
             this.hideLoader();
         }
@@ -183,28 +329,13 @@ class ChinesePoker {
     }
 
     async placeCard(cardData, row, position) {
-        try {
-            const response = await fetch('/api/place', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ card: cardData, row, position })
-            });
-
-            const result = await response.json();
-            
-            if (!response.ok) {
-                throw new Error(result.error || 'Failed to place card');
-            }
-
-            if (result.success) {
-                this.gameState.placedCards[row][position] = cardData;
-                return true;
-            }
-            return false;
-        } catch (error) {
-            this.showToast(error.message, 'error');
+        // Расклад хранится локально до отправки улицы
+        if (this.gameState.placedCards[row][position]) {
             return false;
         }
+        this.gameState.placedCards[row][position] = cardData;
+        this.gameState.streetPlacements.push({ card: cardData, row, position });
+        return true;
     }
 
     handleCardDrop(e, slot) {
@@ -264,12 +395,13 @@ class ChinesePoker {
             bottom: this.gameState.placedCards.bottom.filter(card => card !== null).length
         };
 
+        const streetCards = this.gameState.streetPlacements.length;
         if (this.gameState.currentStreet === 1) {
-            if (cardsPlaced.top + cardsPlaced.middle + cardsPlaced.bottom === 5) {
+            if (streetCards === 5) {
                 this.elements.okBtn.disabled = false;
             }
         } else {
-            if (cardsPlaced.top + cardsPlaced.middle + cardsPlaced.bottom === 2) {
+            if (streetCards === 2) {
                 this.elements.okBtn.disabled = false;
             }
         }
@@ -279,19 +411,15 @@ class ChinesePoker {
         // Проверка правильности размещения карт
         const placement = this.gameState.placedCards;
         
-        // Проверка количества карт
-        const countCards = (row) => row.filter(card => card !== null).length;
+        // Проверка количества карт текущей улицы
+        const streetCards = this.gameState.streetPlacements.length;
         
         if (this.gameState.currentStreet === 1) {
-            if (countCards(placement.top) + 
-                countCards(placement.middle) + 
-                countCards(placement.bottom) !== 5) {
+            if (streetCards !== 5) {
                 return false;
             }
         } else {
-            if (countCards(placement.top) + 
-                countCards(placement.middle) + 
-                countCards(placement.bottom) !== 2) {
+            if (streetCards !== 2) {
                 return false;
             }
         }
@@ -450,9 +578,15 @@ class ChinesePoker {
     async startFantasy() {
         try {
             this.showLoader();
+            if (this.events) {
+                await this.sendAction('fantasy', this.gameRequest());
+                return;
+            }
+
             const response = await fetch('/api/fantasy', { 
                 method: 'POST',
-                headers: { 'Content-Type': 'application/json' }
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(this.gameRequest())
             });
             const data = await response.json();
 
@@ -460,6 +594,16 @@ class ChinesePoker {
                 throw new Error(data.error || 'Failed to start fantasy');
             }
 
+            await this.onFantasyCards(data);
+        } catch (error) {
+            this.showToast(error.message, 'error');
+            console.error('Error in fantasy:', error);
+            this.hideLoader();
+        }
+    }
+
+    async onFantasyCards(data) {
+        try {
             // Очистка столов
             this.clearTables();
             
@@ -470,9 +614,6 @@ class ChinesePoker {
             }
 
             this.startTimer();
-        } catch (error) {
-            this.showToast(error.message, 'error');
-            console.error('Error in fantasy:', error);
         } finally {
             this.hideLoader();
         }
@@ -603,6 +744,7 @@ class ChinesePoker {
             middle: Array(5).fill(null),
             bottom: Array(5).fill(null)
         };
+        this.gameState.streetPlacements = [];
 
         // Скрытие результатов
         this.elements.scoring.style.display = 'none';
@@ -634,6 +776,7 @@ class ChinesePoker {
 
     restoreGameState(state) {
         this.gameState = state;
+        this.connectEvents(state.gameId || state.game_id);
         this.clearTables();
         
         // Восстановление размещенных карт
@@ -0,0 +1,33 @@
+"""Общие фикстуры: файлы игр и ИИ во временном каталоге, клиент приложения"""
+import pytest
+from config import Config
+
+
+@pytest.fixture
+def storage(tmp_path, monkeypatch):
+    """Сохранения, колоды и данные ИИ теста во временном каталоге"""
+    monkeypatch.setattr(Config, 'PROGRESS_DIR', str(tmp_path / 'progress'))
+    monkeypatch.setattr(Config, 'DECK_STATE_DIR', str(tmp_path / 'decks'))
+    monkeypatch.setattr(Config, 'AI_STRATEGY_FILE', str(tmp_path / 'progress' / 'ai_strategy.json'))
+    monkeypatch.setattr(Config, 'POLICY_STORE_DIR', str(tmp_path / 'policy'))
+    monkeypatch.setattr(Config, 'OPENING_BOOK_DIR', str(tmp_path / 'opening_book'))
+    monkeypatch.setattr(Config, 'CHECKPOINT_DIR', str(tmp_path / 'checkpoints'))
+    monkeypatch.setattr(Config, 'NODE_STORE_MAX_MB', 0)
+    monkeypatch.setattr(Config, 'SCHEDULER_ENABLED', False)
+    monkeypatch.setattr(Config, 'ONLINE_LEARNING', False)
+    monkeypatch.setattr(Config, 'GITHUB_SYNC', False)
+    from app.game import table
+    from app.utils import state
+    monkeypatch.setattr(state, '_game_state', None)
+    monkeypatch.setattr(table, '_ai_strategy', None)
+    return tmp_path
+
+
+@pytest.fixture
+def client(storage, monkeypatch):
+    """Тестовый клиент с пустым реестром столов"""
+    from app import create_app, routes
+    monkeypatch.setattr(routes, '_registry', None)
+    app = create_app()
+    app.testing = True
+    return app.test_client()
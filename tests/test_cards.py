@@ -0,0 +1,38 @@
+"""Общие объекты карт и колода на массиве с зерном"""
+from app.game.array_deck import ArrayDeck
+from app.game.cards import card_index, intern_card
+from app.game.deck import Card
+
+
+def test_intern_card_returns_shared_objects():
+    card = intern_card('Ah')
+    assert intern_card({'rank': 'A', 'suit': 'h'}) is card
+    assert intern_card(card_index('Ah')) is card
+    assert intern_card(Card('A', 'h')) is card
+    assert card == Card('A', 'h') and card.to_dict() == {'rank': 'A', 'suit': 'h'}
+
+
+def test_seeded_deck_is_reproducible():
+    first, second = ArrayDeck(42), ArrayDeck(42)
+    assert first.deal(13) == second.deal(13)
+    assert len({card_index(card) for card in first.deal(39)}) == 39
+
+
+def test_deck_state_replays_position():
+    deck = ArrayDeck(7)
+    deck.deal(5)
+    deck.reset()
+    deck.deal(8)
+    deck.kill(['Ah', 'Kd'])
+    restored = ArrayDeck.from_state(deck.state())
+    assert restored.deal(10) == deck.deal(10)
+
+
+def test_completions_use_live_cards_only():
+    deck = ArrayDeck(3)
+    dealt = {card_index(card) for card in deck.deal(20)}
+    deck.kill(['Ah'])
+    samples = deck.completions(50, 5)
+    assert samples.shape == (50, 5)
+    assert not dealt & set(samples.ravel().tolist())
+    assert card_index('Ah') not in samples
@@ -0,0 +1,64 @@
+"""Прерванное обучение стратегии продолжается с последней контрольной точки"""
+import pytest
+from config import Config
+from app.ai.checkpoint import CheckpointStore
+from app.ai.mccfr import MCCFR
+from app.ai.strategy import AIStrategy
+
+ITERATIONS = 250
+INTERVAL = 100
+KILLED_AT = 150
+
+
+class Killed(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'AI_STRATEGY_FILE', str(tmp_path / 'progress' / 'ai_strategy.json'))
+    monkeypatch.setattr(Config, 'CHECKPOINT_DIR', str(tmp_path / 'checkpoints'))
+    monkeypatch.setattr(Config, 'OPENING_BOOK_DIR', str(tmp_path / 'opening_book'))
+    monkeypatch.setattr(Config, 'NODE_STORE_MAX_MB', 0)
+
+
+def test_initial_state_deals_cards():
+    mccfr = MCCFR(seed=1)
+    mccfr.train(AIStrategy(use_policy_store=False)._get_initial_state(), 5)
+    assert mccfr.stats['nodes_visited'] > 0
+    assert len(mccfr.nodes) > 0
+
+
+def test_train_kill_resume(monkeypatch):
+    strategy = AIStrategy(use_policy_store=False)
+    root = strategy._get_initial_state()
+    strategy.mccfr = MCCFR(seed=3)
+
+    # Процесс "убивается" посреди интервала после первой контрольной точки
+    cfr = MCCFR._cfr
+
+    def killed_cfr(self, state, reaching_prob):
+        if self.iteration == KILLED_AT:
+            raise Killed()
+        return cfr(self, state, reaching_prob)
+
+    monkeypatch.setattr(MCCFR, '_cfr', killed_cfr)
+    with pytest.raises(Killed):
+        strategy.mccfr.train(root, ITERATIONS, checkpoint=CheckpointStore(Config.CHECKPOINT_DIR),
+                             checkpoint_interval=INTERVAL)
+    monkeypatch.setattr(MCCFR, '_cfr', cfr)
+
+    reference = MCCFR(seed=3)
+    reference.train(root, INTERVAL)
+    store = CheckpointStore(Config.CHECKPOINT_DIR)
+    store.wait()
+    resumed = MCCFR.resume(store)
+    assert resumed.iteration == INTERVAL
+    assert len(resumed.nodes) == len(reference.nodes)
+
+    # Перезапуск продолжает с контрольной точки и повторяет те же раздачи
+    restarted = AIStrategy(use_policy_store=False)
+    restarted.initialize(iterations=ITERATIONS)
+    reference.train(root, ITERATIONS - INTERVAL)
+    assert restarted.mccfr.iteration == ITERATIONS
+    assert set(restarted.mccfr.nodes) == set(reference.nodes)
@@ -0,0 +1,52 @@
+"""Дельта-сегменты контрольных точек и их уплотнение"""
+import random
+import shutil
+from types import SimpleNamespace
+
+from app.ai.checkpoint import CheckpointStore
+
+
+def trainer(iteration: int, seed: int = 0):
+    return SimpleNamespace(iteration=iteration, rng=random.Random(seed), exploration_constant=1.5)
+
+
+def test_segments_restore_latest_nodes(tmp_path):
+    store = CheckpointStore(str(tmp_path), compact_after=100)
+    store.write(trainer(10, seed=1), {'a': {'regret': 1}, 'b': {'regret': 2}})
+    second = trainer(20, seed=2)
+    store.write(second, {'a': {'regret': 5}, 'c': {'regret': 3}})
+
+    state = store.load()
+    assert state['iteration'] == 20
+    assert state['nodes'] == {'a': {'regret': 5}, 'b': {'regret': 2}, 'c': {'regret': 3}}
+    assert state['rng_state'] == second.rng.getstate()
+
+
+def test_compaction_keeps_state_and_numbering(tmp_path):
+    store = CheckpointStore(str(tmp_path), compact_after=100)
+    store.write(trainer(10), {'a': {'regret': 1}})
+    store.write(trainer(20), {'b': {'regret': 2}})
+    before = store.load()
+
+    assert store.compact() == 2
+    assert store.segments() == []
+    assert store.load() == before
+
+    # Новый сегмент нумеруется после слитых и применяется поверх базы
+    reopened = CheckpointStore(str(tmp_path), compact_after=100)
+    assert reopened.write(trainer(30), {'a': {'regret': 7}}).endswith('delta_000003.json')
+    assert reopened.load()['nodes'] == {'a': {'regret': 7}, 'b': {'regret': 2}}
+
+
+def test_interrupted_compaction_is_not_applied_twice(tmp_path):
+    store = CheckpointStore(str(tmp_path), compact_after=100)
+    old = store.write(trainer(10), {'a': {'regret': 1}})
+    store.write(trainer(20), {'a': {'regret': 2}})
+    shutil.copy(old, tmp_path / 'saved.json')
+    store.compact()
+
+    # Сбой после записи базы, до удаления сегментов: старый сегмент не применяется
+    shutil.copy(tmp_path / 'saved.json', old)
+    state = CheckpointStore(str(tmp_path), compact_after=100).load()
+    assert state['iteration'] == 20
+    assert state['nodes'] == {'a': {'regret': 2}}
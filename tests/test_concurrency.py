@@ -0,0 +1,65 @@
+"""Оптимистичная конкуренция: версия стола, 409 и блокировка игры"""
+import threading
+
+import pytest
+from config import Config
+from app.game.errors import ConflictError
+from app.game.table import Table
+
+
+def hand_placements(cards):
+    return [{'card': card, 'row': 'bottom', 'position': position} for position, card in enumerate(cards)]
+
+
+def test_stale_version_gets_409(client):
+    start = client.post('/api/start', json={}).get_json()
+    game_id, version = start['game_id'], start['version']
+    placements = hand_placements(start['player_cards'])
+
+    ok = client.post('/api/street', json={'game_id': game_id, 'version': version, 'placements': placements})
+    assert ok.status_code == 200
+
+    # Повтор с прежней версией (второй клиент, повторная отправка) отклоняется
+    stale = client.post('/api/street', json={'game_id': game_id, 'version': version, 'placements': placements})
+    assert stale.status_code == 409
+    assert stale.get_json()['version'] == ok.get_json()['version']
+
+    # Версия также принимается из заголовка If-Match
+    conflict = client.post('/api/next', json={'game_id': game_id}, headers={'If-Match': f'"{version}"'})
+    assert conflict.status_code == 409
+    state = client.get(f'/api/state?game_id={game_id}').get_json()
+    assert state['version'] == ok.get_json()['version']
+
+
+@pytest.mark.usefixtures('storage')
+def test_failed_mutation_keeps_version():
+    table = Table(2)
+    table.start_new_game(seed=1)
+    version = table.version
+    # Улица с неразложенными картами не принимается
+    assert table.next_street(expected_version=version) is None
+    assert table.version == version
+
+
+@pytest.mark.usefixtures('storage')
+def test_busy_table_raises_conflict(monkeypatch):
+    monkeypatch.setattr(Config, 'GAME_LOCK_TIMEOUT', 0.05)
+    table = Table(2)
+    table.start_new_game(seed=1)
+
+    locked, release = threading.Event(), threading.Event()
+
+    def hold():
+        with table._lock:
+            locked.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    locked.wait()
+    try:
+        with pytest.raises(ConflictError, match='busy'):
+            table.next_street()
+    finally:
+        release.set()
+        holder.join()
@@ -0,0 +1,52 @@
+"""Зерно колоды хранится локально и не попадает в синхронизируемые сохранения"""
+import json
+import os
+
+import pytest
+from config import Config
+from app.game.table import Table
+from app.utils import state as state_module
+
+
+pytestmark = pytest.mark.usefixtures('storage')
+
+
+def started_table() -> Table:
+    table = Table(2)
+    # Длинное зерно не совпадет случайно с другими числами сохранения
+    table.start_new_game(seed=2 ** 62 + 11)
+    table._save_current_state()
+    return table
+
+
+def test_save_file_has_no_seed():
+    table = started_table()
+    path = os.path.join(Config.PROGRESS_DIR, f"game_{table.game_id}.json")
+    with open(path) as f:
+        saved = json.load(f)
+    assert 'deck' not in saved
+    assert str(table.deck.seed) not in json.dumps(saved)
+    assert os.path.exists(os.path.join(Config.DECK_STATE_DIR, f"deck_{table.game_id}.json"))
+
+
+def test_load_replays_deck_from_local_state():
+    table = started_table()
+    loaded = Table(2)
+    assert loaded.load_game(table.game_id)
+    assert loaded.deck.deal(5) == table.deck.deal(5)
+
+
+def test_load_without_local_state_kills_visible_cards():
+    table = started_table()
+    state_module.remove_deck_state(table.game_id)
+    loaded = Table(2)
+    assert loaded.load_game(table.game_id)
+    visible = {card for seat in loaded.seats for card in seat.current_hand}
+    dealt = set(loaded.deck.deal(len(loaded.deck.live())))
+    assert visible and not visible & dealt
+
+
+def test_final_save_removes_local_state():
+    table = started_table()
+    table._save_current_state(is_final=True)
+    assert state_module.load_deck_state(table.game_id) is None
@@ -0,0 +1,48 @@
+"""Действия через /api/action и события игры в ее канале"""
+from app.events import broker
+from app.routes import events_channel
+
+
+def next_event(events, name: str):
+    while True:
+        event, data = events.get(timeout=10)
+        if event == name:
+            return data
+
+
+def test_action_result_is_published_to_game_channel(client):
+    start = client.post('/api/start', json={}).get_json()
+    other = client.post('/api/start', json={}).get_json()
+    events = broker.subscribe(events_channel(start['game_id']))
+    foreign = broker.subscribe(events_channel(other['game_id']))
+    try:
+        placements = [{'card': card, 'row': 'bottom', 'position': position}
+                      for position, card in enumerate(start['player_cards'])]
+        response = client.post('/api/action', json={'type': 'street', 'game_id': start['game_id'],
+                                                    'placements': placements})
+        assert response.status_code == 202
+
+        deal = next_event(events, 'deal')
+        assert deal['game_id'] == start['game_id']
+        assert deal['current_street'] == 2
+        assert foreign.empty()
+    finally:
+        broker.unsubscribe(events_channel(start['game_id']), events)
+        broker.unsubscribe(events_channel(other['game_id']), foreign)
+
+
+def test_stale_action_publishes_conflict(client):
+    start = client.post('/api/start', json={}).get_json()
+    events = broker.subscribe(events_channel(start['game_id']))
+    try:
+        client.post('/api/action', json={'type': 'next', 'game_id': start['game_id'],
+                                          'version': start['version'] - 1})
+        conflict = next_event(events, 'conflict')
+        assert conflict['version'] == start['version']
+    finally:
+        broker.unsubscribe(events_channel(start['game_id']), events)
+
+
+def test_events_and_actions_require_known_game(client):
+    assert client.get('/api/events').status_code == 400
+    assert client.post('/api/action', json={'type': 'next', 'game_id': 'missing'}).status_code == 404
@@ -0,0 +1,51 @@
+"""Эксплуатируемость обученной и развернутой стратегии на подыграх"""
+import random
+import pytest
+from config import Config
+from app.ai.benchmark import make_subgame, run
+from app.ai.checkpoint import CheckpointStore
+from app.ai.exploitability import exploitability, load_deployed
+from app.ai.mccfr import MCCFR
+from app.ai.policy_store import PolicyStore
+
+pytestmark = pytest.mark.usefixtures('storage')
+
+
+def trained(subgames, iterations=400):
+    mccfr = MCCFR(seed=1)
+    for i in range(iterations):
+        mccfr.train(subgames[i % len(subgames)], 1)
+    return mccfr
+
+
+def test_deployed_strategy_is_evaluated_on_same_subgames():
+    assert load_deployed('checkpoint') is None
+    assert load_deployed('policy') is None
+
+    rng = random.Random(3)
+    subgames = [make_subgame(rng) for _ in range(2)]
+    mccfr = trained(subgames)
+    expected = exploitability(mccfr, subgames)
+    untrained = exploitability(MCCFR(), subgames)
+    assert expected['exploitability'] < untrained['exploitability']
+
+    store = CheckpointStore(Config.CHECKPOINT_DIR)
+    mccfr.checkpoint(store)
+    store.wait()
+    rules, policy, version = load_deployed('checkpoint')
+    assert version == f"iteration {mccfr.iteration}"
+    assert exploitability(rules, subgames, policy=policy)['exploitability'] == pytest.approx(
+        expected['exploitability'])
+
+    published = PolicyStore.from_mccfr(mccfr).publish(Config.POLICY_STORE_DIR)
+    rules, policy, version = load_deployed('policy')
+    assert version in published
+    assert exploitability(rules, subgames, policy=policy)['exploitability'] == pytest.approx(
+        expected['exploitability'], abs=1e-3)
+
+
+def test_benchmark_reports_exploitability_per_checkpoint():
+    rows = run(['vanilla'], [10, 30], subgames=2)
+    assert [row['iterations'] for row in rows] == [10, 30]
+    for row in rows:
+        assert row['exploitability'] == pytest.approx(row['gap'], abs=1e-6)
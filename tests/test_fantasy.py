@@ -0,0 +1,60 @@
+"""Полная игра с раундом фантазии через submit_street"""
+import pytest
+from config import Config
+from app.ai.mccfr import MCCFR, GameState
+from app.game import table as table_module
+from app.game.cards import cached_card_dict, intern_card
+from app.game.evaluator import ROWS
+from app.game.table import Table
+
+
+@pytest.fixture(autouse=True)
+def no_side_effects(monkeypatch):
+    monkeypatch.setattr(table_module, 'save_game_state', lambda state: None)
+    monkeypatch.setattr(table_module, 'save_deck_state', lambda game_id, deck_state: None)
+    monkeypatch.setattr(table_module, 'remove_deck_state', lambda game_id: None)
+    monkeypatch.setattr(Config, 'ONLINE_LEARNING', False)
+
+
+def play_street(table: Table):
+    """Раскладка руки игрока по свободным слотам снизу вверх"""
+    view = table._seat_view(0)
+    empty = [(row, position) for row in reversed(ROWS)
+             for position, card in enumerate(view[f"{row}_row"]) if card is None]
+    hand = list(table.player.current_hand)
+    count = len(hand) if table.current_street == 1 or table.fantasy_round else len(hand) - 1
+    placements = [{'card': cached_card_dict(card), 'row': row, 'position': position}
+                  for card, (row, position) in zip(hand, empty)][:count]
+    return table.submit_street(placements)
+
+
+def test_game_through_fantasy(monkeypatch):
+    # Фантазия всем местам независимо от раскладки
+    monkeypatch.setattr(Table, '_fantasy_cards', lambda self, index: 14)
+    table = Table(2)
+    table.start_new_game(seed=7)
+
+    for _ in range(4):
+        assert play_street(table) is not None
+    result = play_street(table)
+    assert result['fantasy'] and result['player_fantasy'] and result['ai_fantasy']
+    assert table.fantasy_round
+    assert len(result['player_cards']) == 14
+    # ИИ разложил фантазию на новую доску, лишняя карта осталась в руке
+    assert table.boards[1].complete and len(table.seats[1].current_hand) == 1
+
+    result = play_street(table)
+    assert result['final']
+    assert all(board.complete for board in table.boards)
+    assert len(result['scores']['seats']['net']) == 2
+
+
+def test_get_action_without_moves():
+    deck = [intern_card(code) for code in range(52)]
+    state = GameState(
+        player_cards=deck[13:27],
+        placed_cards={'top': deck[:3], 'middle': deck[3:8], 'bottom': deck[8:13]},
+        remaining_deck=[],
+        current_street=5
+    )
+    assert MCCFR().get_action(state) is None
@@ -0,0 +1,12 @@
+"""Файлы спула итогов не перезаписываются перезапущенным процессом"""
+from app.ai.learning import OutcomeQueue, read_outcomes, spool_files
+
+
+def test_restarted_queue_keeps_unread_files(tmp_path):
+    spool_dir = str(tmp_path / 'outcomes')
+    # Тот же pid и тот же счетчик, как у воркера после перезапуска
+    OutcomeQueue(spool_dir)._write([{'game': 1}])
+    OutcomeQueue(spool_dir)._write([{'game': 2}])
+    files = spool_files(spool_dir)
+    assert len(files) == 2
+    assert sorted(outcome['game'] for outcome in read_outcomes(files)) == [1, 2]
@@ -0,0 +1,58 @@
+"""Квантованное хранилище стратегии сервинга"""
+from config import Config
+from app.ai.policy_store import PolicyStore, policy_version
+from app.ai.strategy import AIStrategy
+
+STATE = '2|AhKd|' + '00' * 13
+OTHER = '3|2c3c4c|' + 'Qs' + '00' * 12
+STRATEGIES = [
+    (STATE, {'Ah_top_0': 0.2, 'Kd_bottom_4': 0.7, 'Ah_middle_1': 0.1}),
+    (OTHER, {'2c_bottom_0': 0.5, '3c_bottom_1': 0.5})
+]
+
+
+def test_quantized_store_keeps_best_actions(tmp_path):
+    store = PolicyStore.from_strategies(STRATEGIES)
+    served = store.quantize('uint8')
+    served.save(str(tmp_path / 'policy'))
+    loaded = PolicyStore.load(str(tmp_path / 'policy'))
+
+    assert loaded.best_action(STATE) == 'Kd_bottom_4'
+    assert loaded.best_action('1|Ah|' + '00' * 13) is None
+    strategy = loaded.get_strategy(STATE)
+    assert abs(strategy['Kd_bottom_4'] - 0.7) < 1 / 255
+    assert loaded.nbytes() < store.nbytes()
+
+
+def test_publish_switches_version(tmp_path):
+    link = str(tmp_path / 'policy')
+    store = PolicyStore.from_strategies(STRATEGIES)
+    assert store.publish(link) == 'v000001'
+    assert store.publish(link, keep=1) == 'v000002'
+    assert policy_version(link) == 'v000002'
+    assert PolicyStore.load(link).best_action(OTHER) in ('2c_bottom_0', '3c_bottom_1')
+
+
+def test_worker_started_before_first_publish_picks_it_up(storage, monkeypatch):
+    monkeypatch.setattr(Config, 'POLICY_RELOAD_INTERVAL', 0)
+    strategy = AIStrategy()
+    assert strategy.policy is None
+    assert not strategy.refresh_policy()
+
+    PolicyStore.from_strategies(STRATEGIES).publish(Config.POLICY_STORE_DIR)
+    assert strategy.refresh_policy()
+    assert strategy.policy_version == 'v000001'
+    assert strategy.policy.best_action(STATE) == 'Kd_bottom_4'
+    assert not strategy.refresh_policy()
+
+    PolicyStore.from_strategies(STRATEGIES[:1]).publish(Config.POLICY_STORE_DIR)
+    assert strategy.refresh_policy()
+    assert strategy.policy.best_action(OTHER) is None
+
+
+def test_training_strategy_ignores_policy_store(storage, monkeypatch):
+    monkeypatch.setattr(Config, 'POLICY_RELOAD_INTERVAL', 0)
+    PolicyStore.from_strategies(STRATEGIES).publish(Config.POLICY_STORE_DIR)
+    strategy = AIStrategy(use_policy_store=False)
+    assert not strategy.refresh_policy()
+    assert strategy.policy is None
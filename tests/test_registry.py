@@ -0,0 +1,54 @@
+"""Реестр столов: выгрузка неактивных игр и загрузка из сохранения"""
+import pytest
+from app.game.registry import TableRegistry
+
+pytestmark = pytest.mark.usefixtures('storage')
+
+
+def started(registry: TableRegistry, seed: int):
+    table = registry.create()
+    table.start_new_game(seed=seed)
+    registry.register(table)
+    return table
+
+
+def test_idle_tables_are_evicted_and_reloaded():
+    registry = TableRegistry(idle_timeout=0)
+    first, second = started(registry, 1), started(registry, 2)
+    registry.set_default(second)
+    assert len(registry) == 2
+
+    # Стол по умолчанию остается в памяти
+    assert registry.evict_idle() == 1
+    assert len(registry) == 1
+    assert registry.get() is second
+
+    # Выгруженная игра восстанавливается из сохранения новым столом
+    reloaded = registry.get(first.game_id)
+    assert reloaded is not first
+    assert reloaded.get_state() == first.get_state()
+    assert len(registry) == 2
+
+
+def test_recent_tables_are_kept():
+    registry = TableRegistry(idle_timeout=3600)
+    table = started(registry, 1)
+    assert registry.evict_idle() == 0
+    assert registry.get(table.game_id) is table
+
+
+def test_unknown_game_is_none():
+    assert TableRegistry().get('missing') is None
+
+
+def test_routes_return_404_for_unknown_game(client):
+    assert client.post('/api/fantasy', json={'game_id': 'missing'}).status_code == 404
+    assert client.get('/api/scores?game_id=missing').status_code == 404
+    assert client.get('/api/state?game_id=missing').status_code == 404
+
+
+def test_scores_of_running_game(client):
+    game_id = client.post('/api/start', json={}).get_json()['game_id']
+    scores = client.get(f'/api/scores?game_id={game_id}')
+    assert scores.status_code == 200
+    assert scores.get_json()['final'] is False
@@ -0,0 +1,30 @@
+"""Один планировщик обслуживания на процесс"""
+import os
+import runpy
+import sys
+import threading
+
+from config import Config
+from app import routes
+from app.utils import scheduler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_first_request_starts_one_scheduler(client, storage, monkeypatch):
+    monkeypatch.setattr(Config, 'SCHEDULER_ENABLED', True)
+    monkeypatch.setattr(routes, '_scheduler_started', False)
+    process_scheduler = scheduler.MaintenanceScheduler(
+        jobs=[scheduler.Job('noop', 3600, lambda: None)], lock_file=str(storage / 'maintenance.lock'), stats_file=str(storage / 'stats.json'))
+    monkeypatch.setattr(scheduler, '_scheduler', process_scheduler)
+    try:
+        for _ in range(3):
+            assert client.get('/api/health').status_code == 200
+        threads = [thread for thread in threading.enumerate() if thread.name == 'maintenance']
+        assert threads == [process_scheduler._thread]
+    finally:
+        process_scheduler.stop(timeout=5)
+
+    # Планировщик загружается одним модулем, gunicorn его не запускает
+    assert 'utils.scheduler' not in sys.modules
+    assert 'post_worker_init' not in runpy.run_path(os.path.join(ROOT, 'gunicorn.conf.py'))
@@ -0,0 +1,36 @@
+"""Таблицы силы и роялти рядов и попарный подсчет очков"""
+from app.game.cards import card_index
+from app.game.evaluator import fantasy_cards, is_fouled, row_royalty, row_strength
+from app.game.scoring import score_boards, score_table
+
+
+def codes(cards: str):
+    return [card_index(cards[i:i + 2]) for i in range(0, len(cards), 2)]
+
+
+FIRST = {'top': codes('QhQd2c'), 'middle': codes('3h3d4c4s9h'), 'bottom': codes('5h5d5c8s9d')}
+SECOND = {'top': codes('AhKd2s'), 'middle': codes('6h7d8c9sTh'), 'bottom': codes('JhJdJcJs2d')}
+FOULED = {'top': codes('AhAd3c'), 'middle': codes('2h2d7c8s9h'), 'bottom': codes('KhQd9c6s4d')}
+
+
+def test_row_tables():
+    assert row_strength(codes('2h2d2c')) > row_strength(codes('AhAdKc')) > row_strength(codes('AhKdQc'))
+    assert row_strength(codes('2h3h4h5h6h')) > row_strength(codes('AhAdAcAsKh'))
+    assert row_strength(codes('Ah2d')) == -1
+    assert row_royalty('top', codes('QhQd2c')) == 7
+    assert row_royalty('top', codes('2h2d2c')) == 10
+    assert fantasy_cards(codes('QhQd2c')) == 14
+    assert fantasy_cards(codes('JhJd2c')) == 0
+    assert is_fouled(FOULED) and not is_fouled(FIRST)
+
+
+def test_pairwise_table_matches_heads_up():
+    heads_up = score_boards(FIRST, SECOND)
+    net = heads_up['player']['total'] - heads_up['ai']['total']
+
+    table = score_table([FIRST, SECOND, FOULED])
+    assert table['pairs'][0] == {'seats': [0, 1], 'net': net}
+    assert sum(table['net']) == 0
+    assert table['fouled'] == [False, False, True]
+    # Мертвая рука проигрывает обоим соперникам
+    assert table['net'][2] < 0
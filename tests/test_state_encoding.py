@@ -0,0 +1,56 @@
+"""Компактное кодирование состояния, ETag и сжатие ответов"""
+import gzip
+import json
+
+import pytest
+from app.game.codec import compact_state, decode_saved_state, encode_saved_state, expand_state
+from app.game.table import Table
+
+
+@pytest.mark.usefixtures('storage')
+def test_saved_state_round_trip():
+    table = Table(3)
+    table.start_new_game(seed=2)
+    state = table.get_state()
+
+    encoded = encode_saved_state(json.loads(json.dumps(state)))
+    assert encoded['player_cards'][0] == state['player_cards'][0]['rank'] + state['player_cards'][0]['suit']
+    assert decode_saved_state(json.loads(json.dumps(encoded))) == state
+    assert expand_state(compact_state(state)) == state
+
+
+def test_legacy_save_is_returned_as_is():
+    legacy = {'game_id': 'old', 'player_cards': [{'rank': 'A', 'suit': 'h'}]}
+    assert decode_saved_state(legacy) == legacy
+
+
+def test_state_etag_and_not_modified(client):
+    game_id = client.post('/api/start', json={}).get_json()['game_id']
+    first = client.get(f'/api/state?game_id={game_id}')
+    assert first.status_code == 200 and first.headers['ETag']
+
+    cached = client.get(f'/api/state?game_id={game_id}', headers={'If-None-Match': first.headers['ETag']})
+    assert cached.status_code == 304
+    assert not cached.data
+
+    # Изменение стола меняет ETag
+    state = first.get_json()
+    placements = [{'card': card, 'row': 'bottom', 'position': position}
+                  for position, card in enumerate(state['player_cards'])]
+    assert client.post('/api/street', json={'game_id': game_id, 'placements': placements}).status_code == 200
+    changed = client.get(f'/api/state?game_id={game_id}', headers={'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != first.headers['ETag']
+
+
+def test_compact_format_and_gzip(client):
+    game_id = client.post('/api/start', json={'seats': 3}).get_json()['game_id']
+    full = client.get(f'/api/state?game_id={game_id}').get_json()
+    compact = client.get(f'/api/state?game_id={game_id}&format=compact')
+    assert compact.get_json() == compact_state(full)
+    assert len(compact.data) < len(json.dumps(full))
+
+    response = client.get(f'/api/state?game_id={game_id}', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(response.data)) == full
+    assert response.headers['ETag'].startswith('W/')
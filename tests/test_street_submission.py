@@ -0,0 +1,60 @@
+"""Расклад улицы одним запросом /api/street"""
+import pytest
+from app.game.table import Table
+
+SLOTS = [('bottom', position) for position in range(5)] + \
+        [('middle', position) for position in range(5)] + [('top', position) for position in range(3)]
+
+
+def placements(cards, slots):
+    return [{'card': card, 'row': row, 'position': position} for card, (row, position) in zip(cards, slots)]
+
+
+def test_street_places_cards_and_deals_next(client):
+    start = client.post('/api/start', json={}).get_json()
+    game_id = start['game_id']
+
+    response = client.post('/api/street', json={
+        'game_id': game_id, 'version': start['version'],
+        'placements': placements(start['player_cards'], SLOTS)
+    })
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['current_street'] == 2
+    assert len(result['player_cards']) == 3
+    assert result['version'] == start['version'] + 1
+    # ИИ разложил первую улицу и две карты второй
+    assert all(sum(card is not None for card in board['bottom_row'] + board['middle_row'] + board['top_row']) == 7
+               for board in result['ai_boards'])
+
+    state = client.get(f'/api/state?game_id={game_id}').get_json()
+    assert [card for card in state['player_bottom_row']] == start['player_cards']
+
+
+def test_wrong_card_count_is_rejected(client):
+    start = client.post('/api/start', json={}).get_json()
+    response = client.post('/api/street', json={
+        'game_id': start['game_id'],
+        'placements': placements(start['player_cards'][:4], SLOTS)
+    })
+    assert response.status_code == 400
+    state = client.get(f"/api/state?game_id={start['game_id']}").get_json()
+    assert state['version'] == start['version']
+    assert state['player_cards'] == start['player_cards']
+
+
+@pytest.mark.usefixtures('storage')
+def test_failed_street_rolls_back_table(monkeypatch):
+    table = Table(2)
+    table.start_new_game(seed=5)
+    before = table.get_state()
+    hand = list(before['player_cards'])
+
+    def broken_advance(self):
+        raise RuntimeError('deal failed')
+
+    monkeypatch.setattr(Table, '_advance_street', broken_advance)
+    with pytest.raises(RuntimeError):
+        table.submit_street(placements(hand, SLOTS))
+    assert table.get_state() == before
+    assert not any(summary.codes for summary in table.boards[0].rows.values())
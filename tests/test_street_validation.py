@@ -0,0 +1,47 @@
+"""Когда улица принимается: структура досок и число карт, но не мертвая рука"""
+import pytest
+from app.game.cards import intern_card
+from app.game.table import Table
+
+pytestmark = pytest.mark.usefixtures('storage')
+
+
+def first_street(table: Table, slots):
+    for card, (row, position) in zip(list(table.player.current_hand), slots):
+        assert table._place(0, card, row, position)
+
+
+def test_incomplete_board_is_accepted():
+    table = Table(2)
+    table.start_new_game(seed=9)
+    first_street(table, [('bottom', position) for position in range(5)])
+    assert not table.boards[0].complete
+    assert table._validate_current_street()
+
+
+def test_doomed_board_is_accepted_and_scored_as_fouled():
+    table = Table(2)
+    table.start_new_game(seed=9)
+    # Пара тузов сверху и заполненная середина без пары: рука уже мертва
+    player = table.player
+    player.current_hand[:] = []
+    player.top_row[:] = [intern_card('Ah'), intern_card('Ad'), None]
+    player.middle_row[:] = [intern_card(card) for card in ('2c', '7d', '9s', 'Jh', '4d')]
+    table._refresh_board(0)
+    assert not table.boards[0].complete
+    assert table.boards[0].fouled
+    assert table._validate_current_street()
+    assert table._fantasy_cards(0) == 0
+
+
+def test_unplaced_cards_or_broken_board_are_rejected():
+    table = Table(2)
+    table.start_new_game(seed=9)
+    assert not table._validate_current_street()
+
+    first_street(table, [('bottom', position) for position in range(5)])
+    # Повтор карты на доске делает сводку недействительной
+    table.player.middle_row[0] = table.player.bottom_row[0]
+    table._refresh_board(0)
+    assert not table.boards[0].valid
+    assert not table._validate_current_street()
@@ -0,0 +1,168 @@
+"""Синхронизация progress/ против локального фейкового Git Data API"""
+import base64
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                      '.github', 'scripts', 'sync_progress.py')
+REPO = 'owner/progress'
+
+
+def load_script():
+    spec = importlib.util.spec_from_file_location('sync_progress', SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+sync = load_script()
+
+
+def blob_sha(content: bytes) -> str:
+    return hashlib.sha1(f"blob {len(content)}\0".encode() + content).hexdigest()
+
+
+def object_sha(data) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+class FakeGitHub:
+    """Ветка main: коммиты, деревья (путь -> sha) и blob-объекты в памяти"""
+
+    def __init__(self, files: dict):
+        self.blobs = {blob_sha(content): content for content in files.values()}
+        tree = {path: blob_sha(content) for path, content in files.items()}
+        self.trees = {object_sha(tree): tree}
+        self.commits = {'c0': object_sha(tree)}
+        self.head = 'c0'
+        self.requests = []
+
+    def tree_files(self) -> dict:
+        return self.trees[self.commits[self.head]]
+
+    def handle(self, method: str, path: str, body: bytes):
+        prefix = f"/repos/{REPO}/git"
+        assert path.startswith(prefix), path
+        path = path[len(prefix):].split('?')[0]
+        self.requests.append((method, path))
+        if method == 'GET' and path == '/ref/heads/main':
+            return {'object': {'sha': self.head}}
+        if method == 'GET' and path.startswith('/commits/'):
+            return {'tree': {'sha': self.commits[path.rsplit('/', 1)[1]]}}
+        if method == 'GET' and path.startswith('/trees/'):
+            tree = self.trees[path.rsplit('/', 1)[1]]
+            return {'truncated': False,
+                    'tree': [{'path': name, 'type': 'blob', 'sha': sha} for name, sha in tree.items()]}
+        data = json.loads(body)
+        if method == 'POST' and path == '/blobs':
+            content = base64.b64decode(data['content'])
+            sha = blob_sha(content)
+            self.blobs[sha] = content
+            return {'sha': sha}
+        if method == 'POST' and path == '/trees':
+            tree = dict(self.trees[data['base_tree']])
+            tree.update({item['path']: item['sha'] for item in data['tree']})
+            sha = object_sha(tree)
+            self.trees[sha] = tree
+            return {'sha': sha}
+        if method == 'POST' and path == '/commits':
+            sha = object_sha(data)
+            self.commits[sha] = data['tree']
+            return {'sha': sha}
+        if method == 'PATCH' and path == '/refs/heads/main':
+            self.head = data['sha']
+            return {'object': {'sha': self.head}}
+        raise AssertionError(f"Unexpected request {method} {path}")
+
+    def count(self, method: str, path: str) -> int:
+        return sum(1 for request in self.requests if request == (method, path))
+
+
+@pytest.fixture
+def server():
+    github = FakeGitHub({'progress/a.json': b'{"a": 1}', 'other/readme.md': b'keep'})
+
+    class Handler(BaseHTTPRequestHandler):
+        def _body(self) -> bytes:
+            if self.headers.get('Transfer-Encoding') == 'chunked':
+                body = b''
+                while True:
+                    size = int(self.rfile.readline().split(b';')[0], 16)
+                    chunk = self.rfile.read(size + 2)
+                    if not size:
+                        return body
+                    body += chunk[:-2]
+            return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+        def _reply(self):
+            payload = json.dumps(github.handle(self.command, self.path, self._body())).encode()
+            self.send_response(201 if self.command == 'POST' else 200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        do_GET = do_POST = do_PATCH = _reply
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield github, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def run_sync(tmp_path, api_url: str):
+    repo = sync.GitHubRepo(api_url, REPO, 'token', 'main', workers=4)
+    manifest = sync.Manifest(str(tmp_path / 'manifest.json'))
+    return sync.sync_progress(str(tmp_path / 'progress'), repo, manifest, workers=4)
+
+
+def test_sync_uploads_only_changed_files(tmp_path, server):
+    github, api_url = server
+    progress = tmp_path / 'progress'
+    progress.mkdir()
+    (progress / 'a.json').write_bytes(b'{"a": 1}')
+    (progress / 'b.json').write_bytes(b'{"b": 2}')
+
+    # a.json совпадает с веткой и пропускается, b.json загружается
+    assert run_sync(tmp_path, api_url) == ['b.json']
+    assert github.count('POST', '/blobs') == 1
+    assert github.count('POST', '/commits') == 1
+    files = github.tree_files()
+    assert files['progress/b.json'] == blob_sha(b'{"b": 2}')
+    assert files['progress/a.json'] == blob_sha(b'{"a": 1}')
+    assert files['other/readme.md'] == blob_sha(b'keep')
+
+    manifest = json.loads((tmp_path / 'manifest.json').read_text())
+    assert manifest['a.json'][2] == blob_sha(b'{"a": 1}')
+    assert manifest['b.json'][2] == blob_sha(b'{"b": 2}')
+
+    # Изменения двух файлов фиксируются одним коммитом с одним деревом
+    (progress / 'a.json').write_bytes(b'{"a": 10}')
+    (progress / 'c.json').write_bytes(b'{"c": 3}')
+    assert run_sync(tmp_path, api_url) == ['a.json', 'c.json']
+    assert github.count('POST', '/blobs') == 3
+    assert github.count('POST', '/trees') == 2
+    assert github.count('POST', '/commits') == 2
+    files = github.tree_files()
+    assert files['progress/a.json'] == blob_sha(b'{"a": 10}')
+    assert files['progress/c.json'] == blob_sha(b'{"c": 3}')
+
+    manifest = json.loads((tmp_path / 'manifest.json').read_text())
+    assert manifest['a.json'][2] == blob_sha(b'{"a": 10}')
+    assert manifest['a.json'][1] == len(b'{"a": 10}')
+
+    # Без изменений ничего не загружается и не фиксируется
+    assert run_sync(tmp_path, api_url) == []
+    assert github.count('POST', '/blobs') == 3
+    assert github.count('POST', '/commits') == 2
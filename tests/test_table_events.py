@@ -0,0 +1,41 @@
+"""События ходов ИИ рассылаются только после принятого изменения стола"""
+import pytest
+from app.game.table import Table
+
+pytestmark = pytest.mark.usefixtures('storage')
+
+
+def listening_table(seats: int):
+    table = Table(seats)
+    received = []
+    table.listener = lambda event, data: received.append((event, data))
+    return table, received
+
+
+def test_ai_moves_are_published_after_commit():
+    table, received = listening_table(3)
+    table.start_new_game(seed=4)
+    moves = [data for event, data in received if event == 'ai_place']
+    assert sorted({data['seat'] for data in moves}) == [1, 2]
+    assert len(moves) == 10
+    assert all(data['game_id'] == table.game_id for data in moves)
+
+
+def test_rolled_back_street_publishes_nothing(monkeypatch):
+    table, received = listening_table(2)
+    table.start_new_game(seed=4)
+    del received[:]
+
+    def failing_advance(self):
+        self.current_street += 1
+        self._deal_all(3)
+        self._ai_move()
+        raise RuntimeError('save failed')
+
+    monkeypatch.setattr(Table, '_advance_street', failing_advance)
+    placements = [{'card': card, 'row': 'bottom', 'position': position}
+                  for position, card in enumerate(table.get_state()['player_cards'])]
+    with pytest.raises(RuntimeError):
+        table.submit_street(placements)
+    assert received == []
+    assert table._events is None
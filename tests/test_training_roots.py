@@ -0,0 +1,56 @@
+"""Корни обучения MCCFR совпадают по виду с состояниями ИИ за столом"""
+import pytest
+from app.ai.mccfr import MCCFR
+from app.ai.strategy import AIStrategy
+from app.game.evaluator import ROWS
+from app.game.table import Table
+
+pytestmark = pytest.mark.usefixtures('storage')
+
+
+def shape(key: str):
+    """Улица, карт в руке и выложенных карт по ключу состояния"""
+    street, hand, placed = key.split('|')
+    return int(street), len(hand) // 2, sum(placed[i:i + 2] != '00' for i in range(0, len(placed), 2))
+
+
+def table_shapes(monkeypatch, seed: int):
+    """Ключи, по которым ИИ выбирает ходы за реальным столом, за всю игру"""
+    shapes = set()
+    make_move = AIStrategy.make_move
+
+    def recording_move(self, game_state):
+        shapes.add(shape(self.state_key(game_state)))
+        return make_move(self, game_state)
+
+    monkeypatch.setattr(AIStrategy, 'make_move', recording_move)
+    table = Table(2)
+    table.start_new_game(seed=seed)
+    while table.current_street <= 5 and table.game_id:
+        street = table.current_street
+        hand = table.get_state()['player_cards']
+        free = [(row, position) for row in reversed(ROWS)
+                for position, card in enumerate(table.get_state()[f'player_{row}_row']) if card is None]
+        keep = len(hand) if street == 1 else len(hand) - 1
+        placements = [{'card': card, 'row': row, 'position': position}
+                      for card, (row, position) in zip(hand[:keep], free)]
+        assert table.submit_street(placements, None if street == 1 else hand[keep]) is not None
+        if table.current_street == street:
+            break
+    return shapes
+
+
+def test_sampled_roots_match_table_states(monkeypatch):
+    played = {s for s in table_shapes(monkeypatch, seed=4) if s[0] >= 2}
+    assert {s[0] for s in played} == {2, 3, 4, 5}
+
+    mccfr = MCCFR(seed=2)
+    root = AIStrategy(use_policy_store=False)._get_initial_state()
+    roots = {shape(mccfr._sample_state(root).to_string()) for _ in range(60)}
+    # Первое решение каждой улицы за столом — это корень обучения той же улицы
+    assert {s for s in played if s[1] == 3} == roots
+
+    # И все узлы, которые обучение проходит из этих корней, ИИ встречает в игре
+    mccfr.train(root, 12)
+    trained = {shape(key) for key in mccfr.nodes}
+    assert trained and trained <= played